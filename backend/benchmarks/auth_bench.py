@@ -0,0 +1,45 @@
+"""
+Auth overhead benchmark
+
+Measures the per-request cost of get_current_user for each JWT backend,
+with and without the verified-token cache.
+
+Usage (from backend/):
+    python -m benchmarks.auth_bench
+"""
+
+import asyncio
+import time
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from src.config.settings import settings
+from src.middleware import auth
+
+ITERATIONS = 20_000
+
+
+async def _measure(credentials, cached: bool) -> float:
+    auth.token_cache.clear()
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        if not cached:
+            auth.token_cache.clear()
+        await auth.get_current_user(credentials)
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+async def main():
+    token = auth.create_access_token({"sub": "benchmark-user"})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    print(f"{'backend':<8} {'cached':<7} {'us/request':>11}")
+    for backend in auth.JWT_BACKENDS:
+        settings.jwt_backend = backend
+        for cached in (False, True):
+            micros = await _measure(credentials, cached)
+            print(f"{backend:<8} {str(cached):<7} {micros:11.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+"""
+Content compression benchmark
+
+For a range of story sizes, reports the stored size of `content` under
+each codec and the time a read spends decoding it (the only extra work a
+read that projects `content` does; reads that leave `content` out pay
+nothing).
+
+Usage (from backend/):
+    python -m benchmarks.compression_bench
+"""
+
+import random
+import time
+
+from src.utils.compression import CODECS
+
+SIZES = (4_096, 65_536, 1_048_576)
+
+WORDS = (
+    "the dragon knight castle forest night storm river ancient sword "
+    "whispered silver shadow kingdom journey beneath fire moon queen"
+).split()
+
+
+def make_story(size: int) -> bytes:
+    rng = random.Random(size)
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words).encode("utf-8")[:size]
+
+
+def _time(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    print(f"{'bytes':>9} {'codec':>6} {'stored':>9} {'ratio':>6} {'decode':>11}")
+    for size in SIZES:
+        raw = make_story(size)
+        iterations = max(5, 2_000_000 // size)
+        print(f"{size:>9} {'none':>6} {size:>9} {1.0:>6.2f} {'-':>11}")
+        for name, (compress, decompress) in CODECS.items():
+            stored = compress(raw)
+            elapsed = _time(lambda: decompress(stored).decode("utf-8"), iterations)
+            print(
+                f"{size:>9} {name:>6} {len(stored):>9} "
+                f"{len(stored) / size:>6.2f} {elapsed:>9.1f}us"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+HTTP response compression benchmark
+
+For full fiction JSON bodies of several sizes, reports the bytes sent and
+the time to compress per content coding (brotli only when installed),
+against reusing the copy stored on the cache entry, which is what
+repeated GET /api/fictions/{id} requests for a cached fiction pay.
+
+Usage (from backend/):
+    python -m benchmarks.http_compression_bench
+"""
+
+import json
+import time
+
+from src.utils.http_compression import ENCODINGS, compress
+
+from .compression_bench import SIZES, make_story
+
+
+def _time(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def make_body(size: int) -> bytes:
+    fiction = {
+        "_id": "0" * 24,
+        "title": "Benchmark story",
+        "author": "Bench",
+        "genre": "fantasy",
+        "description": "A story used to measure response compression",
+        "content": make_story(size).decode("utf-8"),
+        "version": 1,
+    }
+    return json.dumps(fiction).encode("utf-8")
+
+
+def main() -> None:
+    print(
+        f"{'body':>10} {'coding':>7} {'sent':>10} {'ratio':>7} "
+        f"{'compress':>10} {'cached':>9}"
+    )
+    for size in SIZES:
+        body = make_body(size)
+        iterations = max(3, 2_000_000 // len(body))
+        print(f"{len(body):>10} {'none':>7} {len(body):>10} {1:>7.2f}")
+        for encoding in ENCODINGS:
+            compressed = compress(body, encoding)
+            seconds = _time(lambda: compress(body, encoding), iterations)
+            encoded = {encoding: compressed}
+            cached = _time(lambda: encoded.get(encoding), 100_000)
+            print(
+                f"{'':>10} {encoding:>7} {len(compressed):>10} "
+                f"{len(body) / len(compressed):>7.2f} "
+                f"{seconds * 1e3:>8.3f}ms {cached * 1e9:>7.0f}ns"
+            )
+
+
+if __name__ == "__main__":
+    main()
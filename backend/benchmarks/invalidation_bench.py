@@ -0,0 +1,120 @@
+"""
+Change stream invalidation check
+
+Runs ChangeStreamWatcher against a real MongoDB replica set and reports:
+
+- latency from a write to its event reaching a bus subscriber
+- that a watcher stopped mid-stream resumes from its token without
+  missing the writes made while it was down
+
+Writes go to a scratch collection (bench_invalidation) that is dropped
+afterwards. A local single-node replica set is enough:
+
+    docker run -d --name mongo-rs -p 27017:27017 mongo:7.0 --replSet rs0
+    docker exec mongo-rs mongosh --quiet --eval \\
+        'rs.initiate({_id: "rs0", members: [{_id: 0, host: "localhost:27017"}]})'
+
+Usage (from backend/):
+    MONGODB_URI="mongodb://localhost:27017/fictions_bench?directConnection=true" \\
+        python -m benchmarks.invalidation_bench --writes 500
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from src.config.database import Database
+from src.utils.invalidation import ChangeEvent, ChangeStreamWatcher, InvalidationBus
+
+COLLECTION = "bench_invalidation"
+
+
+class Recorder:
+    """Bus subscriber resolving a future per expected document id"""
+
+    def __init__(self):
+        self.pending = {}
+
+    def expect(self, document_id) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.pending[document_id] = future
+        return future
+
+    def __call__(self, event: ChangeEvent) -> None:
+        future = self.pending.pop(event.document_id, None)
+        if future is not None and not future.done():
+            future.set_result(time.perf_counter())
+
+
+def _percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def _latency(collection, recorder: Recorder, writes: int) -> list:
+    samples = []
+    for i in range(writes):
+        arrived = recorder.expect(i)
+        start = time.perf_counter()
+        await collection.update_one({"_id": i}, {"$set": {"n": i}}, upsert=True)
+        samples.append(await asyncio.wait_for(arrived, timeout=10) - start)
+    return samples
+
+
+async def _resume(collection, recorder: Recorder, watcher, count: int) -> int:
+    """Stop the watcher, write, restart it; return events received"""
+    arrivals = [recorder.expect(f"gap-{i}") for i in range(count)]
+    for i in range(count):
+        await collection.insert_one({"_id": f"gap-{i}"})
+
+    watcher.started.clear()
+    task = asyncio.create_task(watcher.run())
+    try:
+        done, _ = await asyncio.wait(arrivals, timeout=10)
+    finally:
+        task.cancel()
+    return len(done)
+
+
+async def main(args) -> None:
+    await Database.connect_db()
+    collection = Database.get_collection(COLLECTION)
+    await collection.drop()
+
+    recorder = Recorder()
+    bus = InvalidationBus()
+    bus.subscribe(COLLECTION, recorder)
+    watcher = ChangeStreamWatcher(bus, [COLLECTION])
+
+    task = asyncio.create_task(watcher.run())
+    try:
+        await asyncio.wait_for(watcher.started.wait(), timeout=10)
+        samples = await _latency(collection, recorder, args.writes)
+    except asyncio.TimeoutError:
+        raise SystemExit("No change events: is MONGODB_URI a replica set?")
+    finally:
+        task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    ms = [s * 1000 for s in samples]
+    print(
+        f"write -> subscriber over {len(ms)} writes: "
+        f"mean {statistics.mean(ms):.2f}ms, p50 {_percentile(ms, 0.5):.2f}ms, "
+        f"p99 {_percentile(ms, 0.99):.2f}ms"
+    )
+
+    received = await _resume(collection, recorder, watcher, args.gap)
+    print(f"resume after stop: {received}/{args.gap} missed writes delivered")
+
+    await collection.drop()
+    await Database.close_db()
+    if received != args.gap:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check change stream invalidation")
+    parser.add_argument("--writes", type=int, default=200)
+    parser.add_argument("--gap", type=int, default=20, help="writes while stopped")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,521 @@
+"""
+API load benchmark
+
+Drives the API with weighted request mixes and reports throughput, tail
+latency and per-request allocations for each scenario:
+
+- browse: list pages (following cursors) and search
+- read:   single fictions, conditional GETs and ranged content reads
+- login:  bcrypt-bound logins
+- write:  creates and updates
+- mixed:  all of the above in rough production proportions
+
+By default the ASGI app is called in-process (no sockets, so only the app
+is measured) on top of benchmarks.memory_mongo. Pass --mongo-uri to use a
+real mongod instead (point it at a throwaway database: the benchmark
+seeds users and fictions), or --url to load a running server over HTTP
+(needs httpx; raise API_RATE_LIMIT/AUTH_RATE_LIMIT on that server first).
+
+Results can be saved as a baseline and later runs print the change
+against it:
+
+Usage (from backend/):
+    python -m benchmarks.load_bench --save-baseline
+    python -m benchmarks.load_bench                    # compare to baseline
+    python -m benchmarks.load_bench --scenario read --concurrency 64
+    python -m benchmarks.load_bench --mongo-uri mongodb://localhost:27017/fictions_bench
+    python -m benchmarks.load_bench --url http://localhost:3000
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+import tracemalloc
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "load.json"
+
+SCENARIOS: Dict[str, Dict[str, int]] = {
+    "browse": {"list_page": 6, "search": 3, "read": 1},
+    "read": {"read": 6, "read_conditional": 3, "read_content": 1},
+    "login": {"login": 1},
+    "write": {"create": 1, "update": 3},
+    "mixed": {
+        "list_page": 30,
+        "search": 10,
+        "read": 35,
+        "read_conditional": 10,
+        "read_content": 5,
+        "login": 2,
+        "create": 3,
+        "update": 5,
+    },
+}
+
+GENRES = ["fantasy", "sci-fi", "mystery", "romance", "thriller", "adventure"]
+WORDS = (
+    "dragon knight castle forest storm river ancient sword silver shadow "
+    "kingdom journey fire moon queen lighthouse keeper detective station"
+).split()
+PASSWORD = "bench-password"
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+class ASGIClient:
+    """Minimal in-process HTTP client that calls an ASGI app directly"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        headers: Optional[Dict[str, str]] = None,
+        json_body=None,
+    ) -> Response:
+        body = json.dumps(json_body).encode("utf-8") if json_body is not None else b""
+        raw_headers = [
+            (k.lower().encode(), v.encode()) for k, v in (headers or {}).items()
+        ]
+        if json_body is not None:
+            raw_headers.append((b"content-type", b"application/json"))
+        raw_headers.append((b"content-length", str(len(body)).encode()))
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": raw_headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("bench", 80),
+        }
+
+        done = asyncio.Event()
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        status = 500
+        response_headers: Dict[str, str] = {}
+        chunks: List[bytes] = []
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers.update(
+                    (k.decode().lower(), v.decode()) for k, v in message["headers"]
+                )
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    done.set()
+
+        await self.app(scope, receive, send)
+        done.set()
+        return status, response_headers, b"".join(chunks)
+
+    async def close(self) -> None:
+        pass
+
+
+class HTTPClient:
+    """Keep-alive HTTP client for a running server"""
+
+    def __init__(self, base_url: str, concurrency: int):
+        try:
+            import httpx
+        except ImportError as e:
+            raise SystemExit("--url needs httpx: pip install httpx") from e
+
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            limits=httpx.Limits(max_connections=concurrency),
+            timeout=30.0,
+        )
+
+    async def request(self, method, path, headers=None, json_body=None) -> Response:
+        response = await self._client.request(
+            method, path, headers=headers, json=json_body
+        )
+        return response.status_code, dict(response.headers), response.content
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class State:
+    """Seeded users, their tokens and the fictions each one owns"""
+
+    def __init__(self):
+        self.users: List[dict] = []
+        self.fiction_ids: List[str] = []
+        self.owned: Dict[str, List[str]] = {}
+        self.etags: Dict[str, str] = {}
+        self.cursors: List[str] = []
+
+
+def make_fiction(rng: random.Random) -> dict:
+    # Mostly short stories with a long tail, so compression and ranged
+    # reads both get exercised
+    words = rng.choice([200, 500, 1000, 1000, 5000, 20000])
+    return {
+        "title": " ".join(rng.choices(WORDS, k=3)).title(),
+        "author": rng.choice(["Ada Vale", "Bo Reyes", "Cy Moreau", "Di Okafor"]),
+        "genre": rng.choice(GENRES),
+        "description": " ".join(rng.choices(WORDS, k=25)),
+        "content": " ".join(rng.choices(WORDS, k=words)),
+    }
+
+
+async def seed(client, users: int, fictions: int, rng: random.Random) -> State:
+    """Register users and create fictions through the API"""
+    state = State()
+    run_id = f"{int(time.time())}{rng.randrange(1000)}"
+    for i in range(users):
+        user = {
+            "username": f"bench{run_id}_{i}",
+            "email": f"bench{run_id}_{i}@example.com",
+            "password": PASSWORD,
+        }
+        status, _, body = await client.request(
+            "POST", "/api/auth/register", json_body=user
+        )
+        if status != 201:
+            raise SystemExit(f"Registering a benchmark user failed: {status} {body!r}")
+        user["token"] = json.loads(body)["token"]
+        state.users.append(user)
+        state.owned[user["username"]] = []
+
+    for i in range(fictions):
+        user = state.users[i % users]
+        status, headers, body = await client.request(
+            "POST",
+            "/api/fictions/",
+            headers={"Authorization": f"Bearer {user['token']}"},
+            json_body=make_fiction(rng),
+        )
+        if status != 201:
+            raise SystemExit(f"Seeding a fiction failed: {status} {body!r}")
+        fiction_id = json.loads(body)["_id"]
+        state.fiction_ids.append(fiction_id)
+        state.owned[user["username"]].append(fiction_id)
+        state.etags[fiction_id] = headers.get("etag", "")
+
+    return state
+
+
+def _auth(user: dict) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {user['token']}"}
+
+
+async def op_list_page(client, state: State, rng: random.Random) -> Response:
+    query = {"limit": 20}
+    if state.cursors and rng.random() < 0.5:
+        query["after"] = rng.choice(state.cursors)
+    response = await client.request("GET", f"/api/fictions/?{urlencode(query)}")
+    if response[0] == 200:
+        cursor = json.loads(response[2]).get("next_cursor")
+        if cursor and len(state.cursors) < 1000:
+            state.cursors.append(cursor)
+    return response
+
+
+async def op_search(client, state: State, rng: random.Random) -> Response:
+    query = urlencode({"q": " ".join(rng.sample(WORDS, 2)), "limit": 20})
+    return await client.request("GET", f"/api/fictions/search?{query}")
+
+
+async def op_read(client, state: State, rng: random.Random) -> Response:
+    return await client.request("GET", f"/api/fictions/{rng.choice(state.fiction_ids)}")
+
+
+async def op_read_conditional(client, state: State, rng: random.Random) -> Response:
+    fiction_id = rng.choice(state.fiction_ids)
+    response = await client.request(
+        "GET",
+        f"/api/fictions/{fiction_id}",
+        headers={"If-None-Match": state.etags.get(fiction_id, "")},
+    )
+    if response[0] == 200:
+        state.etags[fiction_id] = response[1].get("etag", "")
+    return response
+
+
+async def op_read_content(client, state: State, rng: random.Random) -> Response:
+    return await client.request(
+        "GET",
+        f"/api/fictions/{rng.choice(state.fiction_ids)}/content",
+        headers={"Range": "bytes=0-4095"},
+    )
+
+
+async def op_login(client, state: State, rng: random.Random) -> Response:
+    user = rng.choice(state.users)
+    return await client.request(
+        "POST",
+        "/api/auth/login",
+        json_body={"email": user["email"], "password": PASSWORD},
+    )
+
+
+async def op_create(client, state: State, rng: random.Random) -> Response:
+    user = rng.choice(state.users)
+    response = await client.request(
+        "POST", "/api/fictions/", headers=_auth(user), json_body=make_fiction(rng)
+    )
+    if response[0] == 201:
+        fiction_id = json.loads(response[2])["_id"]
+        state.fiction_ids.append(fiction_id)
+        state.owned[user["username"]].append(fiction_id)
+    return response
+
+
+async def op_update(client, state: State, rng: random.Random) -> Response:
+    user = rng.choice(state.users)
+    fiction_id = rng.choice(state.owned[user["username"]])
+    update = {"description": " ".join(rng.choices(WORDS, k=25))}
+    if rng.random() < 0.2:
+        update["content"] = make_fiction(rng)["content"]
+    return await client.request(
+        "PUT", f"/api/fictions/{fiction_id}", headers=_auth(user), json_body=update
+    )
+
+
+OPERATIONS: Dict[str, Callable] = {
+    "list_page": op_list_page,
+    "search": op_search,
+    "read": op_read,
+    "read_conditional": op_read_conditional,
+    "read_content": op_read_content,
+    "login": op_login,
+    "create": op_create,
+    "update": op_update,
+}
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    index = min(
+        len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1)))
+    )
+    return sorted_values[index]
+
+
+async def run_scenario(
+    client,
+    state: State,
+    mix: Dict[str, int],
+    requests: int,
+    concurrency: int,
+    seed_value: int,
+) -> dict:
+    """Run `requests` operations drawn from mix over `concurrency` workers"""
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker(worker_id: int):
+        nonlocal remaining, errors
+        rng = random.Random(seed_value * 1000 + worker_id)
+        while remaining > 0:
+            remaining -= 1
+            operation = OPERATIONS[rng.choices(names, weights)[0]]
+            start = time.perf_counter()
+            status, _, _ = await operation(client, state, rng)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": _percentile(latencies, 50) * 1e3,
+        "p95_ms": _percentile(latencies, 95) * 1e3,
+        "p99_ms": _percentile(latencies, 99) * 1e3,
+        "mean_ms": statistics.fmean(latencies) * 1e3,
+        "errors": errors,
+    }
+
+
+async def measure_allocations(
+    client, state: State, mix: Dict[str, int], requests: int, seed_value: int
+) -> dict:
+    """
+    Sequential pass under tracemalloc (kept out of the timed run)
+
+    Reports the mean per-request allocation high-water mark and the blocks
+    still held afterwards, which flags leaks and unbounded caches.
+    """
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    rng = random.Random(seed_value)
+    peaks = []
+
+    tracemalloc.start()
+    try:
+        blocks_before = len(tracemalloc.take_snapshot().traces)
+        for _ in range(requests):
+            operation = OPERATIONS[rng.choices(names, weights)[0]]
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await operation(client, state, rng)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        blocks_after = len(tracemalloc.take_snapshot().traces)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "alloc_peak_kib": statistics.fmean(peaks) / 1024,
+        "retained_blocks_per_req": (blocks_after - blocks_before) / requests,
+    }
+
+
+def _delta(current: float, baseline: Optional[float]) -> str:
+    if not baseline:
+        return ""
+    return f" ({(current - baseline) / baseline * 100:+.1f}%)"
+
+
+def report(mode: str, results: Dict[str, dict], baseline: dict) -> None:
+    print(
+        f"{'scenario':<9} {'req/s':>16} {'p50':>9} {'p95':>9} {'p99':>18} "
+        f"{'errors':>7} {'peak KiB':>9} {'blocks':>7}"
+    )
+    for name, result in results.items():
+        base = baseline.get(mode, {}).get(name, {})
+        peak = result.get("alloc_peak_kib")
+        peak = "-" if peak is None else f"{peak:.1f}"
+        blocks = result.get("retained_blocks_per_req")
+        blocks = "-" if blocks is None else f"{blocks:.1f}"
+        rps = f"{result['rps']:.0f}{_delta(result['rps'], base.get('rps'))}"
+        p99 = f"{result['p99_ms']:.2f}ms{_delta(result['p99_ms'], base.get('p99_ms'))}"
+        print(
+            f"{name:<9} {rps:>16} {result['p50_ms']:>7.2f}ms "
+            f"{result['p95_ms']:>7.2f}ms {p99:>18} {result['errors']:>7} "
+            f"{peak:>9} {blocks:>7}"
+        )
+
+
+def _configure_environment(args) -> None:
+    """Settings are read at import time, so set them before importing src"""
+    os.environ.setdefault("JWT_SECRET", "bench-secret")
+    # One request log line per call would bury the results table
+    os.environ.setdefault("LOG_SAMPLE_RATE", "0")
+    if args.mongo_uri:
+        os.environ["MONGODB_URI"] = args.mongo_uri
+        path = urlsplit(args.mongo_uri).path.strip("/")
+        if path:
+            os.environ["DB_NAME"] = path
+    else:
+        # The in-memory stand-in has no $text support
+        os.environ["SEARCH_BACKEND"] = "memory"
+
+
+async def _in_process_client(args):
+    _configure_environment(args)
+
+    from src.main import app
+    from src.config.database import Database
+    from src.middleware.rate_limiter import limiter
+    from src.utils.search import search_engine
+
+    from .memory_mongo import MemoryClient
+
+    limiter.enabled = False
+    if args.mongo_uri:
+        await Database.connect_db()
+    else:
+        Database.client = MemoryClient()
+    await search_engine.rebuild()
+    return ASGIClient(app)
+
+
+async def main(args) -> None:
+    if args.url:
+        client = HTTPClient(args.url, args.concurrency)
+        mode = "http"
+    else:
+        client = await _in_process_client(args)
+        mode = "mongo" if args.mongo_uri else "memory"
+
+    try:
+        rng = random.Random(args.seed)
+        state = await seed(client, args.users, args.fictions, rng)
+
+        results: Dict[str, dict] = {}
+        scenarios = [args.scenario] if args.scenario else list(SCENARIOS)
+        for name in scenarios:
+            mix = SCENARIOS[name]
+            requests = (
+                args.requests if name != "login" else max(50, args.requests // 20)
+            )
+            # Warm caches and the bcrypt pool before timing
+            await run_scenario(client, state, mix, requests // 10, args.concurrency, 0)
+            results[name] = await run_scenario(
+                client, state, mix, requests, args.concurrency, args.seed
+            )
+            if mode != "http" and args.alloc_requests:
+                results[name].update(
+                    await measure_allocations(
+                        client, state, mix, args.alloc_requests, args.seed
+                    )
+                )
+    finally:
+        await client.close()
+
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    print(
+        f"mode={mode} concurrency={args.concurrency} requests={args.requests} "
+        f"fictions={args.fictions}"
+    )
+    report(mode, results, {} if args.save_baseline else baseline)
+
+    if args.save_baseline:
+        baseline[mode] = {**baseline.get(mode, {}), **results}
+        BASELINE_PATH.parent.mkdir(exist_ok=True)
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Saved baseline to {BASELINE_PATH}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the fictions API")
+    parser.add_argument("--scenario", choices=list(SCENARIOS), help="run one scenario")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--fictions", type=int, default=500)
+    parser.add_argument(
+        "--alloc-requests", type=int, default=200, help="0 skips the tracemalloc pass"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--mongo-uri", help="use this mongod instead of memory_mongo")
+    parser.add_argument("--url", help="load a running server over HTTP instead")
+    parser.add_argument("--save-baseline", action="store_true")
+    asyncio.run(main(parser.parse_args()))
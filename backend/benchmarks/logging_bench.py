@@ -0,0 +1,72 @@
+"""
+Logging overhead on the calling thread
+
+Compares the time a request-log call blocks its caller with a plain
+synchronous StreamHandler (the previous basicConfig setup) against the
+queued JSON setup from src.config.logging_config, at several sample
+rates. Output goes to /dev/null, so this measures the logging path, not
+the terminal.
+
+Usage (from backend/):
+    python -m benchmarks.logging_bench --records 100000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+from src.config import logging_config
+from src.config.settings import settings
+
+
+def _time_calls(records: int) -> float:
+    """Mean microseconds per logger call"""
+    logger = logging.getLogger("bench.access")
+    logging_config.request_context.set(
+        {"request_id": "0" * 32, "scope": {}, "user_id": "bench-user"}
+    )
+    start = time.perf_counter()
+    for i in range(records):
+        logger.info(
+            "request",
+            extra={"method": "GET", "status": 200, "latency_ms": 1.5, "sample": True},
+        )
+    return (time.perf_counter() - start) / records * 1e6
+
+
+def main(records: int) -> None:
+    devnull = open(os.devnull, "w")
+    sys.stdout = devnull
+    results = []
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    logging.basicConfig(
+        level=logging.INFO,
+        format=logging_config.TEXT_FORMAT,
+        stream=devnull,
+        force=True,
+    )
+    results.append(("sync text (basicConfig)", _time_calls(records)))
+
+    for rate in (1.0, 0.1, 0.01):
+        settings.log_sample_rate = rate
+        settings.log_queue_size = records + 1  # measure enqueueing, not drops
+        logging_config.configure_logging()
+        elapsed = _time_calls(records)
+        logging_config.stop_logging()
+        results.append((f"queued json, sample {rate:g}", elapsed))
+
+    sys.stdout = sys.__stdout__
+    print(f"{'setup':<28} {'us/call':>9}")
+    for name, micros in results:
+        print(f"{name:<28} {micros:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure logging call overhead")
+    parser.add_argument("--records", type=int, default=100_000)
+    main(parser.parse_args().records)
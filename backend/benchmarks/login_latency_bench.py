@@ -0,0 +1,109 @@
+"""
+Browse latency under concurrent logins
+
+Drives the ASGI app in-process and measures GET /api/fictions/ latency
+while a burst of logins is running, with bcrypt either inline on the event
+loop (the old behaviour) or on the bounded executor.
+
+Requires MongoDB at MONGODB_URI (e.g. `docker compose up mongodb`).
+
+Usage (from backend/):
+    python -m benchmarks.login_latency_bench
+"""
+
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+from src.config.database import Database
+from src.main import app
+from src.middleware.rate_limiter import limiter
+from src.routers import auth as auth_router
+from src.utils import password
+
+LOGIN_WORKERS = 8
+BROWSE_SECONDS = 5.0
+
+
+async def _inline_verify(plain_password: str, hashed_password: str) -> bool:
+    """Old behaviour: bcrypt on the event loop"""
+    return password.verify_password(plain_password, hashed_password)
+
+
+def _percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct))]
+
+
+async def _browse(client: httpx.AsyncClient):
+    timings = []
+    deadline = time.perf_counter() + BROWSE_SECONDS
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        # Yield first, as a real network read would; time spent waiting for
+        # the event loop (e.g. behind inline bcrypt) counts as latency
+        await asyncio.sleep(0)
+        response = await client.get("/api/fictions/")
+        timings.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    return timings
+
+
+async def _login_loop(client: httpx.AsyncClient, credentials: dict, stop):
+    while not stop.is_set():
+        await client.post("/api/auth/login", json=credentials)
+        await asyncio.sleep(0)
+
+
+async def run_scenario(client, credentials, logins: bool):
+    stop = asyncio.Event()
+    workers = []
+    if logins:
+        workers = [
+            asyncio.create_task(_login_loop(client, credentials, stop))
+            for _ in range(LOGIN_WORKERS)
+        ]
+        await asyncio.sleep(0.1)
+    try:
+        return await _browse(client)
+    finally:
+        stop.set()
+        await asyncio.gather(*workers)
+
+
+async def main():
+    limiter.enabled = False
+    await Database.connect_db()
+
+    name = f"bench{uuid.uuid4().hex[:8]}"
+    credentials = {"email": f"{name}@example.com", "password": "benchmark-pw"}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        await client.post("/api/auth/register", json={"username": name, **credentials})
+
+        print(f"{'mode':<10} {'logins':<7} {'reqs':>6} {'p50 ms':>8} {'p99 ms':>8}")
+        for mode, verify in (
+            ("inline", _inline_verify),
+            ("executor", password.verify_password_async),
+        ):
+            auth_router.verify_password_async = verify
+            for logins in (False, True):
+                timings = await run_scenario(client, credentials, logins)
+                print(
+                    f"{mode:<10} {str(logins):<7} {len(timings):>6} "
+                    f"{statistics.median(timings):8.2f} "
+                    f"{_percentile(timings, 0.99):8.2f}"
+                )
+
+    await Database.get_collection("users").delete_one({"username": name})
+    await Database.close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,340 @@
+"""
+In-memory stand-in for the parts of Motor the API uses
+
+Lets the load benchmark drive the real routes without a mongod. It
+implements only the query, update and cursor features the routers issue
+(equality, $in/$ne/$lt/$lte/$gt/$gte/$exists, $or/$and, $set/$inc,
+$setOnInsert and upserts, sort/skip/limit, bulk_write, and aggregate with
+a single $group counting by one field) and is not a general Mongo emulator: text
+search is unsupported, so benchmarks run with SEARCH_BACKEND=memory.
+
+Documents are copied in and out, as a real driver would decode fresh
+dicts for every read.
+"""
+
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+import asyncio
+
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+_MISSING = object()
+
+
+def _compare(op: str, value: Any, operand: Any) -> bool:
+    if op == "$in":
+        return value in operand
+    if op == "$nin":
+        return value not in operand
+    if op == "$ne":
+        return value != operand
+    if op == "$exists":
+        return (value is not _MISSING) == bool(operand)
+    if value is _MISSING or value is None:
+        return False
+    if op == "$lt":
+        return value < operand
+    if op == "$lte":
+        return value <= operand
+    if op == "$gt":
+        return value > operand
+    if op == "$gte":
+        return value >= operand
+    raise NotImplementedError(f"Unsupported query operator {op}")
+
+
+def _is_operator_condition(condition: Any) -> bool:
+    return (
+        isinstance(condition, dict)
+        and bool(condition)
+        and all(k.startswith("$") for k in condition)
+    )
+
+
+def _field_matches(value: Any, condition: Any) -> bool:
+    """Check one field value (or _MISSING) against its filter condition"""
+    if _is_operator_condition(condition):
+        for op, operand in condition.items():
+            # Mongo treats a missing field as null for $in/$ne
+            probe = None if value is _MISSING and op != "$exists" else value
+            if not _compare(op, probe, operand):
+                return False
+        return True
+    if condition is None:
+        return value is _MISSING or value is None
+    return value == condition
+
+
+def matches(document: dict, query: dict) -> bool:
+    """Check a document against a (supported subset of a) Mongo filter"""
+    for key, condition in query.items():
+        if key == "$or":
+            matched = any(matches(document, sub) for sub in condition)
+        elif key == "$and":
+            matched = all(matches(document, sub) for sub in condition)
+        elif key.startswith("$"):
+            raise NotImplementedError(f"Unsupported query operator {key}")
+        else:
+            matched = _field_matches(document.get(key, _MISSING), condition)
+        if not matched:
+            return False
+    return True
+
+
+def _project(document: dict, projection: Optional[dict]) -> dict:
+    if not projection:
+        return dict(document)
+    included = [k for k, v in projection.items() if v == 1 or v is True]
+    if not included:
+        excluded = {k for k, v in projection.items() if v in (0, False)}
+        return {k: v for k, v in document.items() if k not in excluded}
+    result = {"_id": document["_id"]} if projection.get("_id", 1) else {}
+    for key in included:
+        if key in document:
+            result[key] = document[key]
+    return result
+
+
+def _apply_update(document: dict, update: dict) -> None:
+    for op, fields in update.items():
+        if op == "$set":
+            document.update(fields)
+        elif op == "$inc":
+            for key, amount in fields.items():
+                document[key] = (document.get(key) or 0) + amount
+        elif op == "$unset":
+            for key in fields:
+                document.pop(key, None)
+        elif op == "$setOnInsert":
+            pass  # applied by _upsert only
+        else:
+            raise NotImplementedError(f"Unsupported update operator {op}")
+
+
+def _sort_key(field: str):
+    def key(document: dict):
+        value = document.get(field)
+        # Missing/None sorts first, as in Mongo
+        return (value is not None, value if value is not None else 0)
+
+    return key
+
+
+class MemoryCursor:
+    """Chainable, async-iterable cursor over a snapshot of matches"""
+
+    def __init__(self, documents: List[dict], projection: Optional[dict]):
+        self._documents = documents
+        self._projection = projection
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list: Union[str, List[Tuple[str, Any]]], direction: int = 1):
+        spec = (
+            [(key_or_list, direction)] if isinstance(key_or_list, str) else key_or_list
+        )
+        for field, order in reversed(spec):
+            if isinstance(order, dict):
+                raise NotImplementedError("Only plain field sorts are supported")
+            self._documents.sort(key=_sort_key(field), reverse=order < 0)
+        return self
+
+    def skip(self, count: int):
+        self._skip = count
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int):
+        return self
+
+    def _results(self) -> List[dict]:
+        start = self._skip
+        end = start + self._limit if self._limit else None
+        return [_project(doc, self._projection) for doc in self._documents[start:end]]
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        await asyncio.sleep(0)
+        results = self._results()
+        return results[:length] if length else results
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self._results():
+            await asyncio.sleep(0)
+            yield document
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCollection:
+    """Dict-backed collection keyed by _id"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._documents: Dict[Any, dict] = {}
+
+    def with_options(self, **options):
+        return self
+
+    def _matching(self, query: dict) -> Iterable[dict]:
+        if set(query) == {"_id"} and not isinstance(query["_id"], dict):
+            document = self._documents.get(query["_id"])
+            return [document] if document is not None else []
+        return [doc for doc in self._documents.values() if matches(doc, query)]
+
+    def find(self, query: Optional[dict] = None, projection: Optional[dict] = None):
+        return MemoryCursor(list(self._matching(query or {})), projection)
+
+    async def find_one(self, query: Optional[dict] = None, projection=None):
+        await asyncio.sleep(0)
+        for document in self._matching(query or {}):
+            return _project(document, projection)
+        return None
+
+    def aggregate(self, pipeline: List[dict]):
+        """Only [{"$group": {"_id": "$field", "count": {"$sum": 1}}}]"""
+        if len(pipeline) != 1 or set(pipeline[0]) != {"$group"}:
+            raise NotImplementedError(f"Unsupported pipeline {pipeline!r}")
+        group = pipeline[0]["$group"]
+        field = group["_id"][1:]
+        (output,) = set(group) - {"_id"}
+        counts: Dict[Any, int] = {}
+        for document in self._documents.values():
+            key = document.get(field)
+            counts[key] = counts.get(key, 0) + 1
+        rows = [{"_id": key, output: count} for key, count in counts.items()]
+        return MemoryCursor(rows, None)
+
+    async def count_documents(self, query: dict, limit: int = 0) -> int:
+        await asyncio.sleep(0)
+        count = len(list(self._matching(query)))
+        return min(count, limit) if limit else count
+
+    def _insert(self, document: dict) -> None:
+        if document["_id"] in self._documents:
+            raise DuplicateKeyError(f"Duplicate _id {document['_id']}")
+        self._documents[document["_id"]] = dict(document)
+
+    def _update(self, query: dict, update: dict) -> Optional[dict]:
+        for document in self._matching(query):
+            _apply_update(document, update)
+            return document
+        return None
+
+    def _upsert(self, query: dict, update: dict) -> Optional[dict]:
+        """Update the first match, or insert from equality fields of the query"""
+        updated = self._update(query, update)
+        if updated is not None:
+            return updated
+        document = {k: v for k, v in query.items() if not k.startswith("$")}
+        document.update(update.get("$setOnInsert", {}))
+        _apply_update(document, update)
+        self._insert(document)
+        return None
+
+    def _delete(self, query: dict, many: bool = False) -> int:
+        removed = 0
+        for document in list(self._matching(query)):
+            del self._documents[document["_id"]]
+            removed += 1
+            if not many:
+                break
+        return removed
+
+    async def insert_one(self, document: dict):
+        await asyncio.sleep(0)
+        self._insert(document)
+        return SimpleNamespace(inserted_id=document["_id"], acknowledged=True)
+
+    async def insert_many(self, documents: List[dict], ordered: bool = True):
+        await asyncio.sleep(0)
+        for document in documents:
+            self._insert(document)
+        return SimpleNamespace(inserted_ids=[d["_id"] for d in documents])
+
+    async def update_one(self, query: dict, update: dict):
+        await asyncio.sleep(0)
+        updated = self._update(query, update)
+        count = 1 if updated is not None else 0
+        return SimpleNamespace(matched_count=count, modified_count=count)
+
+    async def find_one_and_update(
+        self,
+        query: dict,
+        update: dict,
+        projection: Optional[dict] = None,
+        return_document: bool = ReturnDocument.BEFORE,
+    ):
+        await asyncio.sleep(0)
+        matched = next(iter(self._matching(query)), None)
+        if matched is None:
+            return None
+        before = _project(matched, projection)
+        _apply_update(matched, update)
+        if return_document == ReturnDocument.AFTER:
+            return _project(matched, projection)
+        return before
+
+    async def find_one_and_delete(self, query: dict, projection: Optional[dict] = None):
+        await asyncio.sleep(0)
+        matched = next(iter(self._matching(query)), None)
+        if matched is None:
+            return None
+        del self._documents[matched["_id"]]
+        return _project(matched, projection)
+
+    async def delete_one(self, query: dict):
+        await asyncio.sleep(0)
+        return SimpleNamespace(deleted_count=self._delete(query))
+
+    async def bulk_write(self, requests: list, ordered: bool = True):
+        await asyncio.sleep(0)
+        totals = {"nInserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0}
+        for request in requests:
+            if isinstance(request, InsertOne):
+                self._insert(request._doc)
+                totals["nInserted"] += 1
+            elif isinstance(request, UpdateOne):
+                update = self._upsert if request._upsert else self._update
+                if update(request._filter, request._doc) is not None:
+                    totals["nMatched"] += 1
+                    totals["nModified"] += 1
+            elif isinstance(request, DeleteOne):
+                totals["nRemoved"] += self._delete(request._filter)
+            elif isinstance(request, DeleteMany):
+                totals["nRemoved"] += self._delete(request._filter, many=True)
+            else:
+                raise NotImplementedError(f"Unsupported bulk operation {request!r}")
+        return SimpleNamespace(bulk_api_result=totals)
+
+
+class MemoryDatabase:
+    def __init__(self):
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(name)
+        return self._collections[name]
+
+
+class MemoryClient:
+    """Drop-in for AsyncIOMotorClient as far as Database needs"""
+
+    def __init__(self):
+        self._databases: Dict[str, MemoryDatabase] = {}
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        if name not in self._databases:
+            self._databases[name] = MemoryDatabase()
+        return self._databases[name]
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,60 @@
+"""
+Search engine benchmark
+
+Measures in-memory search latency as the collection grows, to check that
+query cost tracks the number of matches rather than collection size.
+
+Usage (from backend/):
+    python -m benchmarks.search_bench
+"""
+
+import random
+import statistics
+import time
+
+from src.utils.search import InMemorySearchEngine
+
+WORDS = [f"word{i}" for i in range(5000)]
+RARE_QUERY = "lighthouse keeper"
+
+
+def make_fiction(i: int, rng: random.Random) -> dict:
+    """Build a synthetic fiction; roughly 1 in 1000 mentions the rare query"""
+    title = " ".join(rng.choices(WORDS, k=4))
+    if i % 1000 == 0:
+        title += " lighthouse keeper"
+    return {
+        "_id": f"{i:024x}",
+        "title": title,
+        "author": rng.choice(WORDS),
+        "genre": rng.choice(["fantasy", "sci-fi", "mystery"]),
+        "description": " ".join(rng.choices(WORDS, k=30)),
+    }
+
+
+def bench(size: int, queries: int = 200) -> None:
+    rng = random.Random(size)
+    engine = InMemorySearchEngine()
+
+    start = time.perf_counter()
+    for i in range(size):
+        engine.add(make_fiction(i, rng))
+    build_s = time.perf_counter() - start
+
+    for label, query in (("rare", RARE_QUERY), ("common", "word1 word2")):
+        timings = []
+        for _ in range(queries):
+            start = time.perf_counter()
+            engine.query(query, None, 20, 0)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        print(
+            f"{size:>8} docs  {label:<6}  build {build_s:6.2f}s  "
+            f"p50 {statistics.median(timings):7.3f}ms  "
+            f"p99 {timings[int(len(timings) * 0.99) - 1]:7.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    for size in (1_000, 10_000, 100_000):
+        bench(size)
@@ -0,0 +1,88 @@
+"""
+List serialization microbenchmark
+
+Times turning a page of stored fiction summaries into response bytes for
+get_all_fictions along three paths:
+
+- validated+json:   response_model validation, then the stdlib JSON encoder
+                    (FastAPI's default behaviour before this change)
+- validated+orjson: response_model validation, then orjson
+- trusted+orjson:   TrustedJSONResponse, no re-validation
+
+Usage (from backend/):
+    python -m benchmarks.serialization_bench
+"""
+
+import asyncio
+import time
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from src.models.fiction import SUMMARY_FIELDS, FictionPage
+from src.utils.responses import TrustedJSONResponse
+
+SIZES = (10, 100, 1000)
+
+page_field = create_response_field(name="Response_get_all_fictions", type_=FictionPage)
+
+
+def make_page(size: int) -> dict:
+    now = datetime.utcnow().isoformat()
+    doc = {
+        "title": "The Great Adventure",
+        "author": "John Doe",
+        "genre": "fantasy",
+        "description": "An epic tale of adventure " * 10,
+        "created_by": str(ObjectId()),
+        "created_at": now,
+        "updated_at": now,
+    }
+    items = [
+        {"_id": str(ObjectId()), **{f: doc[f] for f in SUMMARY_FIELDS}}
+        for _ in range(size)
+    ]
+    return {"items": items, "next_cursor": "cursor"}
+
+
+async def validated(page: dict, response_class) -> bytes:
+    content = await serialize_response(
+        field=page_field, response_content=page, exclude_unset=True
+    )
+    return response_class(content).body
+
+
+async def trusted(page: dict) -> bytes:
+    return TrustedJSONResponse(page).body
+
+
+async def _time(coro_factory, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await coro_factory()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def main():
+    print(
+        f"{'docs':>6} {'validated+json':>16} {'validated+orjson':>18} {'trusted+orjson':>16}"
+    )
+    for size in SIZES:
+        page = make_page(size)
+        iterations = max(20, 20_000 // size)
+        results = [
+            await _time(lambda: validated(page, JSONResponse), iterations),
+            await _time(lambda: validated(page, ORJSONResponse), iterations),
+            await _time(lambda: trusted(page), iterations),
+        ]
+        print(
+            f"{size:>6} {results[0]:>14.1f}us {results[1]:>16.1f}us "
+            f"{results[2]:>14.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
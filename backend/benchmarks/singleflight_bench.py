@@ -0,0 +1,113 @@
+"""
+Request coalescing check
+
+Fires bursts of identical concurrent requests at the real routes (in
+process, on the in-memory Mongo stand-in) and counts the MongoDB queries
+each burst causes, with coalescing on and off:
+
+- GET /api/fictions/{id} on a cold cache
+- GET /api/fictions/{id}?fields=title,author (never cached)
+- GET /api/fictions/ (first page) on a cold cache
+
+Every query is given a simulated round trip (--latency-ms) so requests
+overlap the way they do against a real server. Exits non-zero unless
+each coalesced burst made exactly one query.
+
+Usage (from backend/):
+    python -m benchmarks.singleflight_bench --burst 200
+"""
+
+from types import SimpleNamespace
+import argparse
+import asyncio
+import random
+import time
+
+from .load_bench import _in_process_client, seed
+
+
+def _count_queries(collection, counts: dict, latency: float) -> None:
+    """Wrap find_one / find on a memory collection to count and delay them"""
+    find_one = collection.find_one
+    find = collection.find
+
+    async def counted_find_one(*args, **kwargs):
+        counts["queries"] += 1
+        await asyncio.sleep(latency)
+        return await find_one(*args, **kwargs)
+
+    def counted_find(*args, **kwargs):
+        counts["queries"] += 1
+        cursor = find(*args, **kwargs)
+        to_list = cursor.to_list
+
+        async def delayed_to_list(length=None):
+            await asyncio.sleep(latency)
+            return await to_list(length)
+
+        cursor.to_list = delayed_to_list
+        return cursor
+
+    collection.find_one = counted_find_one
+    collection.find = counted_find
+
+
+async def _burst(client, path: str, size: int, counts: dict, before=None) -> tuple:
+    """Send `size` identical requests at once; return (queries, seconds)"""
+    if before:
+        before()
+    counts["queries"] = 0
+    start = time.perf_counter()
+    responses = await asyncio.gather(
+        *(client.request("GET", path) for _ in range(size))
+    )
+    elapsed = time.perf_counter() - start
+    bad = [status for status, _, _ in responses if status != 200]
+    if bad:
+        raise SystemExit(f"{path}: unexpected statuses {sorted(set(bad))}")
+    return counts["queries"], elapsed
+
+
+async def main(args) -> None:
+    client = await _in_process_client(SimpleNamespace(mongo_uri=None))
+
+    from src.config.database import Database
+    from src.config.settings import settings
+    from src.utils.cache import fiction_cache, list_cache
+
+    state = await seed(client, 2, 20, random.Random(1))
+    fiction_id = state.fiction_ids[0]
+
+    counts = {"queries": 0}
+    fictions = Database.client[settings.db_name]["fictions"]
+    _count_queries(fictions, counts, args.latency_ms / 1000)
+
+    cases = [
+        ("get (cold cache)", f"/api/fictions/{fiction_id}", fiction_cache.clear),
+        ("get ?fields", f"/api/fictions/{fiction_id}?fields=title,author", None),
+        ("list (cold cache)", "/api/fictions/", list_cache.clear),
+    ]
+
+    print(f"{args.burst} concurrent identical requests per burst")
+    print(f"{'request':<18} {'coalescing':>10} {'queries':>8} {'burst ms':>9}")
+    failed = False
+    for name, path, before in cases:
+        for enabled in (False, True):
+            settings.singleflight_enabled = enabled
+            queries, elapsed = await _burst(client, path, args.burst, counts, before)
+            print(
+                f"{name:<18} {'on' if enabled else 'off':>10} "
+                f"{queries:>8} {elapsed * 1000:>9.1f}"
+            )
+            if enabled and queries != 1:
+                failed = True
+
+    if failed:
+        raise SystemExit("A coalesced burst made more than one query")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check request coalescing")
+    parser.add_argument("--burst", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    asyncio.run(main(parser.parse_args()))
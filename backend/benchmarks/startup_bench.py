@@ -0,0 +1,98 @@
+"""
+Cold start profile
+
+Reports where a new worker spends its time before it can serve:
+
+- import time of src.main, broken down by top-level package
+  (python -X importtime in a fresh interpreter)
+- OpenAPI schema generation versus loading the prebuilt file
+
+Lifespan phases (Mongo connect and pool warm-up, search index build) are
+logged by the app itself on startup ("... ready in ...").
+
+Usage (from backend/):
+    python -m benchmarks.startup_bench
+    python -m benchmarks.startup_bench --top 25
+"""
+
+from collections import defaultdict
+from pathlib import Path
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def import_profile() -> dict:
+    """Import time (us) of src.main, summed per top-level package"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    packages = defaultdict(int)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = (part.strip() for part in line[12:].split("|"))
+        if not self_us.isdigit():
+            continue  # header line
+        # Self time, so nested imports are not counted twice
+        packages[name.split(".")[0]] += int(self_us)
+    return dict(packages)
+
+
+def wall_import_time(runs: int = 3) -> float:
+    """Best-of-N wall time to start an interpreter and import src.main"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import src.main"], check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def openapi_times() -> tuple:
+    from fastapi import FastAPI
+
+    from src.main import app
+    from src.openapi import install_prebuilt_openapi, write_prebuilt_openapi
+
+    app.openapi_schema = None
+    start = time.perf_counter()
+    FastAPI.openapi(app)
+    generated = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "openapi.json"
+        write_prebuilt_openapi(app, path)
+        app.openapi_schema = None
+        install_prebuilt_openapi(app, path)
+        start = time.perf_counter()
+        app.openapi()
+        prebuilt = time.perf_counter() - start
+
+    return generated, prebuilt
+
+
+def main(top: int) -> None:
+    print(f"python -c 'import src.main' (best of 3): {wall_import_time() * 1000:.0f}ms")
+
+    packages = import_profile()
+    print(f"\n{'package':<28} {'import ms':>10}")
+    for name, micros in sorted(packages.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"{name:<28} {micros / 1000:>10.1f}")
+
+    generated, prebuilt = openapi_times()
+    print(
+        f"\nOpenAPI schema: generated {generated * 1000:.1f}ms, "
+        f"prebuilt {prebuilt * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile cold start")
+    parser.add_argument("--top", type=int, default=15)
+    main(parser.parse_args().top)
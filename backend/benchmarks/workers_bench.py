@@ -0,0 +1,114 @@
+"""
+Worker scaling benchmark
+
+Starts the production launcher (src.server) with 1, 2, 4, ... workers up
+to the CPUs available and drives each over HTTP with a load_bench
+scenario, to check that throughput grows with cores. Needs a reachable
+mongod (MONGODB_URI, use a throwaway database) and httpx.
+
+Usage (from backend/):
+    MONGODB_URI=mongodb://localhost:27017/fictions_bench \\
+        python -m benchmarks.workers_bench --scenario read
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+
+from src.server import default_workers
+
+from .load_bench import SCENARIOS, HTTPClient, run_scenario, seed
+
+PORT = 3900
+
+
+def _worker_counts(limit: int):
+    count = 1
+    while count < limit:
+        yield count
+        count *= 2
+    yield limit
+
+
+def _wait_ready(url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/ready", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"Server at {url} did not become ready")
+
+
+async def _drive(url: str, args, concurrency: int) -> dict:
+    client = HTTPClient(url, concurrency)
+    try:
+        state = await seed(client, 4, args.fictions, random.Random(1))
+        mix = SCENARIOS[args.scenario]
+        await run_scenario(client, state, mix, args.requests // 10, concurrency, 0)
+        return await run_scenario(client, state, mix, args.requests, concurrency, 1)
+    finally:
+        await client.close()
+
+
+def main(args) -> None:
+    env = {
+        **os.environ,
+        # Limits are not what is being measured
+        "API_RATE_LIMIT": "1000000/minute",
+        "AUTH_RATE_LIMIT": "1000000/minute",
+        "RATE_LIMIT_MAX_REQUESTS": "1000000",
+        "METRICS_ENABLED": "false",
+    }
+    url = f"http://127.0.0.1:{PORT}"
+
+    print(f"{'workers':>7} {'req/s':>9} {'p50':>9} {'p99':>9} {'speedup':>8}")
+    single = None
+    for workers in _worker_counts(args.max_workers or default_workers()):
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "src.server",
+                "--workers",
+                str(workers),
+                "--host",
+                "127.0.0.1",
+                "--port",
+                str(PORT),
+            ],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            _wait_ready(url)
+            # Enough connections to keep every worker busy
+            result = asyncio.run(_drive(url, args, args.concurrency * workers))
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+
+        single = single or result["rps"]
+        print(
+            f"{workers:>7} {result['rps']:>9.0f} {result['p50_ms']:>7.2f}ms "
+            f"{result['p99_ms']:>7.2f}ms {result['rps'] / single:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure throughput per worker count")
+    parser.add_argument("--scenario", choices=list(SCENARIOS), default="read")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16, help="per worker")
+    parser.add_argument("--fictions", type=int, default=200)
+    parser.add_argument("--max-workers", type=int, default=0)
+    main(parser.parse_args())
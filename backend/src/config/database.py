@@ -3,31 +3,173 @@ Database connection and configuration
 """
 
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import ConnectionFailure
+from pymongo import monitoring
+from pymongo.errors import ConnectionFailure, PyMongoError
+from pymongo.read_preferences import (
+    Nearest,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+)
+from typing import Dict, Optional
+import asyncio
 import logging
+import threading
 
 from .settings import settings
+from ..utils.metrics import mongo_event_listeners
 
 logger = logging.getLogger(__name__)
 
+READ_PREFERENCES = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Open and checked-out connection counts per server, for /ready"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._servers: Dict[str, Dict[str, int]] = {}
+
+    def _bump(self, event, key: str, amount: int = 1) -> None:
+        address = "%s:%s" % event.address
+        with self._lock:
+            server = self._servers.setdefault(
+                address, {"open": 0, "checked_out": 0, "checkout_failures": 0}
+            )
+            server[key] += amount
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {address: dict(server) for address, server in self._servers.items()}
+
+    def connection_created(self, event) -> None:
+        self._bump(event, "open")
+
+    def connection_closed(self, event) -> None:
+        self._bump(event, "open", -1)
+
+    def connection_checked_out(self, event) -> None:
+        self._bump(event, "checked_out")
+
+    def connection_checked_in(self, event) -> None:
+        self._bump(event, "checked_out", -1)
+
+    def connection_check_out_failed(self, event) -> None:
+        self._bump(event, "checkout_failures")
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_check_out_started(self, event) -> None:
+        pass
+
+
+def _client_options() -> dict:
+    """
+    Pool, timeout and compression options for the Mongo client
+
+    Pool sizes are per pod, so each worker process gets its share.
+    """
+    max_pool = settings.per_worker(settings.mongo_max_pool_size)
+    min_pool = settings.mongo_min_pool_size
+    if min_pool > 0:
+        min_pool = settings.per_worker(min_pool)
+        if max_pool > 0:  # 0 is an unbounded pool
+            min_pool = min(min_pool, max_pool)
+    options = {
+        "maxPoolSize": max_pool,
+        "minPoolSize": min_pool,
+        "maxIdleTimeMS": settings.mongo_max_idle_time_ms,
+        "waitQueueTimeoutMS": settings.mongo_wait_queue_timeout_ms,
+        "connectTimeoutMS": settings.mongo_connect_timeout_ms,
+        "serverSelectionTimeoutMS": settings.mongo_server_selection_timeout_ms,
+        "socketTimeoutMS": settings.mongo_socket_timeout_ms,
+    }
+    if settings.mongo_compressors:
+        options["compressors"] = settings.mongo_compressors
+        options["zlibCompressionLevel"] = settings.mongo_zlib_compression_level
+    return options
+
+
+def _secondary_read_preference():
+    """Read preference for operations allowed to read from secondaries"""
+    mode = READ_PREFERENCES.get(settings.mongo_read_preference)
+    if mode is None:
+        return None
+    return mode(max_staleness=settings.mongo_max_staleness_seconds)
+
 
 class Database:
     """MongoDB database connection manager"""
 
     client: AsyncIOMotorClient = None
+    pool_stats: PoolStats = PoolStats()
+    _routed: Dict[str, object] = {}
 
     @classmethod
     async def connect_db(cls):
-        """Connect to MongoDB"""
+        """Connect to MongoDB and open min_pool_size connections up front"""
         try:
-            cls.client = AsyncIOMotorClient(settings.mongodb_uri)
+            cls.pool_stats = PoolStats()
+            cls._routed = {}
+            listeners = [cls.pool_stats]
+            if settings.metrics_enabled:
+                listeners += mongo_event_listeners()
+            cls.client = AsyncIOMotorClient(
+                settings.mongodb_uri, event_listeners=listeners, **_client_options()
+            )
             # Verify connection
             await cls.client.admin.command("ping")
             logger.info(f"Connected to MongoDB at {settings.mongodb_uri}")
+            await cls.warm_pool()
         except ConnectionFailure as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
+            cls._discard_client()
+            raise
+        except BaseException:
+            cls._discard_client()
             raise
 
+    @classmethod
+    def _discard_client(cls):
+        """Close a client whose connect failed (it owns a pool and monitors)"""
+        if cls.client is not None:
+            cls.client.close()
+            cls.client = None
+
+    @classmethod
+    async def warm_pool(cls):
+        """
+        Open min_pool_size connections before serving traffic
+
+        pymongo fills minPoolSize in the background; concurrent pings make
+        the first requests after a scale-up find connections ready instead
+        of paying for TCP/TLS handshakes.
+        """
+        count = _client_options()["minPoolSize"]
+        if count <= 0:
+            return
+        await asyncio.gather(*(cls.client.admin.command("ping") for _ in range(count)))
+        logger.info(f"Warmed MongoDB pool with {count} connections")
+
     @classmethod
     async def close_db(cls):
         """Close MongoDB connection"""
@@ -43,10 +185,55 @@ class Database:
         return cls.client[settings.db_name]
 
     @classmethod
-    def get_collection(cls, name: str):
-        """Get collection from database"""
+    def get_collection(cls, name: str, operation: Optional[str] = None):
+        """
+        Get collection from database
+
+        Args:
+            name: Collection name
+            operation: Read operation name; those listed in
+                mongo_secondary_read_operations use mongo_read_preference
+
+        Returns:
+            Collection, routed to secondaries when the operation allows it
+        """
         db = cls.get_database()
-        return db[name]
+        if operation not in settings.mongo_secondary_read_operations:
+            return db[name]
+
+        read_preference = _secondary_read_preference()
+        if read_preference is None:
+            return db[name]
+
+        routed = cls._routed.get(name)
+        if routed is None:
+            routed = db[name].with_options(read_preference=read_preference)
+            cls._routed[name] = routed
+        return routed
+
+    @classmethod
+    async def readiness(cls) -> dict:
+        """
+        Ping the primary and report pool statistics
+
+        Returns:
+            Dict with `ready` and per-server pool counts
+        """
+        pool = {
+            "max_pool_size": _client_options()["maxPoolSize"],
+            "servers": cls.pool_stats.snapshot(),
+        }
+        if not cls.client:
+            return {"ready": False, "pool": pool}
+        try:
+            await asyncio.wait_for(
+                cls.client.admin.command("ping"),
+                timeout=settings.mongo_ready_timeout_ms / 1000,
+            )
+        except (PyMongoError, asyncio.TimeoutError) as e:
+            logger.warning(f"Readiness ping failed: {e}")
+            return {"ready": False, "pool": pool}
+        return {"ready": True, "pool": pool}
 
 
 # Convenience functions
@@ -60,6 +247,11 @@ def get_users_collection():
     return Database.get_collection("users")
 
 
-def get_fictions_collection():
-    """Get fictions collection"""
-    return Database.get_collection("fictions")
+def get_stats_collection():
+    """Get stats collection"""
+    return Database.get_collection("stats")
+
+
+def get_fictions_collection(operation: Optional[str] = None):
+    """Get fictions collection (optionally routed for a read operation)"""
+    return Database.get_collection("fictions", operation)
@@ -0,0 +1,311 @@
+"""
+Declarative MongoDB index registry
+
+Indexes required by the API are declared here. Application startup
+creates missing ones and only reports mismatched ones: dropping and
+rebuilding an index (possibly a unique one) is left to an explicit run of
+the migration command, so workers starting together never race on it.
+
+    python -m src.config.indexes            # report only
+    python -m src.config.indexes --apply    # create missing, rebuild mismatched
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+import argparse
+import asyncio
+import logging
+
+from pymongo import ASCENDING, DESCENDING, TEXT
+from pymongo.errors import OperationFailure
+
+from .database import Database
+from ..utils.search import TEXT_WEIGHTS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """A single index declaration"""
+
+    name: str
+    keys: List[Tuple[str, Union[int, str]]]
+    unique: bool = False
+    weights: Optional[Dict[str, int]] = None
+
+    def matches(self, existing: dict) -> bool:
+        """Check whether an index returned by list_indexes matches this spec"""
+        if bool(existing.get("unique", False)) != bool(self.unique):
+            return False
+
+        if self.weights is not None:
+            # Text indexes are reported as {_fts: "text", _ftsx: 1} plus weights
+            return existing.get("weights") == self.weights
+
+        existing_keys = [(k, int(v)) for k, v in existing["key"].items()]
+        return existing_keys == list(self.keys)
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    """A query shape served by the API that must be index-backed"""
+
+    name: str
+    collection: str
+    filter: dict
+    sort: List[Tuple[str, int]] = field(default_factory=list)
+
+
+INDEXES: Dict[str, List[IndexSpec]] = {
+    "users": [
+        IndexSpec("email_unique", [("email", ASCENDING)], unique=True),
+        IndexSpec("username_unique", [("username", ASCENDING)], unique=True),
+    ],
+    "fictions": [
+        # Keyset pagination of the list endpoint; also serves created_at lookups
+        IndexSpec("created_at_id", [("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexSpec("created_by", [("created_by", ASCENDING)]),
+        IndexSpec(
+            "genre_created_at_id",
+            [("genre", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        ),
+        IndexSpec(
+            "text_search",
+            [("title", TEXT), ("author", TEXT), ("description", TEXT)],
+            weights=TEXT_WEIGHTS,
+        ),
+    ],
+    "stats": [
+        # Genre counts and top authors/users for the stats endpoint
+        IndexSpec(
+            "kind_count_key",
+            [("kind", ASCENDING), ("count", DESCENDING), ("key", ASCENDING)],
+        ),
+    ],
+}
+
+
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery("login", "users", {"email": "user@example.com"}),
+    HotQuery(
+        "register",
+        "users",
+        {"$or": [{"email": "user@example.com"}, {"username": "user"}]},
+    ),
+    HotQuery(
+        "list_fictions",
+        "fictions",
+        {},
+        [("created_at", DESCENDING), ("_id", DESCENDING)],
+    ),
+    HotQuery(
+        "list_fictions_by_genre",
+        "fictions",
+        {"genre": "fantasy"},
+        [("created_at", DESCENDING), ("_id", DESCENDING)],
+    ),
+    HotQuery("fictions_by_owner", "fictions", {"_id": "x", "created_by": "user123"}),
+    HotQuery("fictions_of_user", "fictions", {"created_by": "user123"}),
+    HotQuery("search_fictions", "fictions", {"$text": {"$search": "dragon"}}),
+    HotQuery(
+        "stats_by_kind",
+        "stats",
+        {"kind": "genre", "count": {"$gt": 0}},
+        [("count", DESCENDING), ("key", ASCENDING)],
+    ),
+]
+
+
+@dataclass
+class IndexReport:
+    """Differences between the registry and the server"""
+
+    missing: List[Tuple[str, str]] = field(default_factory=list)
+    mismatched: List[Tuple[str, str]] = field(default_factory=list)
+    extra: List[Tuple[str, str]] = field(default_factory=list)
+    collscans: List[str] = field(default_factory=list)
+
+
+async def diff_indexes() -> IndexReport:
+    """
+    Compare declared indexes with those present on the server
+
+    Returns:
+        IndexReport with missing, mismatched and extra indexes
+    """
+    report = IndexReport()
+
+    for collection_name, specs in INDEXES.items():
+        collection = Database.get_collection(collection_name)
+        existing = {}
+        async for index in collection.list_indexes():
+            existing[index["name"]] = index
+
+        declared = {spec.name for spec in specs}
+
+        for spec in specs:
+            if spec.name not in existing:
+                report.missing.append((collection_name, spec.name))
+            elif not spec.matches(existing[spec.name]):
+                report.mismatched.append((collection_name, spec.name))
+
+        for name in existing:
+            if name != "_id_" and name not in declared:
+                report.extra.append((collection_name, name))
+
+    return report
+
+
+def _has_collscan(plan: dict) -> bool:
+    """Walk an explain() plan tree looking for a COLLSCAN stage"""
+    if plan.get("stage") == "COLLSCAN":
+        return True
+    children = list(plan.get("inputStages", []))
+    if "inputStage" in plan:
+        children.append(plan["inputStage"])
+    return any(_has_collscan(child) for child in children)
+
+
+async def find_collscans() -> List[str]:
+    """
+    Explain every hot query and report those that fall back to COLLSCAN
+
+    Returns:
+        Names of hot queries whose winning plan contains a COLLSCAN
+    """
+    collscans = []
+
+    for query in HOT_QUERIES:
+        cursor = Database.get_collection(query.collection).find(query.filter)
+        if query.sort:
+            cursor = cursor.sort(query.sort)
+        explain = await cursor.explain()
+        winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        if _has_collscan(winning_plan):
+            collscans.append(query.name)
+
+    return collscans
+
+
+def _registry() -> Dict[Tuple[str, str], IndexSpec]:
+    """Declared specs keyed by (collection, index name)"""
+    return {
+        (collection_name, spec.name): spec
+        for collection_name, collection_specs in INDEXES.items()
+        for spec in collection_specs
+    }
+
+
+async def _create_index(collection_name: str, spec: IndexSpec) -> None:
+    options = {"name": spec.name, "unique": spec.unique}
+    if spec.weights is not None:
+        options["weights"] = spec.weights
+    try:
+        await Database.get_collection(collection_name).create_index(
+            spec.keys, **options
+        )
+        logger.info(f"Created index {collection_name}.{spec.name}")
+    except OperationFailure as e:
+        logger.error(f"Failed to create index {collection_name}.{spec.name}: {e}")
+
+
+async def _drop_index(collection_name: str, name: str, reason: str) -> None:
+    try:
+        await Database.get_collection(collection_name).drop_index(name)
+        logger.info(f"Dropped {reason} index {collection_name}.{name}")
+    except OperationFailure as e:
+        logger.error(f"Failed to drop index {collection_name}.{name}: {e}")
+
+
+def _indexes_to_rebuild(
+    report: IndexReport, rebuild_mismatched: bool
+) -> List[Tuple[str, str]]:
+    """Mismatched indexes to drop and recreate; only reported otherwise"""
+    if rebuild_mismatched:
+        return report.mismatched
+    if report.mismatched:
+        logger.warning(
+            f"Indexes differ from the registry: {report.mismatched}; "
+            "rebuild them with python -m src.config.indexes --apply"
+        )
+    return []
+
+
+async def ensure_indexes(
+    rebuild_mismatched: bool = False, drop_extra: bool = False
+) -> IndexReport:
+    """
+    Create missing indexes, and optionally rebuild mismatched ones
+
+    Failures are logged per index so one bad index (e.g. a unique index
+    over existing duplicates) does not prevent startup.
+
+    Args:
+        rebuild_mismatched: Drop and recreate indexes whose definition
+            differs from the registry (CLI --apply only); otherwise they
+            are reported
+        drop_extra: Also drop indexes that are not declared in the registry
+
+    Returns:
+        IndexReport describing the state before reconciliation
+    """
+    report = await diff_indexes()
+    specs = _registry()
+    rebuild = _indexes_to_rebuild(report, rebuild_mismatched)
+
+    for collection_name, name in rebuild:
+        await _drop_index(collection_name, name, "mismatched")
+    for collection_name, name in report.missing + rebuild:
+        await _create_index(collection_name, specs[(collection_name, name)])
+
+    if drop_extra:
+        for collection_name, name in report.extra:
+            await _drop_index(collection_name, name, "undeclared")
+    elif report.extra:
+        logger.warning(f"Undeclared indexes present: {report.extra}")
+
+    return report
+
+
+async def _main(apply: bool, drop_extra: bool) -> int:
+    """Run the index report (and optionally reconciliation) from the CLI"""
+    await Database.connect_db()
+    try:
+        if apply:
+            await ensure_indexes(rebuild_mismatched=True, drop_extra=drop_extra)
+
+        report = await diff_indexes()
+        report.collscans = await find_collscans()
+
+        for label, entries in (
+            ("Missing", report.missing),
+            ("Mismatched", report.mismatched),
+            ("Extra", report.extra),
+        ):
+            for collection_name, name in entries:
+                print(f"{label}: {collection_name}.{name}")
+        for name in report.collscans:
+            print(f"COLLSCAN: {name}")
+
+        if not (report.missing or report.mismatched or report.collscans):
+            print("All declared indexes present; no hot query uses COLLSCAN")
+            return 0
+        return 1
+    finally:
+        await Database.close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report or reconcile indexes")
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="create missing and rebuild mismatched indexes first",
+    )
+    parser.add_argument(
+        "--drop-extra", action="store_true", help="drop undeclared indexes"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(asyncio.run(_main(args.apply, args.drop_extra)))
@@ -0,0 +1,175 @@
+"""
+Logging configuration
+
+Log calls on the event loop only build a LogRecord and put it on a
+bounded queue; a QueueListener thread formats and writes it. Records are
+emitted as JSON (python-json-logger) carrying the request context set by
+RequestLogMiddleware: request_id, route and user_id.
+
+Success request logs can be sampled with LOG_SAMPLE_RATE; warnings and
+errors are always kept. When the queue is full, records below ERROR are
+dropped (and counted) rather than blocking the event loop.
+"""
+
+from contextvars import ContextVar
+from typing import Optional
+import atexit
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+
+from pythonjsonlogger import jsonlogger
+
+from .settings import settings
+from ..utils.metrics import log_records_dropped
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+JSON_FORMAT = "%(asctime)s %(levelname)s %(name)s %(message)s"
+
+# Per-request fields: request_id, user_id and the ASGI scope (for the
+# route). A mutable dict set by the middleware, so values added further
+# down (the authenticated user, the matched route) are seen by every
+# later record of the request.
+request_context: ContextVar[Optional[dict]] = ContextVar(
+    "request_context", default=None
+)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+# (queue handler, stream handler) installed on the root logger
+_handlers: Optional[tuple] = None
+
+
+class RequestContextFilter(logging.Filter):
+    """Copy the current request's fields onto the record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = request_context.get()
+        if context:
+            record.request_id = context["request_id"]
+            route = context["scope"].get("route")
+            if route is not None:
+                record.route = route.path
+            if "user_id" in context:
+                record.user_id = context["user_id"]
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of records logged with extra={"sample": True}
+
+    Records at WARNING and above, and records not marked for sampling,
+    always pass.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        sampled = record.__dict__.pop("sample", False)
+        if not sampled or record.levelno >= logging.WARNING:
+            return True
+        return self.rate >= 1 or random.random() < self.rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock prepare() formats the message on the calling thread.
+        # Records stay in process, so pass them through untouched.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if record.levelno >= logging.ERROR:
+            # Never lose errors; waiting is acceptable for these
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped.inc()
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # The queue is bounded; wait for room instead of failing on stop
+        self.queue.put(self._sentinel)
+
+
+def _formatter() -> logging.Formatter:
+    if settings.log_format == "text":
+        return logging.Formatter(TEXT_FORMAT)
+    return jsonlogger.JsonFormatter(
+        JSON_FORMAT,
+        rename_fields={"asctime": "time", "levelname": "level", "name": "logger"},
+    )
+
+
+def configure_logging(use_queue: bool = True) -> None:
+    """
+    Install the root handlers (replacing any existing ones)
+
+    Args:
+        use_queue: Write from a background thread. The gunicorn master
+            passes False: threads do not survive the fork into workers,
+            which configure their own listener on import.
+    """
+    global _listener, _handlers
+    stop_logging()
+
+    level = logging.DEBUG if settings.debug else logging.INFO
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(_formatter())
+
+    # Run where the record is created: the request context is only
+    # visible there, and sampled-out records are never queued
+    filters = [RequestContextFilter(), SamplingFilter(settings.log_sample_rate)]
+
+    handler = stream
+    if use_queue:
+        handler = NonBlockingQueueHandler(queue.Queue(settings.log_queue_size))
+        _listener = _Listener(handler.queue, stream)
+        _listener.start()
+        _handlers = (handler, stream)
+    handler.filters = filters
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    # Server loggers go through the same handler. Requests are logged by
+    # RequestLogMiddleware, so uvicorn's access log would only duplicate them.
+    for name in ("uvicorn", "uvicorn.error", "gunicorn.error"):
+        server_logger = logging.getLogger(name)
+        server_logger.handlers = []
+        server_logger.propagate = True
+    logging.getLogger("uvicorn.access").disabled = True
+
+
+def stop_logging() -> None:
+    """
+    Flush queued records and stop the listener thread
+
+    Anything logged afterwards (e.g. by the server while exiting) is
+    written directly.
+    """
+    global _listener, _handlers
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _handlers is not None:
+        queued, stream = _handlers
+        stream.filters = list(queued.filters)
+        root = logging.getLogger()
+        root.removeHandler(queued)
+        root.addHandler(stream)
+        _handlers = None
+
+
+atexit.register(stop_logging)
@@ -2,6 +2,9 @@
 Application settings and configuration
 """
 
+from typing import Optional
+import math
+
 from pydantic_settings import BaseSettings
 
 
@@ -17,17 +20,135 @@ class Settings(BaseSettings):
     # Database
     mongodb_uri: str = "mongodb://mongodb:27017/fictions_db"
     db_name: str = "fictions_db"
+    ensure_indexes_on_startup: bool = True
+    # Connection pool (minPoolSize connections are opened at startup)
+    mongo_max_pool_size: int = 100
+    mongo_min_pool_size: int = 0
+    mongo_max_idle_time_ms: Optional[int] = None
+    mongo_wait_queue_timeout_ms: Optional[int] = None
+    mongo_connect_timeout_ms: int = 10000
+    mongo_server_selection_timeout_ms: int = 30000
+    mongo_socket_timeout_ms: Optional[int] = None
+    mongo_ready_timeout_ms: int = 1000
+    # Wire compression, e.g. "zstd,snappy,zlib" (zstd/snappy need extra packages)
+    mongo_compressors: str = ""
+    mongo_zlib_compression_level: int = 1
+    # Read routing: operations listed below use mongo_read_preference
+    # ("primary", "primaryPreferred", "secondary", "secondaryPreferred",
+    # "nearest"); staleness must be -1 (unbounded) or at least 90 seconds.
+    # List pages always read the primary (see routers/fictions._load_page)
+    mongo_read_preference: str = "primary"
+    mongo_max_staleness_seconds: int = 90
+    mongo_secondary_read_operations: list = [
+        "fictions.get",
+        "fictions.content",
+        "fictions.search",
+        "fictions.export",
+    ]
 
     # Security
     jwt_secret: str = "dev-secret-change-me-in-production-12345678"
     jwt_algorithm: str = "HS256"
     jwt_expiration_hours: int = 24
+    jwt_backend: str = "jose"  # "jose" or "hmac" (stdlib HS256/384/512)
+    jwt_cache_max_entries: int = 10000
+    password_hash_workers: int = 2
+    password_hash_max_queue: int = 32
 
     # Rate Limiting
     rate_limit_window_ms: int = 900000  # 15 minutes
     rate_limit_max_requests: int = 100
     auth_rate_limit: str = "5/15minutes"
     api_rate_limit: str = "100/15minutes"
+    # limits storage URI shared by all replicas, e.g. redis://redis:6379 or
+    # mongodb://mongodb:27017; memory:// keeps counters per process
+    rate_limit_storage_uri: str = "memory://"
+    # Hits reserved from the shared store per round trip (1 = no batching)
+    rate_limit_lease_size: int = 1
+    rate_limit_key: str = "ip"  # "ip" or "user" (JWT subject, falling back to ip)
+
+    # Pagination
+    page_size_default: int = 20
+    page_size_max: int = 100
+
+    # Content compression
+    content_compression_codec: str = "zlib"  # "zlib", "lzma" or "none"
+    content_compression_min_bytes: int = 4096
+    # Chunk size when streaming GET /api/fictions/{id}/content
+    content_stream_chunk_bytes: int = 16 * 1024
+
+    # Serialization
+    # Serve stored fictions without re-validating them through the response
+    # model (they were validated on write)
+    trust_stored_documents: bool = True
+
+    # Caching; byte budgets are per pod and count each body twice to
+    # leave room for its compressed copies; larger fictions are not cached
+    fiction_cache_max_entries: int = 1024
+    fiction_cache_ttl_seconds: float = 60.0
+    fiction_cache_max_bytes: int = 64 * 1024 * 1024
+    fiction_cache_max_entry_bytes: int = 1024 * 1024
+
+    # Cross-replica invalidation of the caches above from a MongoDB change
+    # stream (needs a replica set; ignored on a standalone mongod). Only
+    # collections something caches are watched
+    cache_invalidation_enabled: bool = True
+    cache_invalidation_collections: list = ["fictions", "stats"]
+    change_stream_max_await_ms: int = 1000
+
+    # Share one MongoDB call between identical concurrent reads
+    singleflight_enabled: bool = True
+
+    # HTTP response compression (gzip, or brotli when installed)
+    response_compression_enabled: bool = True
+    response_compression_min_bytes: int = 1024
+    response_compression_gzip_level: int = 6
+    response_compression_brotli_quality: int = 5
+    # Compress bodies at least this large on a thread instead of the loop
+    response_compression_thread_min_bytes: int = 128 * 1024
+
+    # Fictions list: pages cached per collection version (see
+    # utils/collection_version); how long a worker trusts its copy of the
+    # version when change streams are unavailable; Cache-Control max-age
+    list_cache_max_entries: int = 256
+    list_cache_ttl_seconds: float = 30.0
+    list_cache_max_bytes: int = 16 * 1024 * 1024
+    collection_version_ttl_seconds: float = 1.0
+    list_cache_max_age_seconds: int = 0
+
+    # Search
+    search_backend: str = "mongo"  # "mongo" or "memory"
+    search_max_offset: int = 1000
+
+    # Export
+    export_batch_size: int = 500
+    export_chunk_bytes: int = 64 * 1024
+
+    # Server (see src/server.py)
+    # Worker processes; 0 sizes them from the container CPU quota
+    web_concurrency: int = 0
+    # Set by the launcher so each worker can split per-pod budgets
+    worker_count: int = 1
+    graceful_timeout_seconds: int = 30
+    keepalive_seconds: int = 5
+    # Recycle workers after this many requests (0 = never), with jitter
+    max_requests: int = 0
+    max_requests_jitter: int = 0
+
+    # Logging (see src/config/logging_config.py)
+    log_format: str = "json"  # "json" or "text"
+    # Fraction of successful request logs kept; warnings and errors always are
+    log_sample_rate: float = 1.0
+    # Records buffered for the writer thread before non-errors are dropped
+    log_queue_size: int = 10000
+
+    # Metrics
+    # Expose /metrics and record request, Mongo, bcrypt and JWT timings
+    metrics_enabled: bool = True
+    # Directory where workers publish their metrics so /metrics reports the
+    # whole pod; src/server.py sets a fresh one (empty = this process only)
+    metrics_multiproc_dir: str = ""
+    metrics_snapshot_interval_seconds: float = 1.0
 
     # CORS
     cors_origins: list = ["*"]
@@ -36,6 +157,16 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = False
 
+    def per_worker(self, total: int) -> int:
+        """
+        Share of a per-pod budget (cache entries, connections) for one worker
+
+        0 (disabled, or unlimited for the Mongo pool) is passed through.
+        """
+        if total <= 0:
+            return total
+        return max(1, math.ceil(total / self.worker_count))
+
 
 # Global settings instance
 settings = Settings()
@@ -4,24 +4,126 @@ Main FastAPI application
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from contextlib import asynccontextmanager
 from datetime import datetime
+import asyncio
 import logging
+import time
+from pymongo.errors import ConnectionFailure
 from slowapi.errors import RateLimitExceeded
 
 from .config.settings import settings
+from .config.logging_config import configure_logging, stop_logging
 from .config.database import Database
+from .config.indexes import ensure_indexes
+from .utils.search import search_engine
+from .utils.stats import seed_stats
+from .utils.invalidation import ChangeStreamWatcher, invalidation_bus
+from .utils.password import password_executor
 from .routers import auth, fictions
 from .middleware.rate_limiter import limiter, rate_limit_exceeded_handler
+from .middleware.metrics import MetricsMiddleware
+from .middleware.request_log import RequestLogMiddleware
+from .middleware.compression import CompressionMiddleware
+from .utils import metrics
+from .openapi import install_prebuilt_openapi
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO if not settings.debug else logging.DEBUG,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+# Configure logging (JSON, written from a background thread)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+# Shared with the other gunicorn workers so /metrics covers the whole pod
+metrics_snapshots = (
+    metrics.SnapshotDirectory(settings.metrics_multiproc_dir, metrics.registry)
+    if settings.metrics_enabled and settings.metrics_multiproc_dir
+    else None
+)
+
+
+async def _start_services(app: FastAPI) -> None:
+    """
+    Connect to MongoDB, warm the pool, create missing indexes, seed the
+    stats counters after an upgrade and build the search index
+
+    Runs in the background so the server starts listening (and /health
+    answers liveness probes) immediately; /ready turns 200 once this has
+    finished, so no request is served before the unique indexes exist.
+    Connection failures are retried rather than crashing the pod; any
+    other error (bad URI, authentication, an index or search index
+    failure) fails startup and with it /health, so the pod is restarted
+    (see _start_in_background).
+    """
+    phases = {}
+    delay = 0.5
+    while True:
+        start = time.perf_counter()
+        try:
+            await Database.connect_db()
+            break
+        except ConnectionFailure as e:
+            logger.error(f"MongoDB not reachable, retrying in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 5.0)
+    phases["mongo"] = time.perf_counter() - start
+
+    if settings.ensure_indexes_on_startup:
+        start = time.perf_counter()
+        await ensure_indexes()
+        phases["indexes"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if await seed_stats():
+        phases["stats"] = time.perf_counter() - start
+
+    # Follow writes from other replicas before anything is cached, so
+    # nothing written from here on is missed
+    if settings.cache_invalidation_enabled:
+        watcher = ChangeStreamWatcher(
+            invalidation_bus, settings.cache_invalidation_collections
+        )
+        app.state.watcher = asyncio.create_task(watcher.run())
+        app.state.watcher.add_done_callback(_log_startup_failure)
+
+    start = time.perf_counter()
+    await search_engine.rebuild()
+    phases["search_index"] = time.perf_counter() - start
+
+    app.state.ready = True
+    logger.info(
+        f"{settings.app_name} v{settings.app_version} ready in "
+        f"{time.perf_counter() - app.state.started_at:.3f}s ("
+        + ", ".join(
+            f"{name} {seconds * 1000:.0f}ms" for name, seconds in phases.items()
+        )
+        + ")"
+    )
+
+
+def _log_startup_failure(task: asyncio.Task) -> None:
+    """Surface errors from background startup tasks"""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Startup failed", exc_info=task.exception())
+
+
+def _start_in_background(app: FastAPI) -> asyncio.Task:
+    """
+    Run _start_services, failing liveness if it raises
+
+    Without that the worker would stay unready forever while /health
+    kept answering 200, and Kubernetes would never restart it.
+    """
+
+    def finished(task: asyncio.Task) -> None:
+        _log_startup_failure(task)
+        if not task.cancelled() and task.exception() is not None:
+            app.state.startup_failed = True
+
+    app.state.startup_failed = False
+    task = asyncio.create_task(_start_services(app))
+    task.add_done_callback(finished)
+    return task
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -29,20 +131,42 @@ async def lifespan(app: FastAPI):
     Lifespan events for FastAPI application
 
     Handles startup and shutdown events:
-    - Startup: Connect to MongoDB
-    - Shutdown: Close MongoDB connection
+    - Startup: Start connecting to MongoDB, creating missing indexes,
+      watching for cache invalidations and building the search index in
+      the background
+    - Shutdown: Stop the change stream watcher, close MongoDB connection
+      and the bcrypt executor, publish final metrics, flush queued log
+      records
     """
     # Startup
     logger.info("Starting up application...")
-    await Database.connect_db()
-    logger.info(f"{settings.app_name} v{settings.app_version} started successfully")
+    app.state.ready = False
+    app.state.started_at = time.perf_counter()
+    app.state.watcher = None
+    startup = _start_in_background(app)
+    publisher = None
+    if metrics_snapshots is not None:
+        publisher = asyncio.create_task(
+            metrics.publish_snapshots(
+                metrics_snapshots, settings.metrics_snapshot_interval_seconds
+            )
+        )
 
     yield
 
     # Shutdown
     logger.info("Shutting down application...")
+    if not startup.done():
+        startup.cancel()
+    if app.state.watcher is not None:
+        app.state.watcher.cancel()
     await Database.close_db()
+    password_executor.shutdown()
+    if publisher is not None:
+        publisher.cancel()
+        metrics_snapshots.write(final=True)
     logger.info("Application shutdown complete")
+    stop_logging()
 
 
 # Create FastAPI application
@@ -54,14 +178,23 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url=None,  # Disabled - use Swagger UI instead
     openapi_url="/api/openapi.json",
+    default_response_class=ORJSONResponse,
 )
 
+# Serve the schema written at image build time instead of generating it
+install_prebuilt_openapi(app)
+
 # Add rate limiter state
 app.state.limiter = limiter
+app.state.ready = False
+app.state.startup_failed = False
 
 # Add rate limit exception handler
 app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 
+# Innermost: compress complete JSON/text bodies for clients that accept it
+app.add_middleware(CompressionMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -71,16 +204,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request id, access log and log context for everything below
+app.add_middleware(RequestLogMiddleware)
+
+# Outermost, so latency includes every other middleware
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 
 # Health check endpoint
 @app.get("/health", tags=["Health"])
 async def health_check():
     """
-    Health check endpoint
+    Liveness check: the process is up and serving (no dependencies checked)
 
     Returns:
-        Health status with timestamp
+        Health status with timestamp (503 when startup failed with an error
+        that is not retried)
     """
+    if app.state.startup_failed:
+        return JSONResponse(
+            status_code=503, content={"status": "error", "startup_failed": True}
+        )
     return {
         "status": "ok",
         "app": settings.app_name,
@@ -89,6 +234,44 @@ async def health_check():
     }
 
 
+# Readiness endpoint
+@app.get("/ready", tags=["Health"])
+async def readiness_check():
+    """
+    Readiness check: startup finished and MongoDB reachable, with
+    connection pool statistics
+
+    Returns:
+        Readiness and pool status (503 while starting or when MongoDB is
+        unreachable)
+    """
+    if not app.state.ready:
+        return JSONResponse(status_code=503, content={"ready": False, "starting": True})
+    readiness = await Database.readiness()
+    return JSONResponse(
+        status_code=200 if readiness["ready"] else 503, content=readiness
+    )
+
+
+# Metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """
+    Prometheus scrape endpoint
+
+    Returns:
+        Metrics in the text exposition format, summed over all workers of
+        the pod when run by src/server.py
+    """
+    if not settings.metrics_enabled:
+        return Response(status_code=404)
+    if metrics_snapshots is None:
+        content = metrics.registry.render()
+    else:
+        content = await asyncio.to_thread(metrics_snapshots.render)
+    return Response(content=content, media_type=metrics.CONTENT_TYPE)
+
+
 # Root endpoint
 @app.get("/", tags=["Root"])
 async def root():
@@ -4,17 +4,50 @@ Authentication middleware and utilities
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
-from datetime import datetime, timedelta
-from typing import Optional
 
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+from ..config.logging_config import request_context
 from ..config.settings import settings
 from ..models.user import TokenData
+from ..utils.cache import TTLCache
+from ..utils.metrics import jwt_verifications, jwt_verify_duration
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
 
+# python-jose (and the cryptography backend it loads) is only imported by
+# the jose backend: the hmac backend never needs it and it is slow to
+# import on cold start. Both backends raise these.
+class JWTError(Exception):
+    """Token is malformed, forged or expired"""
+
+
+class ExpiredSignatureError(JWTError):
+    """Token signature is valid but exp has passed"""
+
+
+# Verified tokens: sha256(token) -> user_id, each entry expiring at the
+# token's own exp claim. TTL default is unused since every set passes one.
+token_cache: TTLCache[str] = TTLCache(
+    settings.per_worker(settings.jwt_cache_max_entries),
+    settings.jwt_expiration_hours * 3600,
+)
+
+_HMAC_ALGORITHMS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create JWT access token
@@ -35,6 +68,11 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
     to_encode.update({"exp": expire, "iat": datetime.utcnow()})
 
+    if settings.jwt_backend == "hmac":
+        return _encode_hmac(to_encode)
+
+    from jose import jwt
+
     encoded_jwt = jwt.encode(
         to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm
     )
@@ -42,45 +80,192 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-) -> TokenData:
+def _b64encode(data: bytes) -> str:
+    """Encode bytes as an unpadded base64url JWT segment"""
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(segment: str) -> bytes:
+    """Decode an unpadded base64url JWT segment"""
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _encode_hmac(claims: dict) -> str:
+    """Sign an HS256/384/512 token with the standard library (same output as jose)"""
+    digest = _HMAC_ALGORITHMS.get(settings.jwt_algorithm)
+    if digest is None:
+        raise JWTError(f"hmac backend does not support {settings.jwt_algorithm}")
+
+    claims = {
+        k: (
+            int(v.replace(tzinfo=timezone.utc).timestamp())
+            if isinstance(v, datetime)
+            else v
+        )
+        for k, v in claims.items()
+    }
+    header = {"alg": settings.jwt_algorithm, "typ": "JWT"}
+    signing_input = ".".join(
+        _b64encode(json.dumps(part, separators=(",", ":")).encode("utf-8"))
+        for part in (header, claims)
+    )
+    signature = hmac.new(
+        settings.jwt_secret.encode("utf-8"), signing_input.encode("ascii"), digest
+    ).digest()
+    return f"{signing_input}.{_b64encode(signature)}"
+
+
+def _decode_jose(token: str) -> dict:
+    """Decode and verify a token with python-jose"""
+    from jose import exceptions, jwt
+
+    try:
+        return jwt.decode(
+            token, settings.jwt_secret, algorithms=[settings.jwt_algorithm]
+        )
+    except exceptions.ExpiredSignatureError as e:
+        raise ExpiredSignatureError(str(e)) from e
+    except exceptions.JWTError as e:
+        raise JWTError(str(e)) from e
+
+
+def _decode_hmac(token: str) -> dict:
     """
-    Validate JWT token and return user data
+    Decode and verify an HS256/384/512 token with the standard library
 
-    Args:
-        credentials: HTTP Bearer credentials
+    Checks the signature, the header algorithm and the exp/nbf claims,
+    which is everything this API relies on, with far less overhead than
+    the generic python-jose path.
 
-    Returns:
-        TokenData with user_id
+    Raises:
+        JWTError: If the token is malformed, forged or expired
+    """
+    digest = _HMAC_ALGORITHMS.get(settings.jwt_algorithm)
+    if digest is None:
+        raise JWTError(f"hmac backend does not support {settings.jwt_algorithm}")
+
+    try:
+        signing_input, _, signature = token.rpartition(".")
+        header_segment, _, payload_segment = signing_input.partition(".")
+        header = json.loads(_b64decode(header_segment))
+        expected = hmac.new(
+            settings.jwt_secret.encode("utf-8"),
+            signing_input.encode("ascii"),
+            digest,
+        ).digest()
+        signature_ok = hmac.compare_digest(expected, _b64decode(signature))
+    except (ValueError, UnicodeEncodeError) as e:
+        raise JWTError("Malformed token") from e
+
+    if not signature_ok or header.get("alg") != settings.jwt_algorithm:
+        raise JWTError("Signature verification failed")
+
+    try:
+        payload = json.loads(_b64decode(payload_segment))
+    except ValueError as e:
+        raise JWTError("Malformed token") from e
+
+    now = time.time()
+    exp = payload.get("exp")
+    if exp is not None and now >= float(exp):
+        raise ExpiredSignatureError("Signature has expired")
+    nbf = payload.get("nbf")
+    if nbf is not None and now < float(nbf):
+        raise JWTError("The token is not yet valid (nbf)")
+
+    return payload
+
+
+JWT_BACKENDS: Dict[str, Callable[[str], dict]] = {
+    "jose": _decode_jose,
+    "hmac": _decode_hmac,
+}
+
+
+def decode_token(token: str) -> dict:
+    """
+    Decode and verify a JWT with the configured backend
 
     Raises:
-        HTTPException: If token is invalid or expired
+        JWTError: If the token is invalid or expired
     """
-    credentials_exception = HTTPException(
+    return JWT_BACKENDS[settings.jwt_backend](token)
+
+
+def _credentials_exception() -> HTTPException:
+    """401 raised for any invalid token (only built on failure)"""
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid authentication credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _verify_cached(token: str) -> str:
+    """
+    Return the user id for a token, verifying it only on a cache miss
+
+    Raises:
+        JWTError: If the token is invalid, expired or has no subject
+    """
+    cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+
+    user_id = token_cache.get(cache_key)
+    if user_id is not None:
+        jwt_verifications.inc(result="cache_hit")
+        return user_id
+
+    start = time.perf_counter()
     try:
-        payload = jwt.decode(
-            credentials.credentials,
-            settings.jwt_secret,
-            algorithms=[settings.jwt_algorithm],
+        payload = decode_token(token)
+    except JWTError:
+        jwt_verifications.inc(result="invalid")
+        raise
+    finally:
+        jwt_verify_duration.observe(
+            time.perf_counter() - start, backend=settings.jwt_backend
         )
+    jwt_verifications.inc(result="verified")
 
-        user_id: str = payload.get("sub")
+    user_id = payload.get("sub")
+    if user_id is None:
+        raise JWTError("Token has no subject")
 
-        if user_id is None:
-            raise credentials_exception
+    exp = payload.get("exp")
+    if exp is not None:
+        token_cache.set(cache_key, user_id, ttl=float(exp) - time.time())
 
-        token_data = TokenData(user_id=user_id)
+    return user_id
 
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> TokenData:
+    """
+    Validate JWT token and return user data
+
+    Tokens that already passed verification are served from token_cache
+    until their exp, skipping the signature check.
+
+    Args:
+        credentials: HTTP Bearer credentials
+
+    Returns:
+        TokenData with user_id
+
+    Raises:
+        HTTPException: If token is invalid or expired
+    """
+    try:
+        user_id = _verify_cached(credentials.credentials)
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    context = request_context.get()
+    if context is not None:
+        context["user_id"] = user_id
 
-    return token_data
+    return TokenData(user_id=user_id)
 
 
 def verify_token(token: str) -> Optional[str]:
@@ -94,9 +279,6 @@ def verify_token(token: str) -> Optional[str]:
         User ID if valid, None otherwise
     """
     try:
-        payload = jwt.decode(
-            token, settings.jwt_secret, algorithms=[settings.jwt_algorithm]
-        )
-        return payload.get("sub")
+        return _verify_cached(token)
     except JWTError:
         return None
@@ -0,0 +1,71 @@
+"""
+Response compression middleware
+"""
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..config.settings import settings
+from ..utils.http_compression import compress_async, is_compressible, negotiate_encoding
+
+
+class CompressionMiddleware:
+    """
+    Compress complete JSON and text responses for clients that accept it
+
+    Only responses sent in a single body message are compressed, and only
+    200s at or above response_compression_min_bytes. Responses that
+    already carry a Content-Encoding are left alone; the fiction routes
+    set one when they serve a precompressed body from the cache. Streamed
+    responses (export, content ranges) pass through unchanged, so byte
+    ranges keep referring to the stored text.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Hold until the body shows whether this is worth compressing
+                start_message = message
+                return
+
+            if start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or start["status"] != 200
+                or "content-encoding" in headers
+                or not is_compressible(headers.get("content-type"))
+                or len(body) < settings.response_compression_min_bytes
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            body = await compress_async(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,59 @@
+"""
+Request metrics middleware
+"""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..utils.metrics import http_request_duration, http_requests_in_flight
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Route path template the request matched (e.g. /api/fictions/{fiction_id})
+
+    Unmatched requests share one label so arbitrary paths cannot blow up
+    metric cardinality.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Record per-route latency and in-flight requests
+
+    A plain ASGI middleware rather than BaseHTTPMiddleware, so streamed
+    responses are not buffered and latency covers the full body.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec(method=method)
+            http_request_duration.observe(
+                time.perf_counter() - start,
+                method=method,
+                route=route_template(scope),
+                status=f"{status_code // 100}xx",
+            )
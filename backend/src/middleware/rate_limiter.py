@@ -2,6 +2,8 @@
 Rate limiting middleware
 """
 
+import re
+
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -9,13 +11,79 @@ from fastapi import Request, Response
 from fastapi.responses import JSONResponse
 
 from ..config.settings import settings
+from .auth import verify_token
+from .rate_limit_storage import LeasedStorage  # noqa: F401 (registers leased+ URIs)
+from .metrics import route_template
+from ..utils.metrics import rate_limit_rejections
+
+
+def get_user_or_remote_address(request: Request) -> str:
+    """
+    Rate limit key: the JWT subject when a valid bearer token is sent,
+    otherwise the client address
+    """
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        user_id = verify_token(token)
+        if user_id is not None:
+            return f"user:{user_id}"
+    return get_remote_address(request)
+
+
+RATE_LIMIT_KEY_FUNCS = {
+    "ip": get_remote_address,
+    "user": get_user_or_remote_address,
+}
+
+
+def _storage_uri() -> str:
+    """Storage URI, wrapped in the leasing storage when lease_size > 1"""
+    uri = settings.rate_limit_storage_uri
+    if settings.rate_limit_lease_size > 1 and not uri.startswith("leased+"):
+        uri = f"leased+{uri}"
+    return uri
+
+
+STORAGE_URI = _storage_uri()
+
+
+def per_worker_limit(limit: str) -> str:
+    """
+    Split a limit string ("100/15minutes; 10/second") across workers
+
+    With memory:// storage every worker process keeps its own counters, so
+    without this a pod with N workers would allow N times the limit.
+    Shared storage already counts pod-wide and is left alone.
+    """
+    if settings.worker_count <= 1 or not STORAGE_URI.endswith("memory://"):
+        return limit
+    return re.sub(
+        r"(^|;)(\s*)(\d+)",
+        lambda m: f"{m[1]}{m[2]}{settings.per_worker(int(m[3]))}",
+        limit,
+    )
+
+
+API_RATE_LIMIT = per_worker_limit(settings.api_rate_limit)
+AUTH_RATE_LIMIT = per_worker_limit(settings.auth_rate_limit)
 
 # Initialize rate limiter
 limiter = Limiter(
-    key_func=get_remote_address,
+    key_func=RATE_LIMIT_KEY_FUNCS[settings.rate_limit_key],
     default_limits=[
-        f"{settings.rate_limit_max_requests}/{settings.rate_limit_window_ms}ms"
+        per_worker_limit(
+            f"{settings.rate_limit_max_requests}/{settings.rate_limit_window_ms}ms"
+        )
     ],
+    storage_uri=STORAGE_URI,
+    storage_options=(
+        {"lease_size": settings.rate_limit_lease_size}
+        if STORAGE_URI.startswith("leased+")
+        else {}
+    ),
+    # Keep serving with per-process limits if the shared store goes away
+    in_memory_fallback_enabled=not STORAGE_URI.endswith("memory://"),
 )
 
 
@@ -30,6 +98,8 @@ def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded) -> Res
     Returns:
         JSON response with error message
     """
+    rate_limit_rejections.inc(route=route_template(request.scope))
+
     return JSONResponse(
         status_code=429,
         content={
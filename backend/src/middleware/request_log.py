@@ -0,0 +1,84 @@
+"""
+Request logging middleware
+"""
+
+import logging
+import re
+import time
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..config.logging_config import request_context
+
+logger = logging.getLogger("src.access")
+
+# Accept caller-supplied ids only if they are short and header-safe
+REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+# Probes answer 503 by design while starting or while MongoDB is down
+PROBE_PATHS = frozenset({"/health", "/ready"})
+
+
+def _request_id(scope: Scope) -> str:
+    for name, value in scope["headers"]:
+        if name == b"x-request-id":
+            candidate = value.decode("latin-1")
+            if REQUEST_ID_RE.match(candidate):
+                return candidate
+            break
+    return uuid.uuid4().hex
+
+
+class RequestLogMiddleware:
+    """
+    Tag every log record of a request with its id and log one line per
+    request with route, status, latency and user
+
+    The id is taken from X-Request-ID when the caller (or ingress) sent
+    one, otherwise generated, and echoed back in the response. Successful
+    requests and health/readiness probes are logged with sampling; other
+    5xx are logged as errors.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _request_id(scope)
+        context = {"request_id": request_id, "scope": scope}
+        token = request_context.set(context)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-request-id", request_id.encode("latin-1")),
+                ]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            latency_ms = round((time.perf_counter() - start) * 1000, 3)
+            probe = scope["path"] in PROBE_PATHS
+            level = logging.ERROR if status_code >= 500 and not probe else logging.INFO
+            logger.log(
+                level,
+                "request",
+                extra={
+                    "method": scope["method"],
+                    "status": status_code,
+                    "latency_ms": latency_ms,
+                    "sample": status_code < 400 or probe,
+                },
+            )
+            request_context.reset(token)
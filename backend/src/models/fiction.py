@@ -3,7 +3,7 @@ Fiction model and schemas
 """
 
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from typing import Annotated, Dict, List, Literal, Optional, Union
 from datetime import datetime
 from bson import ObjectId
 
@@ -111,6 +111,167 @@ class FictionResponse(BaseModel):
     created_by: str
     created_at: datetime
     updated_at: datetime
+    # Incremented on every write; documents written before versioning are 0
+    version: int = 0
 
     class Config:
         populate_by_name = True
+
+
+class FictionSummary(BaseModel):
+    """Fiction summary schema for list views (no content)"""
+
+    id: str = Field(alias="_id")
+    title: str
+    author: str
+    genre: str
+    description: str
+    created_by: str
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        populate_by_name = True
+
+
+class FictionSearchResult(FictionSummary):
+    """Fiction summary with its search relevance score"""
+
+    score: float
+
+
+class FictionSearchPage(BaseModel):
+    """Page of search results"""
+
+    items: List[FictionSearchResult]
+    next_offset: Optional[int] = None
+
+
+class FictionPartial(BaseModel):
+    """Fiction with a sparse fieldset; unrequested fields are omitted"""
+
+    id: str = Field(alias="_id")
+    title: Optional[str] = None
+    author: Optional[str] = None
+    genre: Optional[str] = None
+    description: Optional[str] = None
+    content: Optional[str] = None
+    created_by: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    version: Optional[int] = None
+
+    class Config:
+        populate_by_name = True
+
+
+# Fields a client may request through the `fields` query parameter
+FICTION_FIELDS = tuple(f for f in FictionResponse.model_fields if f != "id")
+
+# Default fieldset for list views
+SUMMARY_FIELDS = tuple(f for f in FictionSummary.model_fields if f != "id")
+
+
+def build_projection(fields: Optional[str], default: tuple) -> dict:
+    """
+    Build a Mongo projection from a comma-separated `fields` parameter
+
+    Args:
+        fields: Comma-separated field names, or None for the default fieldset
+        default: Fieldset used when no fields are requested
+
+    Returns:
+        Projection dict (_id is always included)
+
+    Raises:
+        ValueError: If an unknown field is requested
+    """
+    if fields:
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in requested if f not in FICTION_FIELDS]
+        if unknown:
+            raise ValueError(
+                f'Unknown fields: {", ".join(unknown)}. '
+                f'Allowed: {", ".join(FICTION_FIELDS)}'
+            )
+    else:
+        requested = default
+
+    return {f: 1 for f in requested}
+
+
+class FictionPage(BaseModel):
+    """Paginated list of fictions"""
+
+    items: List[FictionPartial]
+    next_cursor: Optional[str] = None
+
+
+# Maximum number of operations accepted by POST /api/fictions/batch
+BATCH_MAX_OPERATIONS = 1000
+
+
+class BatchCreate(BaseModel):
+    """Batch operation creating a fiction"""
+
+    op: Literal["create"]
+    data: FictionCreate
+
+
+class BatchUpdate(BaseModel):
+    """Batch operation updating one of the caller's fictions"""
+
+    op: Literal["update"]
+    id: str
+    data: FictionUpdate
+
+
+class BatchDelete(BaseModel):
+    """Batch operation deleting one of the caller's fictions"""
+
+    op: Literal["delete"]
+    id: str
+
+
+BatchOperation = Annotated[
+    Union[BatchCreate, BatchUpdate, BatchDelete], Field(discriminator="op")
+]
+
+
+class FictionBatchRequest(BaseModel):
+    """Mixed create/update/delete operations executed as one bulk write"""
+
+    ordered: bool = True
+    operations: List[BatchOperation] = Field(
+        ..., min_length=1, max_length=BATCH_MAX_OPERATIONS
+    )
+
+
+class BatchItemResult(BaseModel):
+    """Outcome of a single batch operation"""
+
+    index: int
+    op: str
+    id: Optional[str] = None
+    status: Literal[
+        "created", "updated", "deleted", "not_found", "conflict", "error", "skipped"
+    ]
+    error: Optional[str] = None
+
+
+class FictionBatchResponse(BaseModel):
+    """Per-item results and totals of a batch write"""
+
+    results: List[BatchItemResult]
+    inserted: int
+    updated: int
+    deleted: int
+
+
+class FictionStats(BaseModel):
+    """Catalog counters maintained on every write"""
+
+    total: int
+    genres: Dict[str, int]
+    top_authors: Dict[str, int]
+    top_users: Dict[str, int]
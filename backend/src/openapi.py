@@ -0,0 +1,101 @@
+"""
+Prebuilt OpenAPI schema
+
+FastAPI builds the OpenAPI document on the first /api/openapi.json (or
+/api/docs) request, walking every route and model, which makes that
+request slow on each new pod. The Docker build writes the schema once:
+
+    python -m src.openapi --output src/openapi.json
+
+and install_prebuilt_openapi serves that file, falling back to FastAPI's
+generator when it is missing or stale. The file records a signature of
+the routes it was generated from (paths, methods, parameters and the
+fields of their models), so a schema built before a route or model
+changed is regenerated even if the app version was not bumped.
+"""
+
+from pathlib import Path
+from typing import Any, List, Set, get_args
+import argparse
+import hashlib
+import json
+import logging
+
+from fastapi import FastAPI
+from fastapi.dependencies.utils import get_flat_params
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCHEMA_PATH = Path(__file__).parent / "openapi.json"
+
+
+def _describe_type(annotation: Any, parts: List[str], seen: Set[type]) -> None:
+    """Append the fields of every model reachable from a type annotation"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        if annotation in seen:
+            return
+        seen.add(annotation)
+        parts.append(annotation.__qualname__)
+        for name, field in annotation.model_fields.items():
+            parts.append(f"{name}: {field!r}")
+            _describe_type(field.annotation, parts, seen)
+        return
+    for arg in get_args(annotation):
+        _describe_type(arg, parts, seen)
+
+
+def route_signature(app: FastAPI) -> str:
+    """Hash of everything the OpenAPI schema is generated from"""
+    parts = [app.title, app.version, app.description or "", app.openapi_url or ""]
+    seen: Set[type] = set()
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or not route.include_in_schema:
+            continue
+        parts.append(f"{sorted(route.methods)} {route.path} {route.name}")
+        parts.append(f"{route.status_code} {route.summary} {route.description}")
+        for param in get_flat_params(route.dependant):
+            parts.append(f"{param.name}: {param.field_info!r}")
+        if route.body_field is not None:
+            _describe_type(route.body_field.field_info.annotation, parts, seen)
+        _describe_type(route.response_model, parts, seen)
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def write_prebuilt_openapi(app: FastAPI, path: Path) -> None:
+    """Generate the schema and write it with the signature of its routes"""
+    # Always regenerate, never re-read a previous build
+    app.openapi_schema = None
+    prebuilt = {"route_signature": route_signature(app), "schema": FastAPI.openapi(app)}
+    path.write_text(json.dumps(prebuilt, separators=(",", ":")))
+
+
+def install_prebuilt_openapi(app: FastAPI, path: Path = DEFAULT_SCHEMA_PATH) -> None:
+    """Make app.openapi() return the prebuilt schema when it is current"""
+    generate = app.openapi
+
+    def openapi() -> dict:
+        if app.openapi_schema is None:
+            schema = None
+            if path.exists():
+                prebuilt = json.loads(path.read_text())
+                if prebuilt.get("route_signature") == route_signature(app):
+                    schema = prebuilt.get("schema")
+                else:
+                    logger.warning(f"Ignoring stale prebuilt OpenAPI schema {path}")
+            app.openapi_schema = schema or generate()
+        return app.openapi_schema
+
+    app.openapi = openapi
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the OpenAPI schema")
+    parser.add_argument("--output", type=Path, default=DEFAULT_SCHEMA_PATH)
+    args = parser.parse_args()
+
+    from .main import app
+
+    write_prebuilt_openapi(app, args.output)
+    print(f"Wrote {args.output}")
@@ -5,19 +5,44 @@ Authentication routes
 from fastapi import APIRouter, HTTPException, status, Request
 from datetime import timedelta, datetime
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 
 from ..models.user import UserCreate, UserLogin, Token, UserResponse
 from ..config.database import get_users_collection
 from ..config.settings import settings
-from ..utils.password import hash_password, verify_password
+from ..utils.password import (
+    PasswordHasherBusy,
+    hash_password_async,
+    verify_password_async,
+)
 from ..middleware.auth import create_access_token
-from ..middleware.rate_limiter import limiter
+from ..middleware.rate_limiter import AUTH_RATE_LIMIT, limiter
 
 router = APIRouter()
 
 
+def _already_registered(email_taken: bool) -> HTTPException:
+    """400 returned when the username or email belongs to another user"""
+    if email_taken:
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
+        )
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST, detail="Username already taken"
+    )
+
+
+def _hasher_busy() -> HTTPException:
+    """503 returned when the bcrypt queue is saturated"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is temporarily overloaded. Please retry shortly.",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-@limiter.limit(settings.auth_rate_limit)
+@limiter.limit(AUTH_RATE_LIMIT)
 async def register(request: Request, user_data: UserCreate):
     """
     Register a new user
@@ -29,7 +54,8 @@ async def register(request: Request, user_data: UserCreate):
         JWT token and user data
 
     Raises:
-        HTTPException: If username or email already exists
+        HTTPException: If username or email already exists, or 503 if the
+            password hashing queue is full
     """
     users = get_users_collection()
 
@@ -39,26 +65,31 @@ async def register(request: Request, user_data: UserCreate):
     )
 
     if existing_user:
-        if existing_user.get("email") == user_data.email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered",
-            )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="Username already taken"
-            )
+        raise _already_registered(existing_user.get("email") == user_data.email)
+
+    # Hash off the event loop
+    try:
+        password_hash = await hash_password_async(user_data.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
 
     # Create new user
     user_dict = {
         "_id": str(ObjectId()),
         "username": user_data.username,
         "email": user_data.email,
-        "password_hash": hash_password(user_data.password),
+        "password_hash": password_hash,
         "created_at": datetime.utcnow().isoformat(),
     }
 
-    await users.insert_one(user_dict)
+    # The unique indexes catch a concurrent registration that passed the
+    # check above while this one was hashing
+    try:
+        await users.insert_one(user_dict)
+    except DuplicateKeyError as e:
+        # keyPattern names the field; older servers only name the index
+        key_pattern = (e.details or {}).get("keyPattern") or {}
+        raise _already_registered("email" in key_pattern or "email_unique" in str(e))
 
     # Create access token
     access_token = create_access_token(
@@ -78,7 +109,7 @@ async def register(request: Request, user_data: UserCreate):
 
 
 @router.post("/login", response_model=Token)
-@limiter.limit(settings.auth_rate_limit)
+@limiter.limit(AUTH_RATE_LIMIT)
 async def login(request: Request, credentials: UserLogin):
     """
     Login user
@@ -90,7 +121,8 @@ async def login(request: Request, credentials: UserLogin):
         JWT token and user data
 
     Raises:
-        HTTPException: If credentials are invalid
+        HTTPException: If credentials are invalid, or 503 if the password
+            hashing queue is full
     """
     users = get_users_collection()
 
@@ -102,8 +134,15 @@ async def login(request: Request, credentials: UserLogin):
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password"
         )
 
-    # Verify password
-    if not verify_password(credentials.password, user["password_hash"]):
+    # Verify password off the event loop
+    try:
+        password_ok = await verify_password_async(
+            credentials.password, user["password_hash"]
+        )
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password"
         )
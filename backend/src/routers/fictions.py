@@ -2,66 +2,631 @@
 Fictions CRUD routes
 """
 
-from fastapi import APIRouter, HTTPException, status, Depends, Request
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Query, Header
+from fastapi.responses import Response, StreamingResponse
+from typing import AsyncIterator, Dict, List, Optional
+from collections import Counter
+from dataclasses import dataclass, field
 from datetime import datetime
+import json
+import logging
 
-from ..models.fiction import FictionCreate, FictionUpdate, FictionResponse
+from ..models.fiction import (
+    FictionCreate,
+    FictionUpdate,
+    FictionResponse,
+    FictionPartial,
+    FictionPage,
+    FictionSearchPage,
+    FictionStats,
+    FictionBatchRequest,
+    FictionBatchResponse,
+    BatchCreate,
+    BatchUpdate,
+    FICTION_FIELDS,
+    SUMMARY_FIELDS,
+    build_projection,
+)
 from ..config.database import get_fictions_collection
 from ..middleware.auth import get_current_user
-from ..middleware.rate_limiter import limiter
+from ..middleware.rate_limiter import API_RATE_LIMIT, AUTH_RATE_LIMIT, limiter
 from ..config.settings import settings
 from ..models.user import TokenData
+from ..utils.pagination import KEYSET_SORT, encode_cursor, keyset_filter
+from ..utils.search import search_engine
+from ..utils.stats import (
+    apply_stat_deltas,
+    get_stats,
+    record_fiction_write,
+    stat_deltas,
+)
+from ..utils.responses import TrustedJSONResponse
+from ..utils.compression import decode_content, encode_content
+from ..utils.ranges import iter_chunks, parse_byte_range
+from ..utils.http_compression import compress_async, negotiate_encoding
+from ..utils.singleflight import fiction_lists, fiction_reads
+from ..utils.collection_version import get_version, list_etag
+from ..utils.cache import (
+    CachedResponse,
+    coded_etag,
+    etag_matches,
+    fiction_cache,
+    list_cache,
+    matching_etag,
+    parse_version_etag,
+    version_etag,
+)
 from bson import ObjectId
+from pymongo import DeleteOne, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[FictionResponse])
-@limiter.limit(settings.api_rate_limit)
-async def get_all_fictions(request: Request):
+FIELDS_DESCRIPTION = f"Comma-separated fields to return: {', '.join(FICTION_FIELDS)}"
+
+
+def _projection(fields: Optional[str], default: tuple) -> dict:
+    """Build a projection, turning unknown fields into a 400"""
+    try:
+        projection = build_projection(fields, default)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # Compressed content can only be decoded alongside its codec
+    if "content" in projection:
+        projection["content_codec"] = 1
+
+    return projection
+
+
+def _cache_fiction(fiction: dict, generation: Optional[int] = None) -> CachedResponse:
     """
-    Get all fictions
+    Serialize a full fiction document and cache it with its version ETag
+
+    Args:
+        fiction: Full fiction document
+        generation: fiction_cache.generation() taken before reading the
+            document; omitted when caching the result of a write
+    """
+    body = (
+        FictionResponse.model_validate(fiction)
+        .model_dump_json(by_alias=True)
+        .encode("utf-8")
+    )
+    cached = CachedResponse(body, version_etag(fiction.get("version", 0)), {})
+    fiction_cache.set(fiction["_id"], cached, generation=generation)
+    return cached
+
+
+async def _cached_response(
+    cached: CachedResponse,
+    status_code: int = 200,
+    accept_encoding: Optional[str] = None,
+    headers: Optional[dict] = None,
+) -> Response:
+    """
+    Build a JSON response from a cached body
+
+    With an Accept-Encoding, the body is compressed once per coding and
+    the compressed copy kept on the cache entry for later requests. Each
+    coding has its own ETag (see coded_etag), and every variant carries
+    Vary: Accept-Encoding.
+    """
+    encoding = negotiate_encoding(accept_encoding)
+    if len(cached.body) < settings.response_compression_min_bytes:
+        encoding = None
+    headers = {
+        "ETag": coded_etag(cached.etag, encoding),
+        "Vary": "Accept-Encoding",
+        **(headers or {}),
+    }
+    if encoding is None:
+        return Response(
+            content=cached.body,
+            status_code=status_code,
+            media_type="application/json",
+            headers=headers,
+        )
+
+    body = cached.encoded.get(encoding)
+    if body is None:
+        body = await compress_async(cached.body, encoding)
+        cached.encoded[encoding] = body
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type="application/json",
+        headers={**headers, "Content-Encoding": encoding},
+    )
+
+
+def _not_modified(
+    if_none_match: Optional[str], etag: str, headers: Optional[dict] = None
+) -> Optional[Response]:
+    """
+    304 for a cached-body route if the client's copy (in any coding) is
+    current, else None
+    """
+    matched = matching_etag(if_none_match, etag)
+    if matched is None:
+        return None
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": matched, "Vary": "Accept-Encoding", **(headers or {})},
+    )
+
+
+def _version_filter(if_match: Optional[str]) -> dict:
+    """
+    Translate an If-Match header into a filter on the version field
+
+    Raises:
+        HTTPException: 412 if the header can never match a version
+    """
+    if if_match is None or if_match.strip() == "*":
+        return {}
+
+    version = parse_version_etag(if_match)
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="If-Match must be an ETag returned by this API",
+        )
+
+    # Documents written before versioning have no version field
+    return {"version": version if version else {"$in": [0, None]}}
+
+
+async def _raise_write_failed(
+    fictions, fiction_id: str, user_id: str, if_match, action
+):
+    """
+    Raise 412 or 404 after a conditional write matched nothing
+
+    Only runs on the failure path, so successful writes stay at one
+    round trip.
+    """
+    if if_match is not None and await fictions.count_documents(
+        {"_id": fiction_id, "created_by": user_id}, limit=1
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Fiction was modified by another request",
+        )
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Fiction not found or you don't have permission to {action} it",
+    )
+
+
+@router.get("/", response_model=FictionPage, response_model_exclude_unset=True)
+@limiter.limit(API_RATE_LIMIT)
+async def get_all_fictions(
+    request: Request,
+    limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+    after: Optional[str] = Query(None, description="Cursor from a previous page"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Get a page of fictions, newest first
+
+    Pages are keyed on (created_at, _id), so the cost of a page does not
+    depend on how deep the client has scrolled. Items default to the
+    summary fieldset (no content).
+
+    The ETag is the collection version, which every write bumps: while it
+    is unchanged a matching If-None-Match gets 304 and other requests get
+    the cached serialized page. Identical concurrent misses share one
+    query.
+
+    Args:
+        limit: Maximum number of fictions to return
+        after: next_cursor from the previous page
+        fields: Optional sparse fieldset
+        if_none_match: ETag(s) of the client's cached copy
 
     Returns:
-        List of all fictions
+        Page of fictions and the cursor for the next page
+
+    Raises:
+        HTTPException: If the cursor or fields are invalid
+    """
+    projection = _projection(fields, SUMMARY_FIELDS)
+
+    try:
+        query = keyset_filter(after)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+    version = await get_version()
+    headers = {
+        "Cache-Control": f"public, max-age={settings.list_cache_max_age_seconds}"
+    }
+    not_modified = _not_modified(if_none_match, list_etag(version), headers)
+    if not_modified is not None:
+        return not_modified
+
+    key = (version, after, limit, tuple(sorted(projection)))
+    cached = list_cache.get(key)
+    if cached is None:
+        cached = await fiction_lists.do(
+            key, lambda: _load_cached_page(key, query, projection, limit)
+        )
+
+    return await _cached_response(
+        cached, accept_encoding=request.headers.get("accept-encoding"), headers=headers
+    )
+
+
+async def _load_cached_page(
+    key: tuple, query: dict, projection: dict, limit: int
+) -> CachedResponse:
+    """Read, serialize and cache one list page at a collection version"""
+    page = await _load_page(query, projection, limit)
+    if settings.trust_stored_documents:
+        body = TrustedJSONResponse(page).body
+    else:
+        body = (
+            FictionPage.model_validate(page)
+            .model_dump_json(by_alias=True, exclude_unset=True)
+            .encode("utf-8")
+        )
+    cached = CachedResponse(body, list_etag(key[0]), {})
+    list_cache.set(key, cached)
+    return cached
+
+
+async def _load_page(query: dict, projection: dict, limit: int) -> dict:
+    """
+    Read one list page (shared between coalesced requests, so read-only after)
+
+    Always from the primary, where the collection version is read: a
+    lagging secondary could return a page from before the write that
+    produced that version, and it would be cached and served under its
+    ETag until the next write.
     """
     fictions = get_fictions_collection()
 
-    fiction_list = await fictions.find().to_list(1000)
+    # created_at is needed to build the next cursor
+    strip_created_at = "created_at" not in projection
+    projection = {**projection, "created_at": 1}
+
+    # Fetch one extra document to know whether another page exists
+    fiction_list = (
+        await fictions.find(query, projection)
+        .sort(KEYSET_SORT)
+        .limit(limit + 1)
+        .to_list(limit + 1)
+    )
+
+    next_cursor = None
+    if len(fiction_list) > limit:
+        fiction_list = fiction_list[:limit]
+        last = fiction_list[-1]
+        next_cursor = encode_cursor(last["created_at"], last["_id"])
+
+    if strip_created_at:
+        for fiction in fiction_list:
+            del fiction["created_at"]
+
+    if "content" in projection:
+        for fiction in fiction_list:
+            decode_content(fiction)
+
+    return {"items": fiction_list, "next_cursor": next_cursor}
+
+
+@router.get("/search", response_model=FictionSearchPage)
+@limiter.limit(API_RATE_LIMIT)
+async def search_fictions(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    genre: Optional[str] = Query(None),
+    limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+    offset: int = Query(0, ge=0, le=settings.search_max_offset),
+):
+    """
+    Search fictions by title, author and description
+
+    Args:
+        q: Search query
+        genre: Optional genre filter
+        limit: Maximum number of results
+        offset: Number of results to skip
+
+    Returns:
+        Fiction summaries ordered by relevance and the next offset
+    """
+    # Fetch one extra result to know whether another page exists
+    results = await search_engine.search(
+        q, genre.lower() if genre else None, limit + 1, offset
+    )
+
+    next_offset = None
+    if len(results) > limit:
+        results = results[:limit]
+        next_offset = offset + limit
+
+    page = {"items": results, "next_offset": next_offset}
+
+    if settings.trust_stored_documents:
+        return TrustedJSONResponse(page)
+
+    return page
+
+
+@router.get("/stats", response_model=FictionStats)
+@limiter.limit(API_RATE_LIMIT)
+async def fiction_stats(
+    request: Request,
+    top_authors: int = Query(10, ge=1, le=100),
+    top_users: int = Query(10, ge=1, le=100),
+):
+    """
+    Get story counts per genre and the most prolific authors and users
+
+    Served from counters that every write keeps up to date, so the cost
+    does not grow with the number of fictions.
+
+    Args:
+        top_authors: Number of authors to return
+        top_users: Number of creating users to return
+
+    Returns:
+        Total, per-genre counts and top authors/users by story count
+    """
+    return await get_stats(top_authors, top_users)
+
+
+async def _export_ndjson(request: Request, cursor) -> AsyncIterator[bytes]:
+    """
+    Yield NDJSON chunks from a Motor cursor
+
+    Lines are buffered up to export_chunk_bytes so the client is not sent
+    one tiny chunk per document. Only the current chunk and one cursor
+    batch are held in memory.
+    """
+    buffer = bytearray()
+    try:
+        async for fiction in cursor:
+            buffer += json.dumps(decode_content(fiction), default=str).encode("utf-8")
+            buffer += b"\n"
+            if len(buffer) >= settings.export_chunk_bytes:
+                if await request.is_disconnected():
+                    return
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+    finally:
+        await cursor.close()
+
+
+@router.get("/export", response_class=StreamingResponse)
+@limiter.limit(AUTH_RATE_LIMIT)
+async def export_fictions(
+    request: Request,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: TokenData = Depends(get_current_user),
+):
+    """
+    Stream the whole fiction catalog as NDJSON
+
+    Documents are read in batches of export_batch_size and written as they
+    arrive, so memory stays constant regardless of collection size. Each
+    chunk is only produced once the previous one has been sent.
+
+    Args:
+        fields: Optional sparse fieldset (defaults to all fields)
+        current_user: Current authenticated user
+
+    Returns:
+        Streaming NDJSON response, one fiction per line
+    """
+    fictions = get_fictions_collection("fictions.export")
+
+    projection = _projection(fields, FICTION_FIELDS)
+
+    cursor = (
+        fictions.find({}, projection)
+        .sort("_id", 1)
+        .batch_size(settings.export_batch_size)
+    )
 
-    return fiction_list
+    return StreamingResponse(
+        _export_ndjson(request, cursor),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="fictions.ndjson"'},
+    )
 
 
-@router.get("/{fiction_id}", response_model=FictionResponse)
-@limiter.limit(settings.api_rate_limit)
-async def get_fiction(request: Request, fiction_id: str):
+@router.get(
+    "/{fiction_id}", response_model=FictionPartial, response_model_exclude_unset=True
+)
+@limiter.limit(API_RATE_LIMIT)
+async def get_fiction(
+    request: Request,
+    fiction_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Get a single fiction by ID
 
+    Full documents are served from the in-process cache when possible and
+    carry a strong ETag; a matching If-None-Match returns 304 without
+    touching the database. Identical concurrent misses share one query.
+
     Args:
         fiction_id: Fiction ID
+        fields: Optional sparse fieldset (defaults to all fields)
+        if_none_match: ETag(s) of the client's cached copy
 
     Returns:
         Fiction data
 
     Raises:
-        HTTPException: If fiction not found
+        HTTPException: If fiction not found or fields are invalid
     """
-    fictions = get_fictions_collection()
+    if fields is None:
+        cached = fiction_cache.get(fiction_id)
+        if cached is not None:
+            not_modified = _not_modified(if_none_match, cached.etag)
+            if not_modified is not None:
+                return not_modified
+            return await _cached_response(
+                cached, accept_encoding=request.headers.get("accept-encoding")
+            )
+
+    projection = _projection(fields, FICTION_FIELDS)
+
+    # Keyed by the cache generation: a read started before a write to
+    # this fiction is not shared with requests that come after it
+    generation = fiction_cache.generation(fiction_id)
 
-    fiction = await fictions.find_one({"_id": fiction_id})
+    if fields is None:
+        # Serialized (and cached) once for the whole burst
+        cached = await fiction_reads.do(
+            (fiction_id, None, generation),
+            lambda: _load_cached_fiction(fiction_id, projection, generation),
+        )
+        if cached is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Fiction not found"
+            )
+        not_modified = _not_modified(if_none_match, cached.etag)
+        if not_modified is not None:
+            return not_modified
+        return await _cached_response(
+            cached, accept_encoding=request.headers.get("accept-encoding")
+        )
+
+    fiction = await fiction_reads.do(
+        (fiction_id, tuple(sorted(projection)), generation),
+        lambda: _load_fiction(fiction_id, projection),
+    )
 
     if not fiction:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Fiction not found"
         )
 
+    if settings.trust_stored_documents:
+        return TrustedJSONResponse(fiction)
+
+    return fiction
+
+
+async def _load_fiction(fiction_id: str, projection: dict) -> Optional[dict]:
+    """Read and decode one fiction (shared between coalesced requests)"""
+    fictions = get_fictions_collection("fictions.get")
+    fiction = await fictions.find_one({"_id": fiction_id}, projection)
+    if fiction:
+        decode_content(fiction)
     return fiction
 
 
+async def _load_cached_fiction(
+    fiction_id: str, projection: dict, generation: int
+) -> Optional[CachedResponse]:
+    """
+    Read a full fiction and cache its serialized body
+
+    The body is not cached if the fiction was written or invalidated
+    since `generation` was taken, so a read that overlaps a write cannot
+    put the older document back in the cache.
+    """
+    fiction = await _load_fiction(fiction_id, projection)
+    return _cache_fiction(fiction, generation) if fiction else None
+
+
+@router.get("/{fiction_id}/content", response_class=StreamingResponse)
+@limiter.limit(API_RATE_LIMIT)
+async def get_fiction_content(
+    request: Request,
+    fiction_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Stream a fiction's content as UTF-8 text
+
+    Supports single byte ranges (Range: bytes=start-end) so readers can
+    render the beginning of a long story before the rest arrives or
+    resume an interrupted download. Only content and version are read
+    from the database. Pair with GET /{fiction_id}?fields=... to fetch
+    the metadata without the text.
+
+    Args:
+        fiction_id: Fiction ID
+        range_header: Requested byte range
+        if_range: ETag the range is conditional on
+        if_none_match: ETag(s) of the client's cached copy
+
+    Returns:
+        200 with the whole text, or 206 with the requested range
+
+    Raises:
+        HTTPException: 404 if not found, 416 if the range is unsatisfiable
+    """
+    fictions = get_fictions_collection("fictions.content")
+
+    fiction = await fictions.find_one(
+        {"_id": fiction_id}, {"content": 1, "content_codec": 1, "version": 1}
+    )
+
+    if not fiction:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Fiction not found"
+        )
+
+    etag = version_etag(fiction.get("version", 0))
+    headers = {"ETag": etag, "Accept-Ranges": "bytes"}
+
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    data = decode_content(fiction)["content"].encode("utf-8")
+    size = len(data)
+
+    # A stale If-Range means the client's partial copy is outdated: send it all
+    if if_range is not None and if_range.strip() != etag:
+        range_header = None
+
+    try:
+        byte_range = parse_byte_range(range_header, size)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+
+    status_code = status.HTTP_200_OK
+    start, end = 0, size - 1
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    return StreamingResponse(
+        iter_chunks(data, start, end, settings.content_stream_chunk_bytes),
+        status_code=status_code,
+        media_type="text/plain; charset=utf-8",
+        headers=headers,
+    )
+
+
 @router.post("/", response_model=FictionResponse, status_code=status.HTTP_201_CREATED)
-@limiter.limit(settings.api_rate_limit)
+@limiter.limit(API_RATE_LIMIT)
 async def create_fiction(
     request: Request,
     fiction_data: FictionCreate,
@@ -86,48 +651,311 @@ async def create_fiction(
         "created_by": current_user.user_id,
         "created_at": datetime.utcnow().isoformat(),
         "updated_at": datetime.utcnow().isoformat(),
+        "version": 1,
+    }
+
+    await fictions.insert_one(
+        {**fiction_dict, **encode_content(fiction_dict["content"])}
+    )
+    await record_fiction_write(None, fiction_dict)
+    await search_engine.index_fiction(fiction_dict)
+
+    return await _cached_response(
+        _cache_fiction(fiction_dict), status_code=status.HTTP_201_CREATED
+    )
+
+
+BATCH_DONE_STATUS = {"create": "created", "update": "updated", "delete": "deleted"}
+
+
+@dataclass
+class _BatchPlan:
+    """Bulk requests for a batch and the per-item results they map to"""
+
+    user_id: str
+    now: str
+    # fiction id -> counted fields, for targeted fictions the caller owns
+    owned: Dict[str, dict]
+    results: List[dict] = field(default_factory=list)
+    requests: list = field(default_factory=list)
+    # bulk request index -> result index
+    request_to_result: List[int] = field(default_factory=list)
+    created: Dict[str, dict] = field(default_factory=dict)
+    # result index -> $set fields of an update
+    updates: Dict[int, dict] = field(default_factory=dict)
+
+    def add(self, index: int, op, target_id: str, request) -> None:
+        self.results.append({"index": index, "op": op.op, "id": target_id})
+        self.requests.append(request)
+        self.request_to_result.append(len(self.results) - 1)
+
+    def reject(self, index: int, op, target_id: Optional[str], **result) -> None:
+        self.results.append({"index": index, "op": op.op, "id": target_id, **result})
+
+
+async def _owned_fictions(fictions, batch: FictionBatchRequest, user_id: str) -> dict:
+    """
+    One round trip to learn which targeted fictions the caller owns (and
+    their counted fields, for the stats counters)
+    """
+    target_ids = [op.id for op in batch.operations if not isinstance(op, BatchCreate)]
+    owned = {}
+    if target_ids:
+        async for doc in fictions.find(
+            {"_id": {"$in": target_ids}, "created_by": user_id},
+            {"genre": 1, "author": 1, "created_by": 1},
+        ):
+            owned[doc.pop("_id")] = doc
+    return owned
+
+
+def _plan_operation(plan: _BatchPlan, index: int, op) -> bool:
+    """Add the bulk request for one operation; False if it was rejected"""
+    if isinstance(op, BatchCreate):
+        fiction_dict = {
+            "_id": str(ObjectId()),
+            **op.data.model_dump(),
+            "created_by": plan.user_id,
+            "created_at": plan.now,
+            "updated_at": plan.now,
+            "version": 1,
+        }
+        plan.created[fiction_dict["_id"]] = fiction_dict
+        plan.add(
+            index,
+            op,
+            fiction_dict["_id"],
+            InsertOne({**fiction_dict, **encode_content(fiction_dict["content"])}),
+        )
+        return True
+
+    if op.id not in plan.owned:
+        plan.reject(index, op, op.id, status="not_found")
+        return False
+
+    owner_filter = {"_id": op.id, "created_by": plan.user_id}
+    if not isinstance(op, BatchUpdate):
+        plan.add(index, op, op.id, DeleteOne(owner_filter))
+        return True
+
+    update_data = {
+        k: v for k, v in op.data.model_dump(exclude_unset=True).items() if v is not None
+    }
+    if not update_data:
+        plan.reject(index, op, op.id, status="error", error="No fields to update")
+        return False
+    if "content" in update_data:
+        update_data.update(encode_content(update_data["content"]))
+    update_data["updated_at"] = plan.now
+    plan.add(
+        index,
+        op,
+        op.id,
+        UpdateOne(owner_filter, {"$set": update_data, "$inc": {"version": 1}}),
+    )
+    plan.updates[len(plan.results) - 1] = update_data
+    return True
+
+
+def _plan_batch(batch: FictionBatchRequest, plan: _BatchPlan) -> None:
+    """Validate the operations and build their bulk requests"""
+    halted = False
+    for index, op in enumerate(batch.operations):
+        if halted:
+            target_id = None if isinstance(op, BatchCreate) else op.id
+            plan.reject(index, op, target_id, status="skipped")
+        elif not _plan_operation(plan, index, op):
+            halted = batch.ordered
+
+
+async def _write_batch(fictions, plan: _BatchPlan, ordered: bool) -> dict:
+    """Run the bulk write, set each item's status and return the totals"""
+    failed = {}
+    executed = len(plan.requests)
+    try:
+        result = await fictions.bulk_write(plan.requests, ordered=ordered)
+        details = result.bulk_api_result
+    except BulkWriteError as e:
+        details = e.details
+        for error in details.get("writeErrors", []):
+            failed[error["index"]] = error.get("errmsg", "Write failed")
+        if ordered and failed:
+            # Ordered writes stop at the first error
+            executed = min(failed) + 1
+
+    for request_index, result_index in enumerate(plan.request_to_result):
+        item = plan.results[result_index]
+        if request_index in failed:
+            item.update(status="error", error=failed[request_index])
+        elif request_index >= executed:
+            item["status"] = "skipped"
+        else:
+            item["status"] = BATCH_DONE_STATUS[item["op"]]
+
+    totals = {
+        "inserted": details.get("nInserted", 0),
+        "updated": details.get("nMatched", 0),
+        "deleted": details.get("nRemoved", 0),
     }
+    await _reconcile_unmatched(fictions, plan, totals)
+    return totals
+
+
+async def _reconcile_unmatched(fictions, plan: _BatchPlan, totals: dict) -> None:
+    """
+    Re-mark updates and deletes that matched nothing
+
+    Matching no document is not a write error: it happens when a fiction
+    is deleted after _owned_fictions saw it. Such items must not count as
+    written, or the stats would be decremented a second time. Missing
+    updates are found by reading their ids back. Deletes leave nothing to
+    read, so they are only attributed exactly when none of them matched;
+    otherwise they are reported as conflict.
+    """
+    updated = [item for item in plan.results if item.get("status") == "updated"]
+    deleted = [item for item in plan.results if item.get("status") == "deleted"]
+
+    if len(updated) > totals["updated"]:
+        # Deleted later in this batch: gone now, but the update matched
+        deleted_ids = {item["id"] for item in deleted}
+        present = {
+            doc["_id"]
+            async for doc in fictions.find(
+                {"_id": {"$in": [item["id"] for item in updated]}}, {"_id": 1}
+            )
+        }
+        for item in updated:
+            if item["id"] not in present and item["id"] not in deleted_ids:
+                item["status"] = "not_found"
+
+    if len(deleted) > totals["deleted"]:
+        vanished = "not_found" if totals["deleted"] == 0 else "conflict"
+        for item in deleted:
+            item["status"] = vanished
+
+
+async def _apply_batch_side_effects(fictions, plan: _BatchPlan, totals: dict) -> None:
+    """
+    Keep the search index, the read cache and the stats counters in step
+    with what was written (replaying operations in order)
+    """
+    owned = plan.owned
+    updated_ids = []
+    deltas = Counter()
+    conflicts = 0
+    for result_index, item in enumerate(plan.results):
+        if item["status"] == "created":
+            fiction_dict = plan.created[item["id"]]
+            await search_engine.index_fiction(fiction_dict)
+            _cache_fiction(fiction_dict)
+            deltas.update(stat_deltas(None, fiction_dict))
+        elif item["status"] == "updated":
+            updated_ids.append(item["id"])
+            fiction_cache.invalidate(item["id"])
+            before = owned[item["id"]]
+            after = {**before, **plan.updates[result_index]}
+            owned[item["id"]] = after
+            deltas.update(stat_deltas(before, after))
+        elif item["status"] == "deleted":
+            await search_engine.remove_fiction(item["id"])
+            fiction_cache.invalidate(item["id"])
+            deltas.update(stat_deltas(owned[item["id"]], None))
+        elif item["status"] == "conflict":
+            # Gone either way, but which deletes were ours is unknown
+            await search_engine.remove_fiction(item["id"])
+            fiction_cache.invalidate(item["id"])
+            conflicts += 1
+
+    if conflicts:
+        logger.warning(
+            f"{conflicts} batch deletes raced other deletes; run "
+            "python -m src.utils.stats --rebuild to correct the counters"
+        )
+
+    if totals["inserted"] or totals["updated"] or totals["deleted"]:
+        await apply_stat_deltas(deltas)
 
-    await fictions.insert_one(fiction_dict)
+    if updated_ids:
+        generations = {i: fiction_cache.generation(i) for i in updated_ids}
+        async for fiction in fictions.find({"_id": {"$in": updated_ids}}):
+            decode_content(fiction)
+            await search_engine.index_fiction(fiction)
+            _cache_fiction(fiction, generations[fiction["_id"]])
 
-    return fiction_dict
+
+@router.post("/batch", response_model=FictionBatchResponse)
+@limiter.limit(API_RATE_LIMIT)
+async def batch_fictions(
+    request: Request,
+    batch: FictionBatchRequest,
+    current_user: TokenData = Depends(get_current_user),
+):
+    """
+    Create, update and delete many fictions in one request
+
+    All operations are sent to Mongo as a single bulk_write. Update and
+    delete filters include created_by, so ownership is enforced by the
+    write itself; an ownership pre-check only serves to report per-item
+    not_found results. When ordered, processing stops at the first
+    failing operation and the rest are reported as skipped.
+
+    Args:
+        batch: Operations and whether to stop at the first failure
+        current_user: Current authenticated user
+
+    Returns:
+        Per-item results and totals
+    """
+    fictions = get_fictions_collection()
+    plan = _BatchPlan(
+        user_id=current_user.user_id,
+        now=datetime.utcnow().isoformat(),
+        owned=await _owned_fictions(fictions, batch, current_user.user_id),
+    )
+    _plan_batch(batch, plan)
+
+    totals = {"inserted": 0, "updated": 0, "deleted": 0}
+    if plan.requests:
+        totals = await _write_batch(fictions, plan, batch.ordered)
+        await _apply_batch_side_effects(fictions, plan, totals)
+
+    return {"results": plan.results, **totals}
 
 
 @router.put("/{fiction_id}", response_model=FictionResponse)
-@limiter.limit(settings.api_rate_limit)
+@limiter.limit(API_RATE_LIMIT)
 async def update_fiction(
     request: Request,
     fiction_id: str,
     fiction_update: FictionUpdate,
     current_user: TokenData = Depends(get_current_user),
+    if_match: Optional[str] = Header(None),
 ):
     """
     Update a fiction
 
+    The ownership check, the update and reading the previous document
+    happen in a single atomic find_one_and_update; the result is the old
+    document with the update applied, and the old genre/author feed the
+    stats counters. Every update increments the
+    version field; send the ETag from a previous read as If-Match to only
+    update if nobody else has written since.
+
     Args:
         fiction_id: Fiction ID
         fiction_update: Fiction update data
         current_user: Current authenticated user
+        if_match: ETag of the version being updated
 
     Returns:
         Updated fiction data
 
     Raises:
-        HTTPException: If fiction not found or user not authorized
+        HTTPException: If fiction not found or user not authorized, or 412
+            if If-Match does not match the current version
     """
     fictions = get_fictions_collection()
 
-    # Check if fiction exists and user is the creator
-    fiction = await fictions.find_one(
-        {"_id": fiction_id, "created_by": current_user.user_id}
-    )
-
-    if not fiction:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Fiction not found or you don't have permission to update it",
-        )
-
     # Prepare update data (only include fields that were provided)
     update_data = {
         k: v
@@ -140,23 +968,47 @@ async def update_fiction(
             status_code=status.HTTP_400_BAD_REQUEST, detail="No fields to update"
         )
 
+    if "content" in update_data:
+        update_data.update(encode_content(update_data["content"]))
     update_data["updated_at"] = datetime.utcnow().isoformat()
 
-    # Update fiction
-    await fictions.update_one({"_id": fiction_id}, {"$set": update_data})
+    # Update only if the user is the creator (and the version matches)
+    previous = await fictions.find_one_and_update(
+        {
+            "_id": fiction_id,
+            "created_by": current_user.user_id,
+            **_version_filter(if_match),
+        },
+        {"$set": update_data, "$inc": {"version": 1}},
+        return_document=ReturnDocument.BEFORE,
+    )
+
+    if not previous:
+        await _raise_write_failed(
+            fictions, fiction_id, current_user.user_id, if_match, "update"
+        )
+
+    updated_fiction = {
+        **previous,
+        **update_data,
+        "version": (previous.get("version") or 0) + 1,
+    }
+    await record_fiction_write(previous, updated_fiction)
 
-    # Return updated fiction
-    updated_fiction = await fictions.find_one({"_id": fiction_id})
+    decode_content(updated_fiction)
+    await search_engine.index_fiction(updated_fiction)
 
-    return updated_fiction
+    # Replace the cached copy so the new ETag is fixed at write time
+    return await _cached_response(_cache_fiction(updated_fiction))
 
 
 @router.delete("/{fiction_id}", status_code=status.HTTP_200_OK)
-@limiter.limit(settings.api_rate_limit)
+@limiter.limit(API_RATE_LIMIT)
 async def delete_fiction(
     request: Request,
     fiction_id: str,
     current_user: TokenData = Depends(get_current_user),
+    if_match: Optional[str] = Header(None),
 ):
     """
     Delete a fiction
@@ -164,24 +1016,36 @@ async def delete_fiction(
     Args:
         fiction_id: Fiction ID
         current_user: Current authenticated user
+        if_match: Optional ETag of the version being deleted
 
     Returns:
         Success message
 
     Raises:
-        HTTPException: If fiction not found or user not authorized
+        HTTPException: If fiction not found or user not authorized, or 412
+            if If-Match does not match the current version
     """
     fictions = get_fictions_collection()
 
-    # Delete fiction (only if user is the creator)
-    result = await fictions.delete_one(
-        {"_id": fiction_id, "created_by": current_user.user_id}
+    # Delete fiction (only if user is the creator), returning the fields
+    # the stats counters need
+    deleted = await fictions.find_one_and_delete(
+        {
+            "_id": fiction_id,
+            "created_by": current_user.user_id,
+            **_version_filter(if_match),
+        },
+        projection={"genre": 1, "author": 1, "created_by": 1},
     )
 
-    if result.deleted_count == 0:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Fiction not found or you don't have permission to delete it",
+    if deleted is None:
+        await _raise_write_failed(
+            fictions, fiction_id, current_user.user_id, if_match, "delete"
         )
 
+    await record_fiction_write(deleted, None)
+
+    await search_engine.remove_fiction(fiction_id)
+    fiction_cache.invalidate(fiction_id)
+
     return {"message": "Fiction deleted successfully"}
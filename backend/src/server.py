@@ -0,0 +1,196 @@
+"""
+Production server launcher
+
+Runs the app under gunicorn with uvicorn workers (uvloop event loop and
+httptools parser when installed), one worker per CPU the container may
+use:
+
+    python -m src.server                 # WEB_CONCURRENCY or CPU quota
+    python -m src.server --workers 4
+
+Graceful rolling restart: send SIGHUP to the master. It starts a fresh
+set of workers with newly imported code (settings and logging
+included), then lets the old ones finish in-flight requests (up to
+GRACEFUL_TIMEOUT_SECONDS) before stopping them. Workers inherit the
+master's environment, so changed env vars still need a restart.
+SIGTERM drains and exits, which is what Kubernetes sends on rollout.
+"""
+
+from pathlib import Path
+from typing import Optional
+import argparse
+import atexit
+import importlib.util
+import logging
+import math
+import os
+import shutil
+import sys
+import tempfile
+
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+
+from .config.logging_config import configure_logging
+from .config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CGROUP_V2_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+CGROUP_V1_QUOTA = Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+CGROUP_V1_PERIOD = Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+
+
+def cpu_quota() -> Optional[float]:
+    """
+    CPUs allowed by the container's cgroup quota
+
+    Returns:
+        Quota in CPUs (e.g. 1.5), or None when unlimited or unknown
+    """
+    try:
+        if CGROUP_V2_CPU_MAX.exists():
+            quota, period = CGROUP_V2_CPU_MAX.read_text().split()
+            if quota == "max":
+                return None
+            return int(quota) / int(period)
+        if CGROUP_V1_QUOTA.exists():
+            quota = int(CGROUP_V1_QUOTA.read_text())
+            if quota <= 0:
+                return None
+            return quota / int(CGROUP_V1_PERIOD.read_text())
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def default_workers() -> int:
+    """One worker per usable CPU: the cgroup quota rounded up, capped by affinity"""
+    available = len(os.sched_getaffinity(0))
+    quota = cpu_quota()
+    if quota is not None:
+        available = min(available, math.ceil(quota))
+    return max(1, available)
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+class FictionsWorker(UvicornWorker):
+    """Uvicorn worker pinned to uvloop and httptools when available"""
+
+    CONFIG_KWARGS = {
+        "loop": "uvloop" if _installed("uvloop") else "asyncio",
+        "http": "httptools" if _installed("httptools") else "h11",
+        "lifespan": "on",
+        "proxy_headers": True,
+    }
+
+
+class Server(BaseApplication):
+    """Embedded gunicorn application"""
+
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # Imported in each worker after fork (no preload), so SIGHUP
+        # picks up new code. The master already imported settings and
+        # logging (and through them utils.metrics); forget every module of
+        # the package first so those are re-imported too, not inherited
+        package = __package__ + "."
+        for name in [n for n in sys.modules if n.startswith(package)]:
+            del sys.modules[name]
+        from .main import app
+
+        return app
+
+
+def _warn_per_process_state(workers: int) -> None:
+    """Point out state that does not span worker processes"""
+    if workers <= 1:
+        return
+    if settings.rate_limit_storage_uri.endswith("memory://"):
+        logger.warning(
+            "Rate limits use per-process memory storage; each of the "
+            f"{workers} workers enforces 1/{workers} of the limit. Set "
+            "RATE_LIMIT_STORAGE_URI for exact pod-wide limits."
+        )
+    if settings.search_backend == "memory":
+        logger.warning(
+            "SEARCH_BACKEND=memory keeps one index per worker; other "
+            "workers only see writes through the change stream, which needs "
+            "MongoDB to run as a replica set."
+        )
+
+
+def _metrics_directory() -> None:
+    """
+    Give the workers a fresh directory to publish their metrics in
+
+    Uses METRICS_MULTIPROC_DIR when set (old snapshots are removed, so
+    counters start from zero with the master), else a temporary directory
+    removed when the master exits.
+    """
+    path = settings.metrics_multiproc_dir
+    if path:
+        os.makedirs(path, exist_ok=True)
+        for snapshot in Path(path).glob("*.json"):
+            snapshot.unlink()
+        return
+    path = tempfile.mkdtemp(prefix="fictions-metrics-")
+    os.environ["METRICS_MULTIPROC_DIR"] = path
+    master = os.getpid()
+    # Workers run atexit handlers inherited from the master too
+    atexit.register(
+        lambda: os.getpid() == master and shutil.rmtree(path, ignore_errors=True)
+    )
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run the API under gunicorn")
+    parser.add_argument("--workers", type=int, default=settings.web_concurrency)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=settings.port)
+    args = parser.parse_args(argv)
+
+    configure_logging(use_queue=False)
+    workers = args.workers or default_workers()
+
+    # Workers re-import settings after fork (see Server.load), so pass it
+    # through the environment
+    os.environ["WORKER_COUNT"] = str(workers)
+    if settings.metrics_enabled:
+        _metrics_directory()
+    _warn_per_process_state(workers)
+
+    logger.info(
+        f"Starting {workers} workers "
+        f"(loop={FictionsWorker.CONFIG_KWARGS['loop']}, "
+        f"http={FictionsWorker.CONFIG_KWARGS['http']})"
+    )
+
+    Server(
+        {
+            "bind": f"{args.host}:{args.port}",
+            "workers": workers,
+            "worker_class": f"{__name__}.FictionsWorker",
+            "graceful_timeout": settings.graceful_timeout_seconds,
+            "timeout": settings.graceful_timeout_seconds + 30,
+            "keepalive": settings.keepalive_seconds,
+            "max_requests": settings.max_requests,
+            "max_requests_jitter": settings.max_requests_jitter,
+            "preload_app": False,
+            "accesslog": None,
+        }
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+In-process response caching utilities
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, NamedTuple, Optional, TypeVar
+import threading
+import time
+
+from ..config.settings import settings
+from .invalidation import ChangeEvent, invalidation_bus
+
+V = TypeVar("V")
+
+
+class CachedResponse(NamedTuple):
+    """
+    Serialized response body and its strong ETag
+
+    `encoded` holds compressed copies of body by content coding, filled on
+    first request, so a cached fiction is compressed at most once per
+    coding while its entry lives.
+    """
+
+    body: bytes
+    etag: str
+    encoded: Dict[str, bytes]
+
+    def charged_bytes(self) -> int:
+        """
+        Bytes charged against a cache budget
+
+        Compressed copies are added after the entry is cached; each is a
+        fraction of a text body, so twice the body covers them.
+        """
+        return 2 * len(self.body)
+
+
+def version_etag(version: int) -> str:
+    """Strong ETag for a document version (its identity-coded JSON)"""
+    return f'"v{version}"'
+
+
+def coded_etag(etag: str, encoding: Optional[str]) -> str:
+    """
+    ETag of one content coding of a representation
+
+    Compressed bodies differ byte for byte, so each coding gets its own
+    strong validator: '"v3"' -> '"v3-gzip"'.
+    """
+    if encoding is None:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _uncoded(etag: str) -> str:
+    """Strip W/ and any content-coding suffix: 'W/"v3-gzip"' -> '"v3"'"""
+    value = etag.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    base = value.strip('"').split("-", 1)[0]
+    return f'"{base}"'
+
+
+def parse_version_etag(if_match: str) -> Optional[int]:
+    """
+    Extract the version from an If-Match header produced by version_etag
+
+    Returns:
+        The version, or None if the header is not a version ETag
+    """
+    value = if_match.strip()
+    if value.startswith("W/"):
+        # Weak ETags never match for If-Match (RFC 9110 13.1.1)
+        return None
+    # Every coding of a version is current while the version is
+    value = _uncoded(value).strip('"')
+    if not value.startswith("v") or not value[1:].isdigit():
+        return None
+    return int(value[1:])
+
+
+def matching_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """
+    Find the client's ETag in an If-None-Match header that is current
+
+    Args:
+        if_none_match: Raw header value (may list several ETags or be "*")
+        etag: Current ETag of the resource (identity coding)
+
+    Returns:
+        The matching ETag without W/ (a coding of ``etag``, see
+        coded_etag), or None if the client's copy is outdated
+    """
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    for candidate in if_none_match.split(","):
+        # Weak comparison is allowed for If-None-Match (RFC 9110 13.1.2)
+        if _uncoded(candidate) == etag:
+            candidate = candidate.strip()
+            return candidate[2:] if candidate.startswith("W/") else candidate
+    return None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag
+
+    Args:
+        if_none_match: Raw header value (may list several ETags or be "*")
+        etag: Current ETag of the resource; any of its codings matches
+
+    Returns:
+        True if the client's copy is current
+    """
+    return matching_etag(if_none_match, etag) is not None
+
+
+class TTLCache(Generic[V]):
+    """
+    Bounded LRU cache whose entries also expire after a fixed TTL
+
+    All operations are O(1). A lock keeps the cache safe if it is touched
+    from executor threads as well as the event loop.
+
+    With max_bytes, entries are also evicted until the sizes reported by
+    sizeof fit the budget, and a value larger than max_bytes_per_entry
+    is not cached at all.
+
+    Each key has a generation, moved on by set() and invalidate(). A
+    read-through fill takes generation(key) before reading the source and
+    passes it to set(); the fill is dropped if a write or invalidation
+    happened in between, so it cannot put back a document older than the
+    one written. Generations are kept for the max_entries most recently
+    written keys; keys past that share the generation of the oldest one
+    forgotten, which can only drop a fill, never keep a stale one.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        max_bytes: int = 0,
+        max_bytes_per_entry: int = 0,
+        sizeof: Optional[Callable[[V], int]] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_bytes_per_entry = max_bytes_per_entry
+        self.sizeof = sizeof
+        self.bytes = 0
+        # key -> (expires at, value, size)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._generations: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._floor = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Return a live entry (refreshing its LRU position) or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self, key: Hashable) -> int:
+        """Generation of a key, to pass to set() when filling it after a read"""
+        with self._lock:
+            return self._generations.get(key, self._floor)
+
+    def _remove(self, key: Hashable) -> None:
+        # Called with the lock held
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def _too_large(self, size: int) -> bool:
+        if self.max_bytes_per_entry > 0 and size > self.max_bytes_per_entry:
+            return True
+        return self.max_bytes > 0 and size > self.max_bytes
+
+    def _bump(self, key: Hashable) -> None:
+        # Called with the lock held
+        self._counter += 1
+        self._generations[key] = self._counter
+        self._generations.move_to_end(key)
+        while len(self._generations) > max(self.max_entries, 1):
+            _, self._floor = self._generations.popitem(last=False)
+
+    def set(
+        self,
+        key: Hashable,
+        value: V,
+        ttl: Optional[float] = None,
+        generation: Optional[int] = None,
+    ) -> bool:
+        """
+        Insert or replace an entry, evicting the least recently used
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Lifetime in seconds (defaults to ttl_seconds)
+            generation: For a read-through fill, generation(key) taken
+                before the read; the fill is skipped if it has moved.
+                Without it the value is a write and moves the generation.
+
+        Returns:
+            False if the fill was skipped because of a newer write
+        """
+        with self._lock:
+            if generation is None:
+                self._bump(key)
+            elif self._generations.get(key, self._floor) != generation:
+                return False
+
+            # Whatever happens next, an older value must not stay behind
+            self._remove(key)
+            ttl = self.ttl_seconds if ttl is None else ttl
+            size = self.sizeof(value) if self.sizeof else 0
+            if self.max_entries <= 0 or ttl <= 0 or self._too_large(size):
+                return True
+            self._entries[key] = (time.monotonic() + ttl, value, size)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes > 0 and self.bytes > self.max_bytes
+            ):
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+            return True
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop an entry if present"""
+        with self._lock:
+            self._remove(key)
+            self._bump(key)
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self._generations.clear()
+            self._counter += 1
+            self._floor = self._counter
+
+
+# Serialized FictionResponse bodies keyed by fiction id
+fiction_cache: TTLCache[CachedResponse] = TTLCache(
+    settings.per_worker(settings.fiction_cache_max_entries),
+    settings.fiction_cache_ttl_seconds,
+    max_bytes=settings.per_worker(settings.fiction_cache_max_bytes),
+    max_bytes_per_entry=settings.fiction_cache_max_entry_bytes,
+    sizeof=CachedResponse.charged_bytes,
+)
+
+
+# Serialized FictionPage bodies keyed by (collection version, cursor,
+# limit, fields); a write moves the version on, so entries never need
+# invalidating and old ones age out
+list_cache: TTLCache[CachedResponse] = TTLCache(
+    settings.per_worker(settings.list_cache_max_entries),
+    settings.list_cache_ttl_seconds,
+    max_bytes=settings.per_worker(settings.list_cache_max_bytes),
+    sizeof=CachedResponse.charged_bytes,
+)
+
+
+def _invalidate_fiction(event: ChangeEvent) -> None:
+    """Drop a fiction written by another replica (or everything on reset)"""
+    if event.operation == "reset":
+        fiction_cache.clear()
+    else:
+        fiction_cache.invalidate(event.document_id)
+
+
+invalidation_bus.subscribe("fictions", _invalidate_fiction)
@@ -0,0 +1,86 @@
+"""
+Collection version for the fictions list
+
+A single counter document in the stats collection,
+
+    {"_id": "version:fictions", "kind": "version", "key": "fictions", "count": 42}
+
+is incremented by every create, update and delete, in the same bulk_write
+that adjusts the statistics counters (utils/stats), so writes pay no extra
+round trip. GET /api/fictions/ derives its ETag from it and serves a
+cached page, or 304, while it is unchanged.
+
+Workers keep the value for collection_version_ttl_seconds and drop it as
+soon as they write a fiction or the change stream reports the counter
+moved on another replica, so list responses trail another replica's
+write by at most that TTL, and only when change streams are unavailable.
+"""
+
+import time
+from typing import Optional
+
+from pymongo import UpdateOne
+
+from ..config.database import get_stats_collection
+from ..config.settings import settings
+from .invalidation import ChangeEvent, invalidation_bus
+from .singleflight import SingleFlight
+
+VERSION_ID = "version:fictions"
+
+_reads: SingleFlight = SingleFlight("fictions.version")
+# (version, read at monotonic time)
+_current: Optional[tuple] = None
+# Bumped by forget_version, so a read that started before it is not kept
+_generation = 0
+
+
+def version_bump() -> UpdateOne:
+    """Bulk operation incrementing the version (include it in every write)"""
+    return UpdateOne(
+        {"_id": VERSION_ID},
+        {"$inc": {"count": 1}, "$setOnInsert": {"kind": "version", "key": "fictions"}},
+        upsert=True,
+    )
+
+
+def forget_version() -> None:
+    """Drop the worker's copy so the next read fetches the counter"""
+    global _current, _generation
+    _current = None
+    _generation += 1
+
+
+async def _read_version() -> int:
+    global _current
+    generation = _generation
+    document = await get_stats_collection().find_one({"_id": VERSION_ID}, {"count": 1})
+    version = document["count"] if document else 0
+    if generation == _generation:
+        _current = (version, time.monotonic())
+    return version
+
+
+async def get_version() -> int:
+    """Current fictions version (0 before the first write)"""
+    current = _current
+    if current is not None:
+        version, read_at = current
+        if time.monotonic() - read_at < settings.collection_version_ttl_seconds:
+            return version
+    # Keyed by generation: a read started before this worker's last write
+    # is not shared with requests that come after it
+    return await _reads.do(_generation, _read_version)
+
+
+def list_etag(version: int) -> str:
+    """ETag of list pages at a collection version"""
+    return f'"c{version}"'
+
+
+def _on_stats_change(event: ChangeEvent) -> None:
+    if event.operation == "reset" or event.document_id == VERSION_ID:
+        forget_version()
+
+
+invalidation_bus.subscribe("stats", _on_stats_change, document_ids=[VERSION_ID])
@@ -0,0 +1,175 @@
+"""
+Transparent compression of fiction content
+
+Large `content` values are stored as compressed BSON binary with a
+`content_codec` field naming the codec. Reads that do not project
+`content` never touch the compressed bytes; reads that do decode them
+with decode_content. Run as a module to compress existing documents:
+
+    python -m src.utils.compression                # configured codec
+    python -m src.utils.compression --codec lzma   # re-encode with lzma
+"""
+
+from typing import Callable, Dict, Optional, Tuple
+import argparse
+import asyncio
+import logging
+import lzma
+import zlib
+
+from bson import Binary
+from pymongo import UpdateOne
+
+from ..config.database import Database, get_fictions_collection
+from ..config.settings import settings
+
+CODECS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (lambda data: lzma.compress(data, preset=1), lzma.decompress),
+}
+
+
+def encode_content(content: str, codec: Optional[str] = None) -> dict:
+    """
+    Build the stored fields for a content string
+
+    Content shorter than content_compression_min_bytes, or that would not
+    shrink, is stored as plain text.
+
+    Args:
+        content: Story text
+        codec: Codec name (defaults to content_compression_codec)
+
+    Returns:
+        Dict with `content` and `content_codec` to $set / insert
+    """
+    codec = codec or settings.content_compression_codec
+    raw = content.encode("utf-8")
+
+    if codec in CODECS and len(raw) >= settings.content_compression_min_bytes:
+        compressed = CODECS[codec][0](raw)
+        if len(compressed) < len(raw):
+            return {"content": Binary(compressed), "content_codec": codec}
+
+    return {"content": content, "content_codec": None}
+
+
+def decode_content(fiction: dict) -> dict:
+    """
+    Decompress a fiction's content in place (if it was compressed)
+
+    Also drops the internal content_codec field so it never reaches
+    clients.
+
+    Raises:
+        ValueError: If the stored codec is unknown
+    """
+    codec = fiction.pop("content_codec", None)
+    if codec and "content" in fiction:
+        if codec not in CODECS:
+            raise ValueError(f'Unknown content codec "{codec}"')
+        fiction["content"] = CODECS[codec][1](bytes(fiction["content"])).decode("utf-8")
+    return fiction
+
+
+def _stored_size(content) -> int:
+    """Size in bytes of a stored content value"""
+    if isinstance(content, str):
+        return len(content.encode("utf-8"))
+    return len(content)
+
+
+async def migrate_content(codec: Optional[str] = None, batch_size: int = 500) -> dict:
+    """
+    Re-encode stored content with the configured codec
+
+    Plain-text documents (including ones written before compression
+    existed) are compressed when they cross the size threshold. Already
+    compressed documents are left alone unless they use another codec.
+    Versions are not bumped: the content clients see does not change.
+    Each rewrite only applies if the document still has the version and
+    codec it was read with; documents written meanwhile are counted as
+    skipped and left for the next run.
+
+    Returns:
+        Counts of scanned/rewritten/skipped documents and content bytes
+        before/after
+    """
+    codec = codec or settings.content_compression_codec
+    target = codec if codec in CODECS else None
+    fictions = get_fictions_collection()
+    stats = {
+        "scanned": 0,
+        "rewritten": 0,
+        "skipped": 0,
+        "bytes_before": 0,
+        "bytes_after": 0,
+    }
+    requests = []
+
+    async for fiction in fictions.find(
+        {"content_codec": {"$ne": target}},
+        {"content": 1, "content_codec": 1, "version": 1},
+    ):
+        stats["scanned"] += 1
+        if fiction.get("content") is None:
+            continue
+
+        has_codec = "content_codec" in fiction
+        # A missing field matches null, so this also covers old documents
+        unchanged = {
+            "_id": fiction["_id"],
+            "version": fiction.get("version"),
+            "content_codec": fiction.get("content_codec"),
+        }
+        before = _stored_size(fiction["content"])
+        stored = encode_content(decode_content(fiction)["content"], codec)
+        stats["bytes_before"] += before
+        stats["bytes_after"] += _stored_size(stored["content"])
+
+        # Plain text that stays plain only needs the codec field backfilled
+        if stored["content_codec"] is None and has_codec:
+            continue
+
+        requests.append(UpdateOne(unchanged, {"$set": stored}))
+        if len(requests) >= batch_size:
+            await _write_batch(fictions, requests, stats)
+            requests = []
+
+    if requests:
+        await _write_batch(fictions, requests, stats)
+
+    return stats
+
+
+async def _write_batch(fictions, requests: list, stats: dict) -> None:
+    """Apply rewrites, counting those whose document changed meanwhile"""
+    result = await fictions.bulk_write(requests, ordered=False)
+    matched = result.bulk_api_result.get("nMatched", 0)
+    stats["rewritten"] += matched
+    stats["skipped"] += len(requests) - matched
+
+
+async def _main(codec: Optional[str]) -> int:
+    """Run the content migration from the CLI"""
+    await Database.connect_db()
+    try:
+        stats = await migrate_content(codec)
+        print(
+            f"Scanned {stats['scanned']}, rewrote {stats['rewritten']}, "
+            f"skipped {stats['skipped']} written meanwhile; "
+            f"content {stats['bytes_before']} -> {stats['bytes_after']} bytes"
+        )
+        return 0
+    finally:
+        await Database.close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compress stored fiction content")
+    parser.add_argument(
+        "--codec", choices=[*CODECS, "none"], help="codec to re-encode with"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(asyncio.run(_main(args.codec)))
@@ -0,0 +1,85 @@
+"""
+HTTP response compression (Content-Encoding negotiation)
+
+Separate from utils/compression, which compresses content at rest. Here
+bodies are compressed per request for clients that send Accept-Encoding:
+brotli when the brotli package is installed, otherwise gzip. Bodies
+below response_compression_min_bytes are sent as is; the framing and
+CPU cost outweigh the saving. Large bodies are compressed on a worker
+thread (zlib and brotli release the GIL) so one long story does not stall
+every other request on the event loop.
+"""
+
+from typing import Optional
+import asyncio
+import gzip
+
+from ..config.settings import settings
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only
+    brotli = None
+
+# Preferred first when the client accepts both equally
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick a content coding from an Accept-Encoding header
+
+    Args:
+        accept_encoding: Raw header value, e.g. "gzip, deflate, br;q=0.9"
+
+    Returns:
+        "br", "gzip", or None to send the identity coding
+    """
+    if not accept_encoding or not settings.response_compression_enabled:
+        return None
+
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                continue
+        weights[name.strip().lower()] = weight
+
+    wildcard = weights.get("*", 0.0)
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, wildcard)
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body with a coding returned by negotiate_encoding"""
+    if encoding == "br":
+        return brotli.compress(
+            body,
+            mode=brotli.MODE_TEXT,
+            quality=settings.response_compression_brotli_quality,
+        )
+    return gzip.compress(
+        body, compresslevel=settings.response_compression_gzip_level, mtime=0
+    )
+
+
+async def compress_async(body: bytes, encoding: str) -> bytes:
+    """compress(), off the event loop for bodies above the thread threshold"""
+    if len(body) >= settings.response_compression_thread_min_bytes:
+        return await asyncio.to_thread(compress, body, encoding)
+    return compress(body, encoding)
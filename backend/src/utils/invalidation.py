@@ -0,0 +1,239 @@
+"""
+Cross-replica cache invalidation from MongoDB change streams
+
+Each worker caches fictions in process (fiction_cache, the in-memory
+search index), so a write served by one replica would leave stale copies
+on the others until their TTL runs out. ChangeStreamWatcher runs in the
+background from the app lifespan, follows a change stream on the watched
+collections that have subscribers and hands every change to the
+subscribers registered on invalidation_bus. Subscribers that only care
+about some documents say so, and other changes are filtered out on the
+server (the stats collection takes one counter write per fiction write,
+but only its version document invalidates anything).
+
+The watcher keeps the stream's resume token, so after a network error or
+failover it reopens the stream where it left off and no change is missed.
+If the token can no longer be resumed (the oplog rolled over), subscribers
+get a "reset" event and drop everything they hold for that collection.
+
+Change streams need a replica set; against a standalone mongod the
+watcher logs a warning and stops, and caches fall back to their TTL.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set
+import asyncio
+import inspect
+import logging
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from ..config.database import Database
+from ..config.settings import settings
+from .metrics import cache_invalidations
+
+logger = logging.getLogger(__name__)
+
+# Server error codes
+NOT_A_REPLICA_SET = 40573
+CHANGE_STREAM_HISTORY_LOST = 286
+CHANGE_STREAM_FATAL_ERROR = 280
+
+# Operation types that change a single document
+DOCUMENT_OPERATIONS = ("insert", "update", "replace", "delete")
+
+
+class ChangeEvent(NamedTuple):
+    """One change to a watched collection"""
+
+    collection: str
+    # insert, update, replace, delete, or reset (drop everything held)
+    operation: str
+    document_id: Optional[Any] = None
+    # Post-image, only when a subscriber asked for full documents
+    document: Optional[dict] = None
+
+
+Subscriber = Callable[[ChangeEvent], Any]
+
+
+class InvalidationBus:
+    """In-process fan-out of change events to cache subscribers"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[Subscriber]] = {}
+        self._full_document = set()
+        # collection -> ids some subscriber wants, None for every document
+        self._document_ids: Dict[str, Optional[Set[Any]]] = {}
+
+    def subscribe(
+        self,
+        collection: str,
+        callback: Subscriber,
+        full_document: bool = False,
+        document_ids: Optional[Iterable[Any]] = None,
+    ) -> None:
+        """
+        Register a callback for changes to a collection
+
+        Args:
+            collection: Collection name
+            callback: Called with each ChangeEvent; may be a coroutine function
+            full_document: Whether the callback needs the post-image of
+                inserts and updates (costs a lookup per update on the server)
+            document_ids: Only changes to these documents (and resets) are
+                needed; None for every document
+        """
+        self._subscribers.setdefault(collection, []).append(callback)
+        if full_document:
+            self._full_document.add(collection)
+        wanted = self._document_ids.get(collection, set())
+        if wanted is None or document_ids is None:
+            self._document_ids[collection] = None
+        else:
+            self._document_ids[collection] = wanted | set(document_ids)
+
+    def wants_full_document(self) -> bool:
+        return bool(self._full_document)
+
+    def collections(self) -> List[str]:
+        """Collections with at least one subscriber"""
+        return list(self._subscribers)
+
+    def document_ids(self, collection: str) -> Optional[Set[Any]]:
+        """Documents of a collection subscribers need, None for all"""
+        return self._document_ids.get(collection)
+
+    async def publish(self, event: ChangeEvent) -> None:
+        """Deliver an event; a failing subscriber does not stop the others"""
+        cache_invalidations.inc(collection=event.collection, operation=event.operation)
+        for callback in self._subscribers.get(event.collection, ()):
+            try:
+                result = callback(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception(f"Invalidation subscriber failed for {event}")
+
+    async def reset(self, collections: List[str]) -> None:
+        """Tell subscribers to drop everything they cache for these collections"""
+        for collection in collections:
+            await self.publish(ChangeEvent(collection, "reset"))
+
+
+invalidation_bus = InvalidationBus()
+
+
+class ChangeStreamWatcher:
+    """
+    Follows one database-level change stream filtered to the watched
+    collections (those that have subscribers) and publishes each change
+    on a bus
+    """
+
+    def __init__(self, bus: InvalidationBus, collections: List[str]):
+        self.bus = bus
+        subscribed = bus.collections()
+        self.collections = [c for c in collections if c in subscribed]
+        ignored = [c for c in collections if c not in subscribed]
+        if ignored:
+            logger.info(f"Not watching {ignored}: nothing caches them")
+        self.resume_token: Optional[dict] = None
+        # Set once the stream is open, so callers (and tests) can write
+        # knowing the change will be seen
+        self.started = asyncio.Event()
+
+    def _namespace_filter(self, collection: str) -> dict:
+        ids = self.bus.document_ids(collection)
+        if ids is None:
+            return {"ns.coll": collection}
+        return {
+            "ns.coll": collection,
+            "$or": [
+                {"documentKey._id": {"$in": list(ids)}},
+                {"operationType": {"$in": ["drop", "rename"]}},
+            ],
+        }
+
+    def _pipeline(self) -> List[dict]:
+        pipeline = [
+            {
+                "$match": {
+                    "$or": [self._namespace_filter(c) for c in self.collections],
+                    "operationType": {"$in": [*DOCUMENT_OPERATIONS, "drop", "rename"]},
+                }
+            }
+        ]
+        if self.bus.wants_full_document():
+            # Content can be large and no cache needs it
+            pipeline.append({"$project": {"fullDocument.content": 0}})
+        return pipeline
+
+    def _event(self, change: dict) -> ChangeEvent:
+        collection = change["ns"]["coll"]
+        operation = change["operationType"]
+        if operation not in DOCUMENT_OPERATIONS:
+            # drop / rename of a watched collection
+            return ChangeEvent(collection, "reset")
+        return ChangeEvent(
+            collection,
+            operation,
+            change["documentKey"]["_id"],
+            change.get("fullDocument"),
+        )
+
+    async def _follow(self) -> None:
+        """Open the stream (resuming if possible) and publish until it closes"""
+        options = {
+            "max_await_time_ms": settings.change_stream_max_await_ms,
+            "resume_after": self.resume_token,
+        }
+        if self.bus.wants_full_document():
+            options["full_document"] = "updateLookup"
+
+        async with Database.get_database().watch(self._pipeline(), **options) as stream:
+            self.resume_token = stream.resume_token
+            self.started.set()
+            while stream.alive:
+                change = await stream.try_next()
+                if change is not None:
+                    await self.bus.publish(self._event(change))
+                # Advances on idle batches too, so a resume after a quiet
+                # period does not replay from an old position
+                self.resume_token = stream.resume_token
+
+    async def run(self) -> None:
+        """Watch until cancelled, reconnecting with backoff"""
+        if not self.collections:
+            return
+        delay = 0.5
+        while True:
+            try:
+                await self._follow()
+                # The server closed the stream (invalidate, e.g. the
+                # database was dropped); it cannot be resumed past that
+                logger.warning("Change stream invalidated, resetting caches")
+                self.resume_token = None
+                await self.bus.reset(self.collections)
+                delay = 0.5
+                continue
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code == NOT_A_REPLICA_SET:
+                    logger.warning(
+                        "MongoDB is not a replica set; cross-replica cache "
+                        "invalidation is off (caches expire by TTL)"
+                    )
+                    return
+                if e.code in (CHANGE_STREAM_HISTORY_LOST, CHANGE_STREAM_FATAL_ERROR):
+                    logger.warning(
+                        f"Change stream cannot resume, resetting caches: {e}"
+                    )
+                    self.resume_token = None
+                    await self.bus.reset(self.collections)
+                    continue
+                logger.error(f"Change stream failed, retrying in {delay:.1f}s: {e}")
+            except PyMongoError as e:
+                logger.error(f"Change stream failed, retrying in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
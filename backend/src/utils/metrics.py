@@ -0,0 +1,539 @@
+"""
+Prometheus-style metrics
+
+A small, dependency-free registry rendered in the Prometheus text
+exposition format at /metrics. Every metric the API exports is declared
+at the bottom of this module; labels only ever take values from bounded
+sets (route templates, HTTP methods, Mongo command names, ...), never
+raw paths or ids.
+
+Metrics are updated from the event loop and from Motor/bcrypt worker
+threads, so every update takes the metric's lock.
+
+Under gunicorn every worker has its own registry. When
+METRICS_MULTIPROC_DIR is set (src/server.py does) each worker also
+writes a snapshot of its values there, and /metrics renders the sum over
+all workers of the pod, including ones that have exited, so counters
+never go backwards whichever worker answers the scrape. Gauges only
+count live workers.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Mongo commands the API issues; anything else is reported as "other"
+MONGO_COMMANDS = frozenset(
+    {
+        "find",
+        "getMore",
+        "insert",
+        "update",
+        "delete",
+        "findAndModify",
+        "aggregate",
+        "count",
+        "listIndexes",
+        "createIndexes",
+        "dropIndexes",
+        "explain",
+        "killCursors",
+        "ping",
+        "hello",
+        "isMaster",
+    }
+)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text format"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Metric:
+    """Base class: a named family of label-keyed samples"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def state(self) -> list:
+        """Current values, JSON-serializable: one [labels, ...] row per key"""
+        raise NotImplementedError
+
+    def merge(self, states: List[list]) -> list:
+        """One state holding the sum of ``states``"""
+        raise NotImplementedError
+
+    def samples(self, state: list) -> List[str]:
+        raise NotImplementedError
+
+    def render(self, states: Optional[List[list]] = None) -> str:
+        """Exposition lines for the current values, or the sum of ``states``"""
+        header = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        state = self.state() if states is None else self.merge(states)
+        return "\n".join(header + self.samples(state))
+
+
+class Counter(Metric):
+    """Monotonically increasing value"""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def state(self) -> list:
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, states: List[list]) -> list:
+        merged: Dict[Tuple[str, ...], float] = {}
+        for state in states:
+            for key, value in state:
+                key = tuple(key)
+                merged[key] = merged.get(key, 0.0) + value
+        return [[list(key), value] for key, value in merged.items()]
+
+    def samples(self, state: list) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in state
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, with sum and count"""
+
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # key -> ([per-bucket counts], sum)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    def state(self) -> list:
+        with self._lock:
+            return [
+                [list(key), list(counts), total]
+                for key, (counts, total) in self._values.items()
+            ]
+
+    def merge(self, states: List[list]) -> list:
+        merged: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+        empty = ([0] * len(self.buckets), 0.0)
+        for state in states:
+            for key, counts, total in state:
+                if len(counts) != len(self.buckets):
+                    continue  # written by a worker running other buckets
+                key = tuple(key)
+                summed, summed_total = merged.get(key, empty)
+                merged[key] = (
+                    [a + b for a, b in zip(summed, counts)],
+                    summed_total + total,
+                )
+        return [[list(key), counts, total] for key, (counts, total) in merged.items()]
+
+    def samples(self, state: list) -> List[str]:
+        lines = []
+        for key, counts, total in state:
+            key = tuple(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(
+                    self.labelnames + ("le",), key + (_format_value(bound),)
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self, gauges: bool = True) -> Dict[str, list]:
+        """State of every metric by name (see Metric.state)"""
+        return {
+            name: metric.state()
+            for name, metric in self._metrics.items()
+            if gauges or metric.kind != "gauge"
+        }
+
+    def merge(self, snapshots: List[dict], gauges: bool = True) -> Dict[str, list]:
+        """One snapshot holding the sum of ``snapshots``"""
+        return {
+            name: metric.merge([s[name] for s in snapshots if name in s])
+            for name, metric in self._metrics.items()
+            if gauges or metric.kind != "gauge"
+        }
+
+    def render(self, snapshots: Optional[List[dict]] = None) -> bytes:
+        """
+        Text exposition format (version 0.0.4)
+
+        Args:
+            snapshots: Render the sum of these (see snapshot()) instead of
+                this registry's own values
+        """
+        if snapshots is None:
+            rendered = [m.render() for m in self._metrics.values()]
+        else:
+            rendered = [
+                m.render([s[name] for s in snapshots if name in s])
+                for name, m in self._metrics.items()
+            ]
+        return ("\n".join(rendered) + "\n").encode("utf-8")
+
+
+class SnapshotDirectory:
+    """
+    Registry snapshots of all worker processes, shared through a directory
+
+    Each worker owns one file, ``<pid>-<random>.json``, replaced atomically
+    on every write, so readers never see a partial snapshot and a reused
+    pid never overwrites an exited worker's values. Snapshots of exited
+    workers are folded into ``retired.json`` (without gauges) under a file
+    lock, so the directory does not grow as workers are recycled.
+    """
+
+    RETIRED = "retired.json"
+
+    def __init__(self, path: str, registry: Registry):
+        self.path = Path(path)
+        self.registry = registry
+        self._pid: Optional[int] = None
+        self._file: Optional[Path] = None
+
+    def _own_file(self) -> Path:
+        # Named on first use in each process, i.e. after fork
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._file = self.path / f"{self._pid}-{uuid.uuid4().hex[:8]}.json"
+        return self._file
+
+    @staticmethod
+    def _write(path: Path, snapshot: dict) -> None:
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(snapshot))
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _read(path: Path) -> dict:
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def write(self, final: bool = False) -> None:
+        """
+        Publish this process's values
+
+        Args:
+            final: The process is exiting; leave its gauges out
+        """
+        self._write(self._own_file(), self.registry.snapshot(gauges=not final))
+
+    def collect(self) -> List[dict]:
+        """Snapshots of the other live workers plus the retired totals"""
+        with open(self.path / ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            live, exited = [], []
+            for path in self.path.glob("*-*.json"):
+                pid = int(path.name.split("-", 1)[0])
+                if pid != os.getpid():
+                    (live if self._alive(pid) else exited).append(path)
+            retired = self._read(self.path / self.RETIRED)
+            if exited:
+                retired = self.registry.merge(
+                    [retired] + [self._read(p) for p in exited], gauges=False
+                )
+                self._write(self.path / self.RETIRED, retired)
+                for path in exited:
+                    path.unlink(missing_ok=True)
+            return [self._read(p) for p in live] + [retired]
+
+    def render(self) -> bytes:
+        """Exposition of the sum over all workers, this one's values live"""
+        return self.registry.render(self.collect() + [self.registry.snapshot()])
+
+
+async def publish_snapshots(directory: SnapshotDirectory, interval: float) -> None:
+    """Write this worker's snapshot every ``interval`` seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(directory.write)
+        except OSError as e:
+            logger.warning(f"Could not publish metrics snapshot: {e}")
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+registry = Registry()
+
+http_request_duration = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route template",
+        ("method", "route", "status"),
+    )
+)
+http_requests_in_flight = registry.register(
+    Gauge(
+        "http_requests_in_flight", "HTTP requests currently being served", ("method",)
+    )
+)
+mongo_command_duration = registry.register(
+    Histogram(
+        "mongo_command_duration_seconds",
+        "MongoDB command round-trip time",
+        ("command", "outcome"),
+    )
+)
+mongo_pool_checkout_wait = registry.register(
+    Histogram(
+        "mongo_pool_checkout_wait_seconds",
+        "Time spent waiting to check a connection out of the pool",
+        ("outcome",),
+    )
+)
+password_hash_duration = registry.register(
+    Histogram(
+        "password_hash_duration_seconds",
+        "bcrypt time on the worker thread",
+        ("operation",),
+        buckets=(0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.4, 0.5, 0.75, 1.0, 2.0),
+    )
+)
+password_hash_rejections = registry.register(
+    Counter(
+        "password_hash_rejections_total",
+        "bcrypt jobs rejected because the queue was full",
+    )
+)
+jwt_verifications = registry.register(
+    Counter(
+        "jwt_verifications_total",
+        "Bearer token checks by result",
+        ("result",),
+    )
+)
+jwt_verify_duration = registry.register(
+    Histogram(
+        "jwt_verify_duration_seconds",
+        "JWT signature verification time on cache misses",
+        ("backend",),
+        buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.01),
+    )
+)
+rate_limit_rejections = registry.register(
+    Counter(
+        "rate_limit_rejections_total",
+        "Requests rejected with 429 by route template",
+        ("route",),
+    )
+)
+
+cache_invalidations = registry.register(
+    Counter(
+        "cache_invalidations_total",
+        "Change stream events delivered to in-process caches",
+        ("collection", "operation"),
+    )
+)
+
+log_records_dropped = registry.register(
+    Counter(
+        "log_records_dropped_total",
+        "Log records below ERROR dropped because the log queue was full",
+    )
+)
+
+singleflight_calls = registry.register(
+    Counter(
+        "singleflight_calls_total",
+        "Coalesced reads: leaders query MongoDB, followers share their result",
+        ("name", "role"),
+    )
+)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Feed Mongo command durations into mongo_command_duration"""
+
+    def _observe(self, event, outcome: str) -> None:
+        command = event.command_name
+        if command not in MONGO_COMMANDS:
+            command = "other"
+        mongo_command_duration.observe(
+            event.duration_micros / 1e6, command=command, outcome=outcome
+        )
+
+    def started(self, event) -> None:
+        pass
+
+    def succeeded(self, event) -> None:
+        self._observe(event, "success")
+
+    def failed(self, event) -> None:
+        self._observe(event, "failure")
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """
+    Time connection checkouts into mongo_pool_checkout_wait
+
+    A checkout starts and finishes on the same Motor worker thread, so the
+    start time is kept in a thread-local.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _finish(self, outcome: str) -> None:
+        start: Optional[float] = getattr(self._local, "start", None)
+        if start is not None:
+            self._local.start = None
+            mongo_pool_checkout_wait.observe(
+                time.perf_counter() - start, outcome=outcome
+            )
+
+    def connection_check_out_started(self, event) -> None:
+        self._local.start = time.perf_counter()
+
+    def connection_checked_out(self, event) -> None:
+        self._finish("success")
+
+    def connection_check_out_failed(self, event) -> None:
+        self._finish(str(event.reason))
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        pass
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        pass
+
+    def connection_checked_in(self, event) -> None:
+        pass
+
+
+def mongo_event_listeners() -> list:
+    """Listeners to pass to the Mongo client"""
+    return [MongoCommandListener(), MongoPoolListener()]
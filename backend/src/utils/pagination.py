@@ -0,0 +1,77 @@
+"""
+Keyset (cursor) pagination utilities
+"""
+
+import base64
+import json
+from typing import Optional, Tuple
+
+# Sort order used by paginated list endpoints: newest first, _id as tie-breaker.
+# Must match the (created_at, _id) compound index on the fictions collection.
+KEYSET_SORT = [("created_at", -1), ("_id", -1)]
+
+
+def encode_cursor(created_at: str, doc_id: str) -> str:
+    """
+    Encode the sort key of the last document on a page as an opaque cursor
+
+    Args:
+        created_at: created_at value of the last document
+        doc_id: _id of the last document
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps([created_at, doc_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Opaque cursor string
+
+    Returns:
+        Tuple of (created_at, _id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, doc_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(created_at, str) or not isinstance(doc_id, str):
+        raise ValueError("Invalid cursor")
+
+    return created_at, doc_id
+
+
+def keyset_filter(after: Optional[str]) -> dict:
+    """
+    Build the Mongo filter selecting documents after a cursor
+
+    Args:
+        after: Cursor of the last document already seen, or None
+
+    Returns:
+        Filter dict (empty for the first page)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if not after:
+        return {}
+
+    created_at, doc_id = decode_cursor(after)
+
+    return {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": doc_id}},
+        ]
+    }
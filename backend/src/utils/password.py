@@ -2,8 +2,22 @@
 Password hashing and verification utilities
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+import asyncio
+import time
+
 import bcrypt
 
+from ..config.settings import settings
+from .metrics import password_hash_duration, password_hash_rejections
+
+T = TypeVar("T")
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing queue is full"""
+
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
@@ -19,3 +33,75 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     password_bytes = plain_password.encode("utf-8")
     hashed_bytes = hashed_password.encode("utf-8")
     return bcrypt.checkpw(password_bytes, hashed_bytes)
+
+
+def _timed(func: Callable[..., T], *args) -> T:
+    """Run func on the worker thread, recording how long bcrypt took"""
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        password_hash_duration.observe(
+            time.perf_counter() - start, operation=func.__name__
+        )
+
+
+class PasswordExecutor:
+    """
+    Bounded thread pool for bcrypt work
+
+    bcrypt releases the GIL while hashing, so running it in threads keeps
+    the event loop free for other requests. Jobs beyond max_queue (running
+    plus waiting) are rejected immediately instead of piling up.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """
+        Run func(*args) on the pool
+
+        Raises:
+            PasswordHasherBusy: If max_queue jobs are already pending
+        """
+        if self.pending >= self.max_queue:
+            password_hash_rejections.inc()
+            raise PasswordHasherBusy()
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="bcrypt"
+            )
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, _timed, func, *args)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        """Stop the worker threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global bcrypt executor
+password_executor = PasswordExecutor(
+    settings.password_hash_workers, settings.password_hash_max_queue
+)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the bcrypt executor"""
+    return await password_executor.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bcrypt executor"""
+    return await password_executor.run(verify_password, plain_password, hashed_password)
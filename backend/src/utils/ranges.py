@@ -0,0 +1,62 @@
+"""
+HTTP byte range utilities
+"""
+
+from typing import Iterator, Optional, Tuple
+
+
+def parse_byte_range(
+    range_header: Optional[str], size: int
+) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header against a resource size
+
+    Multi-range and non-byte requests are ignored (RFC 9110 14.2 lets a
+    server answer them with the full representation).
+
+    Args:
+        range_header: Raw Range header value
+        size: Resource length in bytes
+
+    Returns:
+        Inclusive (start, end) offsets, or None to serve the whole resource
+
+    Raises:
+        ValueError: If the range is well-formed but cannot be satisfied
+    """
+    if not range_header:
+        return None
+
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, sep, last = (part.strip() for part in spec.partition("-"))
+    if not sep or not (first or last):
+        return None
+    if first and not first.isdigit() or last and not last.isdigit():
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Range not satisfiable")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else max(size - 1, start)
+    if end < start:
+        # Syntactically invalid, so ignored rather than unsatisfiable
+        return None
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
+
+
+def iter_chunks(data: bytes, start: int, end: int, chunk_size: int) -> Iterator[bytes]:
+    """Yield data[start:end + 1] in chunk_size pieces without copying it whole"""
+    view = memoryview(data)
+    for offset in range(start, end + 1, chunk_size):
+        stop = min(offset + chunk_size, end + 1)
+        yield bytes(view[offset:stop])
@@ -0,0 +1,22 @@
+"""
+Response classes
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+
+class TrustedJSONResponse(ORJSONResponse):
+    """
+    orjson response for documents this API wrote itself
+
+    Returning it from a route skips response_model validation, so it must
+    only wrap data whose shape is already guaranteed by the write path
+    (every fiction is validated by FictionCreate/FictionUpdate before it
+    is stored). Unknown types such as ObjectId are rendered with str().
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,245 @@
+"""
+Full-text search engines for fictions
+
+Two interchangeable backends are provided, selected with the
+`search_backend` setting:
+
+- "mongo": MongoDB $text query over the text_search index
+- "memory": in-process inverted index, useful locally and for benchmarks
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Optional
+import heapq
+import logging
+import math
+import re
+
+from ..config.database import get_fictions_collection
+from ..config.settings import settings
+from ..models.fiction import SUMMARY_FIELDS
+from .invalidation import ChangeEvent, invalidation_bus
+
+logger = logging.getLogger(__name__)
+
+# Relative field weights, shared by the Mongo text index and the memory engine
+TEXT_WEIGHTS = {"title": 10, "author": 5, "description": 1}
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in is it of on or the to with".split()
+)
+
+
+def _stem(term: str) -> str:
+    """Very light plural stemming so "dragons" matches "dragon"."""
+    if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+        return term[:-1]
+    return term
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split text into search terms, dropping stopwords"""
+    return [_stem(t) for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class SearchEngine:
+    """Interface implemented by search backends"""
+
+    async def search(
+        self, query: str, genre: Optional[str], limit: int, offset: int
+    ) -> List[dict]:
+        """
+        Search fictions by relevance
+
+        Args:
+            query: Free-text query
+            genre: Optional genre filter
+            limit: Maximum number of results
+            offset: Number of results to skip
+
+        Returns:
+            Fiction summaries with a `score` field, best match first
+        """
+        raise NotImplementedError
+
+    async def index_fiction(self, fiction: dict) -> None:
+        """Add or replace a fiction in the index"""
+
+    async def remove_fiction(self, fiction_id: str) -> None:
+        """Remove a fiction from the index"""
+
+    async def rebuild(self) -> None:
+        """Rebuild the index from the fictions collection"""
+
+
+class MongoTextSearchEngine(SearchEngine):
+    """Search backed by the MongoDB text_search index"""
+
+    async def search(
+        self, query: str, genre: Optional[str], limit: int, offset: int
+    ) -> List[dict]:
+        fictions = get_fictions_collection("fictions.search")
+
+        mongo_filter = {"$text": {"$search": query}}
+        if genre:
+            mongo_filter["genre"] = genre
+
+        projection = {f: 1 for f in SUMMARY_FIELDS}
+        projection["score"] = {"$meta": "textScore"}
+
+        cursor = (
+            fictions.find(mongo_filter, projection)
+            .sort([("score", {"$meta": "textScore"}), ("_id", 1)])
+            .skip(offset)
+            .limit(limit)
+        )
+
+        return await cursor.to_list(limit)
+
+
+class InMemorySearchEngine(SearchEngine):
+    """
+    In-process inverted index with weighted TF-IDF ranking
+
+    A query only visits the postings of its own terms, so latency grows
+    with the number of matching documents rather than collection size.
+    """
+
+    def __init__(self):
+        # term -> {fiction_id: weighted term frequency}
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        # fiction_id -> summary document returned in results
+        self._documents: Dict[str, dict] = {}
+        # fiction_id -> terms indexed for it, so removal is O(terms)
+        self._doc_terms: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, fiction: dict) -> None:
+        """Synchronously index a fiction (replacing any previous version)"""
+        fiction_id = fiction["_id"]
+        self.discard(fiction_id)
+
+        frequencies: Dict[str, float] = defaultdict(float)
+        for field, weight in TEXT_WEIGHTS.items():
+            for term in tokenize(fiction.get(field) or ""):
+                frequencies[term] += weight
+
+        for term, frequency in frequencies.items():
+            self._postings[term][fiction_id] = frequency
+
+        self._doc_terms[fiction_id] = list(frequencies)
+        self._documents[fiction_id] = {
+            "_id": fiction_id,
+            **{f: fiction.get(f) for f in SUMMARY_FIELDS},
+        }
+
+    def discard(self, fiction_id: str) -> None:
+        """Synchronously remove a fiction if it is indexed"""
+        for term in self._doc_terms.pop(fiction_id, ()):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(fiction_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._documents.pop(fiction_id, None)
+
+    def query(
+        self, query: str, genre: Optional[str], limit: int, offset: int
+    ) -> List[dict]:
+        """Synchronously rank fictions for a query"""
+        total = len(self._documents)
+        scores: Dict[str, float] = defaultdict(float)
+
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + total / len(postings))
+            for fiction_id, frequency in postings.items():
+                scores[fiction_id] += frequency * idf
+
+        if genre:
+            candidates = (
+                (score, fiction_id)
+                for fiction_id, score in scores.items()
+                if self._documents[fiction_id]["genre"] == genre
+            )
+        else:
+            candidates = ((score, fiction_id) for fiction_id, score in scores.items())
+
+        # Best score first, _id ascending as tie-breaker (matches the Mongo sort)
+        top = heapq.nsmallest(
+            offset + limit, candidates, key=lambda item: (-item[0], item[1])
+        )
+
+        return [
+            {**self._documents[fiction_id], "score": score}
+            for score, fiction_id in top[offset:]
+        ]
+
+    async def search(
+        self, query: str, genre: Optional[str], limit: int, offset: int
+    ) -> List[dict]:
+        return self.query(query, genre, limit, offset)
+
+    async def index_fiction(self, fiction: dict) -> None:
+        self.add(fiction)
+
+    async def remove_fiction(self, fiction_id: str) -> None:
+        self.discard(fiction_id)
+
+    async def rebuild(self) -> None:
+        self._postings.clear()
+        self._documents.clear()
+        self._doc_terms.clear()
+
+        fictions = get_fictions_collection()
+        projection = {f: 1 for f in SUMMARY_FIELDS}
+        async for fiction in fictions.find({}, projection):
+            self.add(fiction)
+
+        logger.info(f"Built in-memory search index over {len(self)} fictions")
+
+    async def apply_change(self, event: ChangeEvent) -> None:
+        """Follow writes served by other replicas"""
+        if event.operation == "reset":
+            await self.rebuild()
+        elif event.operation == "delete":
+            self.discard(event.document_id)
+        elif event.document is not None:
+            self.add(event.document)
+
+
+SEARCH_BACKENDS = {
+    "mongo": MongoTextSearchEngine,
+    "memory": InMemorySearchEngine,
+}
+
+
+def create_search_engine(backend: str) -> SearchEngine:
+    """
+    Create a search engine by backend name
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    try:
+        return SEARCH_BACKENDS[backend]()
+    except KeyError:
+        raise ValueError(
+            f'Unknown search backend "{backend}". '
+            f'Choose one of: {", ".join(SEARCH_BACKENDS)}'
+        )
+
+
+# Global search engine instance
+search_engine = create_search_engine(settings.search_backend)
+
+if isinstance(search_engine, InMemorySearchEngine):
+    invalidation_bus.subscribe(
+        "fictions", search_engine.apply_change, full_document=True
+    )
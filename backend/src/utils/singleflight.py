@@ -0,0 +1,71 @@
+"""
+Request coalescing for identical concurrent reads
+
+When many requests ask for the same thing at once (a widely shared story,
+the first page of the list), only the first one queries MongoDB; the rest
+wait for that call and share its result:
+
+    result = await fiction_reads.do(key, lambda: load(key))
+
+Shared results must be treated as read-only by every caller. Coalescing
+is per worker process and only spans calls that overlap in time; nothing
+is kept once the call finishes.
+"""
+
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+import asyncio
+
+from ..config.settings import settings
+from .metrics import singleflight_calls
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Deduplicate concurrent calls by key"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, "asyncio.Future[T]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run call() unless an identical one is already in flight
+
+        Args:
+            key: Identity of the read (everything the result depends on)
+            call: Zero-argument coroutine function performing the read
+
+        Returns:
+            The result (or exception) of the single underlying call
+        """
+        if not settings.singleflight_enabled:
+            return await call()
+
+        task = self._calls.get(key)
+        if task is None:
+            singleflight_calls.inc(name=self.name, role="leader")
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            singleflight_calls.inc(name=self.name, role="follower")
+
+        # A waiter that is cancelled (client went away) must not cancel the
+        # call the others are waiting on
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: "asyncio.Future[T]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception retrieved when every waiter was cancelled
+            task.exception()
+
+
+# Coalesced fiction reads, by route
+fiction_reads: SingleFlight = SingleFlight("fictions.get")
+fiction_lists: SingleFlight = SingleFlight("fictions.list")
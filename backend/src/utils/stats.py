@@ -0,0 +1,197 @@
+"""
+Incrementally maintained fiction statistics
+
+The `stats` collection holds one counter document per genre, author and
+creating user:
+
+    {"_id": "genre:fantasy", "kind": "genre", "key": "fantasy", "count": 12}
+
+Writes to `fictions` adjust the affected counters with $inc upserts in a
+single unordered bulk_write (which also bumps the collection version, see
+utils/collection_version), so GET /api/fictions/stats reads a handful
+of small documents instead of scanning fictions. Counters can drift if a
+process dies between the fiction write and the counter update; rebuild
+them from scratch with:
+
+    python -m src.utils.stats --rebuild
+
+A deployment upgraded from a version without counters has fictions but
+no counters; startup builds them once (seed_stats) before serving.
+"""
+
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional
+import argparse
+import asyncio
+import logging
+
+from pymongo import DESCENDING, DeleteMany, UpdateOne
+
+from ..config.database import Database, get_fictions_collection, get_stats_collection
+from .collection_version import forget_version, version_bump
+
+logger = logging.getLogger(__name__)
+
+# fiction field -> counter kind
+STAT_FIELDS = {"genre": "genre", "author": "author", "created_by": "user"}
+
+
+def stat_deltas(before: Optional[dict], after: Optional[dict]) -> Counter:
+    """
+    Counter changes for one fiction write
+
+    Args:
+        before: Fiction before the write (None for a create)
+        after: Fiction after the write (None for a delete)
+
+    Returns:
+        Counter of (kind, key) -> change; unchanged values cancel out
+    """
+    deltas: Counter = Counter()
+    for field, kind in STAT_FIELDS.items():
+        if before is not None and before.get(field) is not None:
+            deltas[(kind, before[field])] -= 1
+        if after is not None and after.get(field) is not None:
+            deltas[(kind, after[field])] += 1
+    return deltas
+
+
+async def apply_stat_deltas(deltas: Counter) -> None:
+    """
+    Apply counter changes and bump the fictions collection version in one
+    round trip (call once per write request)
+    """
+    requests = [
+        UpdateOne(
+            {"_id": f"{kind}:{key}"},
+            {"$inc": {"count": change}, "$setOnInsert": {"kind": kind, "key": key}},
+            upsert=True,
+        )
+        for (kind, key), change in deltas.items()
+        if change
+    ]
+    requests.append(version_bump())
+    await get_stats_collection().bulk_write(requests, ordered=False)
+    forget_version()
+
+
+async def record_fiction_write(before: Optional[dict], after: Optional[dict]) -> None:
+    """Update counters for a single create, update or delete"""
+    await apply_stat_deltas(stat_deltas(before, after))
+
+
+async def _counts(kind: str, limit: Optional[int] = None) -> Dict[str, int]:
+    cursor = (
+        get_stats_collection()
+        .find({"kind": kind, "count": {"$gt": 0}}, {"key": 1, "count": 1})
+        .sort([("count", DESCENDING), ("key", 1)])
+    )
+    if limit:
+        cursor = cursor.limit(limit)
+    return {doc["key"]: doc["count"] async for doc in cursor}
+
+
+async def get_stats(top_authors: int, top_users: int) -> dict:
+    """
+    Read genre counts and the top authors and users
+
+    Every read is served by the (kind, count) index and touches at most
+    one document per genre plus the requested top-N.
+    """
+    genres, authors, users = await asyncio.gather(
+        _counts("genre"),
+        _counts("author", top_authors),
+        _counts("user", top_users),
+    )
+    return {
+        "total": sum(genres.values()),
+        "genres": genres,
+        "top_authors": authors,
+        "top_users": users,
+    }
+
+
+async def rebuild_stats() -> int:
+    """
+    Recompute every counter from the fictions collection
+
+    Counters are overwritten with $set and stamped with this run; counters
+    for values that no longer exist keep an older stamp and are removed.
+    Writes that land while it runs may be counted twice or not at all, so
+    run it when traffic is low.
+
+    Returns:
+        Number of counter documents written
+    """
+    fictions = get_fictions_collection()
+    stats = get_stats_collection()
+
+    totals: Counter = Counter()
+    for field, kind in STAT_FIELDS.items():
+        pipeline = [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+        async for row in fictions.aggregate(pipeline):
+            if row["_id"] is not None:
+                totals[(kind, row["_id"])] = row["count"]
+
+    stamp = datetime.utcnow().isoformat()
+    requests = [
+        UpdateOne(
+            {"_id": f"{kind}:{key}"},
+            {"$set": {"kind": kind, "key": key, "count": count, "rebuilt_at": stamp}},
+            upsert=True,
+        )
+        for (kind, key), count in totals.items()
+    ]
+    requests.append(
+        DeleteMany(
+            {"kind": {"$in": list(STAT_FIELDS.values())}, "rebuilt_at": {"$ne": stamp}}
+        )
+    )
+    await stats.bulk_write(requests, ordered=True)
+    logger.info(f"Rebuilt {len(totals)} stats counters")
+    return len(totals)
+
+
+async def seed_stats() -> bool:
+    """
+    Build the counters if there are fictions but no counters yet
+
+    Deltas applied to missing counters would start them from zero, so
+    after an upgrade every delete would drive a count negative. Runs at
+    startup before the API is ready; a deployment that has counters (even
+    all zero) is left alone.
+
+    Returns:
+        Whether the counters were rebuilt
+    """
+    kinds = list(STAT_FIELDS.values())
+    if await get_stats_collection().find_one({"kind": {"$in": kinds}}, {"_id": 1}):
+        return False
+    if await get_fictions_collection().find_one({}, {"_id": 1}) is None:
+        return False
+    logger.warning("Fictions have no stats counters yet, rebuilding them")
+    await rebuild_stats()
+    return True
+
+
+async def _main() -> int:
+    """Rebuild counters from the CLI"""
+    await Database.connect_db()
+    try:
+        print(f"Rebuilt {await rebuild_stats()} counters")
+        return 0
+    finally:
+        await Database.close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain fiction statistics")
+    parser.add_argument(
+        "--rebuild", action="store_true", help="recompute counters from fictions"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if not args.rebuild:
+        parser.error("nothing to do (pass --rebuild)")
+    raise SystemExit(asyncio.run(_main()))
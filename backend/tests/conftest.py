@@ -0,0 +1,10 @@
+"""
+Settings are read at import time, so configure them before src is imported
+"""
+
+import os
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("LOG_SAMPLE_RATE", "0")
+# The in-memory Mongo stand-in (benchmarks/memory_mongo) has no $text support
+os.environ.setdefault("SEARCH_BACKEND", "memory")
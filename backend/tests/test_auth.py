@@ -0,0 +1,46 @@
+"""
+Registration against the unique username/email indexes
+"""
+
+from types import SimpleNamespace
+import asyncio
+import json
+
+from pymongo.errors import DuplicateKeyError
+
+from benchmarks.load_bench import PASSWORD, _in_process_client
+from src.config.database import get_users_collection
+
+
+def test_concurrent_duplicate_registration_is_a_400():
+    async def scenario():
+        client = await _in_process_client(SimpleNamespace(mongo_uri=None))
+        users = get_users_collection()
+        insert_one = users.insert_one
+
+        # Another request inserted the same email after the pre-check
+        async def racing_insert_one(document):
+            raise DuplicateKeyError(
+                "E11000 duplicate key error index: email_unique",
+                11000,
+                {"keyPattern": {"email": 1}, "keyValue": {"email": document["email"]}},
+            )
+
+        users.insert_one = racing_insert_one
+        try:
+            status, _, body = await client.request(
+                "POST",
+                "/api/auth/register",
+                json_body={
+                    "username": "racing_user",
+                    "email": "racing_user@example.com",
+                    "password": PASSWORD,
+                },
+            )
+        finally:
+            users.insert_one = insert_one
+
+        assert status == 400
+        assert json.loads(body)["detail"] == "Email already registered"
+
+    asyncio.run(scenario())
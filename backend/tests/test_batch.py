@@ -0,0 +1,105 @@
+"""
+POST /api/fictions/batch against concurrent single-item writes
+"""
+
+from types import SimpleNamespace
+import asyncio
+import json
+import random
+
+from benchmarks.load_bench import PASSWORD, _in_process_client, make_fiction
+from src.config.database import get_fictions_collection
+
+
+async def _client_with_fictions(count: int):
+    client = await _in_process_client(SimpleNamespace(mongo_uri=None))
+    user = {
+        "username": "batch_writer",
+        "email": "batch_writer@example.com",
+        "password": PASSWORD,
+    }
+    status, _, body = await client.request("POST", "/api/auth/register", json_body=user)
+    assert status == 201, body
+    headers = {"Authorization": f"Bearer {json.loads(body)['token']}"}
+    rng = random.Random(3)
+    operations = [{"op": "create", "data": make_fiction(rng)} for _ in range(count)]
+    status, _, body = await client.request(
+        "POST",
+        "/api/fictions/batch",
+        headers=headers,
+        json_body={"operations": operations},
+    )
+    assert status == 200, body
+    ids = [item["id"] for item in json.loads(body)["results"]]
+    return client, headers, ids
+
+
+def _delete_before_bulk_write(collection, fiction_id, client, headers):
+    """Run a single DELETE of fiction_id just before the batch's bulk_write"""
+    bulk_write = collection.bulk_write
+
+    async def racing_bulk_write(requests, ordered=True):
+        collection.bulk_write = bulk_write
+        status, _, _ = await client.request(
+            "DELETE", f"/api/fictions/{fiction_id}", headers=headers
+        )
+        assert status == 200
+        return await bulk_write(requests, ordered=ordered)
+
+    collection.bulk_write = racing_bulk_write
+
+
+async def _total(client) -> int:
+    status, _, body = await client.request("GET", "/api/fictions/stats")
+    assert status == 200
+    return json.loads(body)["total"]
+
+
+def test_batch_delete_of_a_fiction_deleted_meanwhile_is_not_found():
+    async def scenario():
+        client, headers, ids = await _client_with_fictions(2)
+        assert await _total(client) == 2
+
+        _delete_before_bulk_write(get_fictions_collection(), ids[0], client, headers)
+        status, _, body = await client.request(
+            "POST",
+            "/api/fictions/batch",
+            headers=headers,
+            json_body={"operations": [{"op": "delete", "id": ids[0]}]},
+        )
+        assert status == 200
+        result = json.loads(body)
+        assert result["deleted"] == 0
+        assert result["results"][0]["status"] == "not_found"
+        # Decremented once, by the single DELETE
+        assert await _total(client) == 1
+
+    asyncio.run(scenario())
+
+
+def test_batch_update_of_a_fiction_deleted_meanwhile_is_not_found():
+    async def scenario():
+        client, headers, ids = await _client_with_fictions(2)
+
+        _delete_before_bulk_write(get_fictions_collection(), ids[0], client, headers)
+        status, _, body = await client.request(
+            "POST",
+            "/api/fictions/batch",
+            headers=headers,
+            json_body={
+                "operations": [
+                    {"op": "update", "id": ids[0], "data": {"title": "Gone"}},
+                    {"op": "update", "id": ids[1], "data": {"title": "Kept"}},
+                ]
+            },
+        )
+        assert status == 200
+        result = json.loads(body)
+        assert result["updated"] == 1
+        assert [item["status"] for item in result["results"]] == [
+            "not_found",
+            "updated",
+        ]
+        assert await _total(client) == 1
+
+    asyncio.run(scenario())
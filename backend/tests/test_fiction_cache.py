@@ -0,0 +1,161 @@
+"""
+Read-through caching of GET /api/fictions/{id} against concurrent writes
+"""
+
+from types import SimpleNamespace
+import asyncio
+import json
+import random
+
+from benchmarks.load_bench import PASSWORD, _in_process_client, make_fiction
+from src.config.database import get_fictions_collection
+from src.utils.cache import TTLCache, fiction_cache
+
+
+async def _client_with_fiction():
+    client = await _in_process_client(SimpleNamespace(mongo_uri=None))
+    user = {
+        "username": "cache_reader",
+        "email": "cache_reader@example.com",
+        "password": PASSWORD,
+    }
+    status, _, body = await client.request("POST", "/api/auth/register", json_body=user)
+    assert status == 201, body
+    headers = {"Authorization": f"Bearer {json.loads(body)['token']}"}
+    status, _, body = await client.request(
+        "POST",
+        "/api/fictions/",
+        headers=headers,
+        json_body=make_fiction(random.Random(1)),
+    )
+    assert status == 201, body
+    return client, headers, json.loads(body)["_id"]
+
+
+def _hold_reads(collection, started: asyncio.Event, release: asyncio.Event):
+    """Make find_one read the document, then wait for `release`"""
+    find_one = collection.find_one
+
+    async def held_find_one(*args, **kwargs):
+        document = await find_one(*args, **kwargs)
+        started.set()
+        await release.wait()
+        return document
+
+    collection.find_one = held_find_one
+    return lambda: setattr(collection, "find_one", find_one)
+
+
+def test_read_overlapping_a_write_does_not_cache_the_old_document():
+    async def scenario():
+        client, headers, fiction_id = await _client_with_fiction()
+
+        fiction_cache.clear()
+        started, release = asyncio.Event(), asyncio.Event()
+        restore = _hold_reads(get_fictions_collection(), started, release)
+
+        # The read fetches the old document, then the write lands
+        read = asyncio.create_task(client.request("GET", f"/api/fictions/{fiction_id}"))
+        await started.wait()
+        status, _, body = await client.request(
+            "PUT",
+            f"/api/fictions/{fiction_id}",
+            headers=headers,
+            json_body={"title": "Written while reading"},
+        )
+        assert status == 200, body
+        written = json.loads(body)
+
+        release.set()
+        status, _, body = await read
+        restore()
+        assert status == 200
+        assert json.loads(body)["version"] == written["version"] - 1
+
+        status, response_headers, body = await client.request(
+            "GET", f"/api/fictions/{fiction_id}"
+        )
+        assert status == 200
+        assert json.loads(body)["title"] == "Written while reading"
+        assert response_headers["etag"] == f'"v{written["version"]}"'
+
+    asyncio.run(scenario())
+
+
+def test_fill_is_skipped_after_invalidation():
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    generation = cache.generation("a")
+    cache.invalidate("a")
+    assert cache.set("a", "old", generation=generation) is False
+    assert cache.get("a") is None
+
+    assert cache.set("a", "new", generation=cache.generation("a")) is True
+    assert cache.get("a") == "new"
+
+
+def test_fill_is_skipped_once_a_key_generation_is_forgotten():
+    cache = TTLCache(max_entries=1, ttl_seconds=60)
+    generation = cache.generation("a")
+    cache.invalidate("a")
+    # "b" pushes the generation of "a" out of the bounded table
+    cache.invalidate("b")
+    assert cache.set("a", "old", generation=generation) is False
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = TTLCache(max_entries=10, ttl_seconds=60, max_bytes=10, sizeof=len)
+    cache.set("a", "aaaa")
+    cache.set("b", "bbbb")
+    cache.get("a")
+    cache.set("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa" and cache.get("c") == "cccc"
+    assert cache.bytes == 8
+
+
+def test_oversized_value_is_not_cached_and_drops_the_old_one():
+    cache = TTLCache(max_entries=10, ttl_seconds=60, max_bytes_per_entry=4, sizeof=len)
+    cache.set("a", "aaaa")
+    cache.set("a", "a much longer value")
+    assert cache.get("a") is None
+    assert cache.bytes == 0
+
+
+def test_each_coding_has_its_own_etag_and_all_vary_on_accept_encoding():
+    async def scenario():
+        client, headers, fiction_id = await _client_with_fiction()
+        path = f"/api/fictions/{fiction_id}"
+
+        status, plain, _ = await client.request("GET", path)
+        assert status == 200
+        status, gzipped, _ = await client.request(
+            "GET", path, headers={"Accept-Encoding": "gzip"}
+        )
+        assert status == 200
+        assert gzipped["content-encoding"] == "gzip"
+        assert plain["etag"] == '"v1"' and gzipped["etag"] == '"v1-gzip"'
+        assert plain["vary"] == gzipped["vary"] == "Accept-Encoding"
+
+        status, not_modified, _ = await client.request(
+            "GET",
+            path,
+            headers={"Accept-Encoding": "gzip", "If-None-Match": 'W/"v1-gzip"'},
+        )
+        assert status == 304
+        assert not_modified["etag"] == '"v1-gzip"'
+        assert not_modified["vary"] == "Accept-Encoding"
+
+        # Any coding's ETag names the version for a conditional write
+        status, _, body = await client.request(
+            "PUT",
+            path,
+            headers={**headers, "If-Match": '"v1-gzip"'},
+            json_body={"title": "Conditional"},
+        )
+        assert status == 200, body
+        status, _, _ = await client.request(
+            "GET", path, headers={"If-None-Match": '"v1-gzip"'}
+        )
+        assert status == 200
+
+    asyncio.run(scenario())
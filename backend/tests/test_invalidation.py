@@ -0,0 +1,16 @@
+"""
+Change stream filter built from the invalidation subscribers
+"""
+
+from src.utils.collection_version import VERSION_ID
+from src.utils.invalidation import ChangeStreamWatcher, invalidation_bus
+
+
+def test_watches_only_subscribed_collections_and_the_version_document():
+    watcher = ChangeStreamWatcher(invalidation_bus, ["fictions", "users", "stats"])
+    assert watcher.collections == ["fictions", "stats"]
+
+    namespaces = watcher._pipeline()[0]["$match"]["$or"]
+    assert namespaces[0] == {"ns.coll": "fictions"}
+    assert namespaces[1]["ns.coll"] == "stats"
+    assert {"documentKey._id": {"$in": [VERSION_ID]}} in namespaces[1]["$or"]
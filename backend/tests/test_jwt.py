@@ -0,0 +1,23 @@
+"""
+JWT backends
+"""
+
+import os
+import subprocess
+import sys
+
+
+def test_hmac_backend_does_not_import_jose():
+    env = dict(os.environ, JWT_BACKEND="hmac")
+    code = (
+        "import sys\n"
+        "import src.main\n"
+        "from src.middleware.auth import create_access_token, verify_token\n"
+        "assert verify_token(create_access_token({'sub': 'u1'})) == 'u1'\n"
+        "print(sorted(m for m in sys.modules if m.split('.')[0] == 'jose'))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,50 @@
+"""
+/metrics summed over gunicorn workers
+"""
+
+import json
+import subprocess
+import sys
+
+from src.utils.metrics import Counter, Gauge, Histogram, Registry, SnapshotDirectory
+
+
+def _registry():
+    registry = Registry()
+    requests = registry.register(Counter("requests_total", "Requests", ("route",)))
+    in_flight = registry.register(Gauge("in_flight", "In flight"))
+    latency = registry.register(Histogram("latency_seconds", "Latency", buckets=(1.0,)))
+    return registry, requests, in_flight, latency
+
+
+def _exited_pid() -> int:
+    child = subprocess.Popen([sys.executable, "-c", "pass"])
+    child.wait()
+    return child.pid
+
+
+def test_render_sums_workers_and_keeps_exited_counts(tmp_path):
+    registry, requests, in_flight, latency = _registry()
+    directory = SnapshotDirectory(str(tmp_path), registry)
+
+    # Another worker that has exited, leaving its last snapshot behind
+    exited, exited_requests, exited_in_flight, exited_latency = _registry()
+    exited_requests.inc(5, route="/")
+    exited_in_flight.inc(3)
+    exited_latency.observe(0.5)
+    (tmp_path / f"{_exited_pid()}-deadbeef.json").write_text(
+        json.dumps(exited.snapshot())
+    )
+
+    requests.inc(2, route="/")
+    in_flight.inc()
+    latency.observe(2.0)
+
+    for _ in range(2):  # the second render reads the retired totals
+        text = directory.render().decode()
+        assert 'requests_total{route="/"} 7.0' in text
+        assert "in_flight 1.0" in text  # the exited worker's gauge is dropped
+        assert 'latency_seconds_bucket{le="1.0"} 1' in text
+        assert "latency_seconds_count 2" in text
+
+    assert sorted(p.name for p in tmp_path.glob("*.json")) == ["retired.json"]
@@ -0,0 +1,23 @@
+"""
+Access log levels
+"""
+
+from types import SimpleNamespace
+import asyncio
+import logging
+
+from benchmarks.load_bench import _in_process_client
+from src import main
+
+
+def test_readiness_503_is_not_logged_as_an_error(caplog):
+    async def scenario():
+        client = await _in_process_client(SimpleNamespace(mongo_uri=None))
+        main.app.state.ready = False
+        status, _, _ = await client.request("GET", "/ready")
+        assert status == 503
+
+    with caplog.at_level(logging.INFO, logger="src.access"):
+        asyncio.run(scenario())
+    records = [r for r in caplog.records if r.name == "src.access"]
+    assert [(r.status, r.levelno) for r in records] == [(503, logging.INFO)]
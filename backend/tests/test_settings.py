@@ -0,0 +1,21 @@
+"""
+Per-worker budgets
+"""
+
+from src.config.settings import Settings
+
+
+def _settings(worker_count: int) -> Settings:
+    return Settings(jwt_secret="test-secret", worker_count=worker_count)
+
+
+def test_per_worker_splits_a_budget_rounding_up():
+    assert _settings(4).per_worker(1000) == 250
+    assert _settings(3).per_worker(10) == 4
+    assert _settings(16).per_worker(4) == 1
+
+
+def test_per_worker_keeps_zero():
+    # 0 disables the fiction/list caches; it must not become 1 entry
+    assert _settings(1).per_worker(0) == 0
+    assert _settings(4).per_worker(0) == 0
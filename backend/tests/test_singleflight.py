@@ -0,0 +1,91 @@
+"""
+Coalescing of concurrent identical reads
+"""
+
+from types import SimpleNamespace
+import asyncio
+import json
+import random
+
+import pytest
+
+from benchmarks.load_bench import PASSWORD, _in_process_client, make_fiction
+from src.config.database import get_fictions_collection
+from src.utils.cache import fiction_cache
+from src.utils.singleflight import SingleFlight, fiction_reads
+
+
+def test_concurrent_misses_for_one_fiction_read_mongo_once():
+    async def scenario():
+        client = await _in_process_client(SimpleNamespace(mongo_uri=None))
+        user = {
+            "username": "burst_reader",
+            "email": "burst_reader@example.com",
+            "password": PASSWORD,
+        }
+        status, _, body = await client.request(
+            "POST", "/api/auth/register", json_body=user
+        )
+        assert status == 201, body
+        status, _, body = await client.request(
+            "POST",
+            "/api/fictions/",
+            headers={"Authorization": f"Bearer {json.loads(body)['token']}"},
+            json_body=make_fiction(random.Random(2)),
+        )
+        assert status == 201, body
+        fiction_id = json.loads(body)["_id"]
+
+        collection = get_fictions_collection()
+        find_one = collection.find_one
+        reads = 0
+
+        async def counted_find_one(*args, **kwargs):
+            nonlocal reads
+            reads += 1
+            await asyncio.sleep(0.01)  # keep the read in flight for the burst
+            return await find_one(*args, **kwargs)
+
+        fiction_cache.clear()
+        collection.find_one = counted_find_one
+        try:
+            responses = await asyncio.gather(
+                *(
+                    client.request("GET", f"/api/fictions/{fiction_id}")
+                    for _ in range(20)
+                )
+            )
+        finally:
+            collection.find_one = find_one
+        assert [status for status, _, _ in responses] == [200] * 20
+        assert reads == 1
+        assert len(fiction_reads) == 0
+
+    asyncio.run(scenario())
+
+
+def test_an_error_reaches_every_waiter_and_is_not_kept():
+    async def scenario():
+        flight: SingleFlight = SingleFlight("test")
+        calls = 0
+
+        async def failing_read():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("primary stepped down")
+
+        results = await asyncio.gather(
+            *(flight.do("key", failing_read) for _ in range(5)),
+            return_exceptions=True,
+        )
+        assert calls == 1
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert len(flight) == 0
+
+        # The next call retries instead of sharing the old failure
+        with pytest.raises(RuntimeError):
+            await flight.do("key", failing_read)
+        assert calls == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,41 @@
+"""
+Background startup and the liveness probe
+"""
+
+from types import SimpleNamespace
+import asyncio
+
+from pymongo.errors import OperationFailure
+
+from benchmarks.load_bench import _in_process_client
+from src import main
+
+
+def test_startup_error_that_is_not_retried_fails_liveness(monkeypatch):
+    async def scenario():
+        client = await _in_process_client(SimpleNamespace(mongo_uri=None))
+
+        async def connect_db():
+            pass  # keep the in-memory client
+
+        async def ensure_indexes():
+            raise OperationFailure("listIndexes failed", 13)
+
+        monkeypatch.setattr(main.Database, "connect_db", connect_db)
+        monkeypatch.setattr(main, "ensure_indexes", ensure_indexes)
+        monkeypatch.setattr(main.settings, "ensure_indexes_on_startup", True)
+
+        status, _, _ = await client.request("GET", "/health")
+        assert status == 200
+
+        startup = main._start_in_background(main.app)
+        await asyncio.wait([startup])
+        try:
+            status, _, _ = await client.request("GET", "/health")
+            assert status == 503
+            status, _, _ = await client.request("GET", "/ready")
+            assert status == 503
+        finally:
+            main.app.state.startup_failed = False
+
+    asyncio.run(scenario())
@@ -0,0 +1,61 @@
+"""
+Stats counters on a deployment upgraded from a version without them
+"""
+
+from types import SimpleNamespace
+import asyncio
+import json
+import random
+
+from pymongo import DeleteMany
+
+from benchmarks.load_bench import PASSWORD, _in_process_client, make_fiction
+from src.config.database import get_stats_collection
+from src.utils.stats import seed_stats
+
+
+async def _stats(client) -> dict:
+    status, _, body = await client.request("GET", "/api/fictions/stats")
+    assert status == 200
+    return json.loads(body)
+
+
+def test_delete_after_upgrade_counts_from_the_existing_fictions():
+    async def scenario():
+        client = await _in_process_client(SimpleNamespace(mongo_uri=None))
+        user = {
+            "username": "upgraded_user",
+            "email": "upgraded_user@example.com",
+            "password": PASSWORD,
+        }
+        status, _, body = await client.request(
+            "POST", "/api/auth/register", json_body=user
+        )
+        assert status == 201, body
+        headers = {"Authorization": f"Bearer {json.loads(body)['token']}"}
+        rng = random.Random(5)
+        operations = [{"op": "create", "data": make_fiction(rng)} for _ in range(3)]
+        status, _, body = await client.request(
+            "POST",
+            "/api/fictions/batch",
+            headers=headers,
+            json_body={"operations": operations},
+        )
+        assert status == 200, body
+        ids = [item["id"] for item in json.loads(body)["results"]]
+
+        # Fictions written before the counters existed
+        await get_stats_collection().bulk_write([DeleteMany({})])
+        assert await seed_stats()
+        assert not await seed_stats()
+
+        status, _, _ = await client.request(
+            "DELETE", f"/api/fictions/{ids[0]}", headers=headers
+        )
+        assert status == 200
+        stats = await _stats(client)
+        assert stats["total"] == 2
+        assert sum(stats["genres"].values()) == 2
+        assert stats["top_users"] and sum(stats["top_users"].values()) == 2
+
+    asyncio.run(scenario())
@@ -27,15 +27,17 @@ export default function FictionCard({ fiction, onEdit, onDelete }) {
       </p>
       <p><strong>Description:</strong> {fiction.description}</p>
       
-      <div className="card-content">
-        <strong>Story:</strong>
-        <div style={{ marginTop: '0.5rem' }}>
-          {fiction.content.length > 200 
-            ? `${fiction.content.substring(0, 200)}...` 
-            : fiction.content
-          }
+      {fiction.content && (
+        <div className="card-content">
+          <strong>Story:</strong>
+          <div style={{ marginTop: '0.5rem' }}>
+            {fiction.content.length > 200 
+              ? `${fiction.content.substring(0, 200)}...` 
+              : fiction.content
+            }
+          </div>
         </div>
-      </div>
+      )}
 
       {isOwner && (
         <div className="card-actions">
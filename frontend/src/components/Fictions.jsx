@@ -8,6 +8,7 @@ export default function Fictions() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [editingFiction, setEditingFiction] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
 
   useEffect(() => {
     loadFictions();
@@ -18,7 +19,8 @@ export default function Fictions() {
       setLoading(true);
       setError('');
       const data = await fictionsAPI.getAll();
-      setFictions(data);
+      setFictions(data.items);
+      setNextCursor(data.next_cursor);
     } catch (err) {
       setError(err.message || 'Failed to load fictions');
     } finally {
@@ -26,6 +28,16 @@ export default function Fictions() {
     }
   };
 
+  const loadMore = async () => {
+    try {
+      const data = await fictionsAPI.getAll(nextCursor);
+      setFictions((current) => [...current, ...data.items]);
+      setNextCursor(data.next_cursor);
+    } catch (err) {
+      setError(err.message || 'Failed to load fictions');
+    }
+  };
+
   const handleCreate = async (fictionData) => {
     try {
       await fictionsAPI.create(fictionData);
@@ -38,7 +50,7 @@ export default function Fictions() {
 
   const handleUpdate = async (id, fictionData) => {
     try {
-      await fictionsAPI.update(id, fictionData);
+      await fictionsAPI.update(id, fictionData, editingFiction?.version);
       await loadFictions();
       setEditingFiction(null);
       return true;
@@ -60,9 +72,15 @@ export default function Fictions() {
     }
   };
 
-  const handleEdit = (fiction) => {
-    setEditingFiction(fiction);
-    window.scrollTo({ top: 0, behavior: 'smooth' });
+  const handleEdit = async (fiction) => {
+    try {
+      // List items are summaries; fetch the full story for editing
+      const fullFiction = await fictionsAPI.getById(fiction._id);
+      setEditingFiction(fullFiction);
+      window.scrollTo({ top: 0, behavior: 'smooth' });
+    } catch (err) {
+      alert(err.message || 'Failed to load fiction');
+    }
   };
 
   const handleCancelEdit = () => {
@@ -101,6 +119,11 @@ export default function Fictions() {
               onDelete={handleDelete}
             />
           ))}
+          {nextCursor && (
+            <button className="btn btn-secondary" onClick={loadMore}>
+              Load more
+            </button>
+          )}
         </div>
       )}
     </div>
@@ -82,7 +82,9 @@ export const authAPI = {
 
 // Fictions API
 export const fictionsAPI = {
-  getAll: () => apiCall('/api/fictions/'),
+  getAll: (after = null) => apiCall(
+    after ? `/api/fictions/?after=${encodeURIComponent(after)}` : '/api/fictions/'
+  ),
   
   getById: (id) => apiCall(`/api/fictions/${id}`),
   
@@ -91,9 +93,11 @@ export const fictionsAPI = {
     body: JSON.stringify(fiction),
   }),
   
-  update: (id, fiction) => apiCall(`/api/fictions/${id}`, {
+  // Pass the version that was loaded so concurrent edits fail with 412
+  update: (id, fiction, version) => apiCall(`/api/fictions/${id}`, {
     method: 'PUT',
     body: JSON.stringify(fiction),
+    headers: version !== undefined ? { 'If-Match': `"v${version}"` } : {},
   }),
   
   delete: (id) => apiCall(`/api/fictions/${id}`, {